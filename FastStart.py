@@ -1,15 +1,189 @@
-import json
+import datetime
 import os
 import sys
+import threading
+import traceback
 
-from PySide6.QtCore import Qt, QTimer, Signal, QPoint, QTime, QDate
-from PySide6.QtGui import QIcon, QMouseEvent, QAction
+from startup_profile import profiler
+
+if __name__ == "__main__":
+    if sys.argv[1:]:
+        # 命令行模式（如 --launch）在加载 Qt 窗口组件之前处理；没有参数时不必导入 argparse
+        from cli import run_cli
+        exit_code = run_cli(sys.argv[1:])
+        if exit_code is not None:
+            sys.exit(exit_code)
+        profiler.mark('命令行解析')
+
+    # 界面已经在运行时只让它显示出来，不再启动第二个
+    from instance import send_command
+    if send_command('show') is not None:
+        sys.exit(0)
+    profiler.mark('检查已运行的实例')
+
+from PySide6.QtCore import (Qt, QTimer, Signal, QPoint, QTime, QObject,
+                            QAbstractTableModel, QModelIndex, QSocketNotifier)
+from PySide6.QtGui import QMouseEvent, QAction, QActionGroup, QColor, QFontDatabase, QKeySequence, QShortcut
 from PySide6.QtWidgets import (QApplication, QMainWindow, QSplitter,
                                QWidget, QVBoxLayout, QPushButton,
                                QStatusBar, QDialog, QFormLayout,
                                QLineEdit, QSpinBox, QHBoxLayout, QFileDialog, QLabel,
-                               QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QTimeEdit, QAbstractItemView,
-                               QSystemTrayIcon, QMenu, QCheckBox)
+                               QMessageBox, QTableView, QHeaderView, QTimeEdit, QAbstractItemView,
+                               QSystemTrayIcon, QMenu, QCheckBox, QComboBox, QTableWidget,
+                               QTableWidgetItem, QDialogButtonBox, QPlainTextEdit)
+profiler.mark('导入 PySide6')
+
+# 启动引擎 (launcher、history) 在第一次启动程序时才导入，不计入窗口启动时间
+import iconcache
+from config import CONFIG_FILE, ConfigWriter, ProgramRecord, load_config
+from importer import ProgramScanner
+from instance import COMMANDS, MAX_MESSAGE, decode_message, encode_message, instance_address, send_command
+from pathcache import PATH_MISSING, PATH_OK, STATUS_MESSAGES, PathValidator
+from resources import parse_cpu_list
+from searchindex import ProgramIndex
+from plan import DEFAULT_PROFILE, PlanCache, plan_cache_path, profile_names
+from supervisor import ChildSignalPipe, Supervisor, create_policy, open_pidfd
+from timetable import WEEKDAY_NAMES, ScheduleEngine
+profiler.mark('导入配置模块')
+
+# 定时器最长 5 分钟重新校准一次，睡眠唤醒或系统时间调整后能及时重新计算
+MAX_SCHEDULE_ARM_MS = 5 * 60 * 1000
+
+
+class LaunchSignals(QObject):
+    # 启动线程通过信号把进度送回界面线程
+    message = Signal(str)
+    finished = Signal(bool)  # 是否正常完成
+
+
+class PathSignals(QObject):
+    # 路径检查线程的结果 (路径, 状态)
+    checked = Signal(str, str)
+
+
+class ImportSignals(QObject):
+    # 导入线程分批送回找到的程序 (ProgramRecord 列表)，结束时送回 (找到的数量, 达到上限时为 1)
+    batch = Signal(list)
+    finished = Signal(int, int)
+
+
+class OptimizeSignals(QObject):
+    # 优化线程完成后送回 (程序列表, 对应的 ProgramRecord 列表, OptimizeResult)，出错时送回错误信息
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class SaveSignals(QObject):
+    # 配置写入线程完成后通知界面，参数为错误信息（成功时为空字符串）
+    finished = Signal(str)
+
+
+class InstanceServer(QObject):
+    # 在本地 socket 上接收其他 FastStart 进程转发的命令，handler(请求) 返回回复
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        # QtNetwork 只在这里用到，首次绘制之后才导入
+        from PySide6.QtNetwork import QLocalServer
+
+        self.handler = handler
+        self.buffers = {}
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self, config_path=CONFIG_FILE):
+        address = instance_address(config_path)
+        if self.server.listen(address):
+            return True
+        # 地址被占用：另一个实例刚刚启动，或者上次异常退出留下的 socket 文件
+        if send_command('status', config_path) is not None:
+            return False
+        self.server.removeServer(address)
+        return self.server.listen(address)
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(lambda connection=connection: self.on_ready_read(connection))
+            connection.disconnected.connect(lambda connection=connection: self.buffers.pop(connection, None))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def on_ready_read(self, connection):
+        data = self.buffers.pop(connection, b'') + bytes(connection.readAll())
+        if not data.endswith(b'\n') and len(data) < MAX_MESSAGE:
+            self.buffers[connection] = data
+            return
+        try:
+            reply = self.handler(decode_message(data))
+        except ValueError as e:
+            reply = {'ok': False, 'message': f"无法解析命令: {e}"}
+        connection.write(encode_message(reply))
+        connection.flush()
+        connection.disconnectFromServer()
+
+
+class ChildWatcher(QObject):
+    # 把子进程退出事件接入 Qt 事件循环，退出时调用 callback(名称)：
+    # Linux 用 pidfd + QSocketNotifier；不支持 pidfd 时用 SIGCHLD 唤醒的 socket；Windows 用进程句柄。
+    # 不守护的子进程用 reap 登记，退出后只回收，界面常驻时不会留下僵尸进程
+    def __init__(self, callback, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.handles = {}
+        self.notifiers = {}
+        self.polled = {}
+        self.signal_pipe = None
+        self.signal_notifier = None
+
+    def watch(self, name, handle):
+        self.unwatch(name)
+        self.handles[name] = handle
+        fd = open_pidfd(handle.pid)
+        if fd is not None:
+            notifier = QSocketNotifier(fd, QSocketNotifier.Read, self)
+            notifier.activated.connect(lambda *args, name=name: self.on_exited(name))
+            self.notifiers[name] = (notifier, fd)
+            return
+        if handle.process_handle() is not None:
+            from PySide6.QtCore import QWinEventNotifier
+            notifier = QWinEventNotifier(handle.process_handle(), self)
+            notifier.activated.connect(lambda *args, name=name: self.on_exited(name))
+            self.notifiers[name] = (notifier, None)
+            return
+        if self.signal_pipe is None:
+            self.signal_pipe = ChildSignalPipe()
+            self.signal_notifier = QSocketNotifier(self.signal_pipe.fileno(), QSocketNotifier.Read, self)
+            self.signal_notifier.activated.connect(self.on_child_signal)
+        self.polled[name] = handle
+
+    def reap(self, handle):
+        if os.name != 'posix' or handle.pid is None or handle.poll() is not None:
+            return
+        self.watch(('reap', handle.pid), handle)
+
+    def unwatch(self, name):
+        self.handles.pop(name, None)
+        self.polled.pop(name, None)
+        notifier, fd = self.notifiers.pop(name, (None, None))
+        if notifier is not None:
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+        if fd is not None:
+            os.close(fd)
+
+    def on_exited(self, name):
+        handle = self.handles.get(name)
+        self.unwatch(name)
+        if handle is not None:
+            handle.poll()  # 回收子进程并记下退出码
+        if not (isinstance(name, tuple) and name[0] == 'reap'):
+            self.callback(name)
+
+    def on_child_signal(self):
+        self.signal_pipe.drain()
+        for name, handle in list(self.polled.items()):
+            if handle.poll() is not None:
+                self.on_exited(name)
 
 
 class DeleteConfirmationDialog(QMessageBox):
@@ -23,10 +197,111 @@ class DeleteConfirmationDialog(QMessageBox):
         self.setDefaultButton(QMessageBox.No)
         self.setIcon(QMessageBox.Question)
 
+class ResourceFields(QWidget):
+    # 添加/编辑对话框中的资源限制，对应程序条目的 resources；界面上没有的字段（如磁盘优先级等级）原样保留
+    IONICE_CHOICES = [("不设置", ''), ("空闲时", 'idle'), ("普通", 'best-effort'), ("实时", 'realtime')]
+
+    def __init__(self, spec=None, parent=None):
+        super().__init__(parent)
+        self.spec = dict(spec or {})
+        layout = QFormLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.nice_spin = QSpinBox()
+        self.nice_spin.setRange(-21, 19)
+        self.nice_spin.setSpecialValueText("不设置")
+        self.nice_spin.setValue(self.spec['nice'] if self.spec.get('nice') is not None else -21)
+        layout.addRow("优先级(nice):", self.nice_spin)
+
+        self.ionice_combo = QComboBox()
+        for text, value in self.IONICE_CHOICES:
+            self.ionice_combo.addItem(text, value)
+        self.ionice_combo.setCurrentIndex(max(self.ionice_combo.findData(self.ionice_class(self.spec.get('ionice'))), 0))
+        layout.addRow("磁盘优先级:", self.ionice_combo)
+
+        self.affinity_edit = QLineEdit()
+        self.affinity_edit.setPlaceholderText("例如 0-3,6，留空不限制")
+        affinity = self.spec.get('affinity')
+        if affinity:
+            self.affinity_edit.setText(','.join(map(str, affinity)) if isinstance(affinity, list) else str(affinity))
+        layout.addRow("CPU 核心:", self.affinity_edit)
+
+        boost = self.spec.get('boost')
+        self.boost_spin = QSpinBox()
+        self.boost_spin.setRange(0, 600)
+        self.boost_spin.setSpecialValueText("关闭")
+        self.boost_spin.setValue(int((boost.get('seconds', 0) if isinstance(boost, dict) else boost) or 0))
+        self.boost_spin.setToolTip("前 N 秒提高磁盘优先级，并按 nice 0 运行（设置了更大的优先级时才有区别），"
+                                   "之后恢复上面的设置；FastStart 退出时提前恢复")
+        layout.addRow("启动加速(秒):", self.boost_spin)
+
+        cgroup = self.spec.get('cgroup') or {}
+        self.cpu_spin = QSpinBox()
+        self.cpu_spin.setRange(0, 100 * (os.cpu_count() or 1))
+        self.cpu_spin.setSpecialValueText("不限")
+        self.cpu_spin.setSuffix(" %")
+        self.cpu_spin.setValue(int(cgroup.get('cpu_max') or 0))
+        layout.addRow("CPU 上限:", self.cpu_spin)
+
+        self.memory_spin = QSpinBox()
+        self.memory_spin.setRange(0, 1024 * 1024)
+        self.memory_spin.setSpecialValueText("不限")
+        self.memory_spin.setSuffix(" MB")
+        self.memory_spin.setValue(int(cgroup.get('memory_max_mb') or 0))
+        layout.addRow("内存上限:", self.memory_spin)
+
+    @staticmethod
+    def ionice_class(ionice):
+        if isinstance(ionice, dict):
+            return ionice.get('class', 'best-effort')
+        return ionice or ''
+
+    def validate(self):
+        # 返回错误提示；没有错误时返回 None
+        if self.affinity_edit.text().strip():
+            try:
+                parse_cpu_list(self.affinity_edit.text())
+            except ValueError:
+                return "CPU 核心格式错误，例如 0-3,6"
+        return None
+
+    def get_spec(self):
+        # 返回新的 resources；全部未设置时返回 None
+        spec = dict(self.spec)
+
+        def put(data, key, value):
+            if value:
+                data[key] = value
+            else:
+                data.pop(key, None)
+
+        nice = self.nice_spin.value()
+        if nice == self.nice_spin.minimum():
+            spec.pop('nice', None)
+        else:
+            spec['nice'] = nice
+        io_class = self.ionice_combo.currentData()
+        if io_class != self.ionice_class(spec.get('ionice')):
+            put(spec, 'ionice', io_class)
+        put(spec, 'affinity', self.affinity_edit.text().strip())
+        boost = spec.get('boost')
+        seconds = self.boost_spin.value()
+        put(spec, 'boost', dict(boost, seconds=seconds) if isinstance(boost, dict) and seconds else seconds)
+        cgroup = dict(spec.get('cgroup') or {})
+        put(cgroup, 'cpu_max', self.cpu_spin.value())
+        put(cgroup, 'memory_max_mb', self.memory_spin.value())
+        put(spec, 'cgroup', cgroup)
+        return spec or None
+
+
 class AddProgramDialog(QDialog):
-    def __init__(self, parent=None):
+    pathChecked = Signal(str, str)
+
+    def __init__(self, parent=None, validator=None):
         super().__init__(parent)
         self.setWindowTitle("添加程序")
+        self.validator = validator or PathValidator()
+        self.pathChecked.connect(self.on_path_checked)
         
         # 设置无边框窗口
         self.setWindowFlag(Qt.FramelessWindowHint)
@@ -69,6 +344,9 @@ class AddProgramDialog(QDialog):
         self.delay_spin.setValue(0)
         self.layout.addRow("延迟时间(秒):", self.delay_spin)
 
+        # 资源限制（默认收起）
+        self.create_resource_fields(None)
+
         # 错误提示
         self.error_label = QLabel()
         self.error_label.setStyleSheet("color: red;")
@@ -97,6 +375,18 @@ class AddProgramDialog(QDialog):
         # 设置对话框尺寸
         self.resize(400, 300)  # 设置固定尺寸
 
+    def create_resource_fields(self, resources):
+        self.resource_check = QCheckBox("资源限制")
+        self.resource_check.setChecked(bool(resources))
+        self.resource_fields = ResourceFields(resources)
+        self.resource_fields.setVisible(bool(resources))
+        self.resource_check.toggled.connect(self.resource_fields.setVisible)
+        self.layout.addRow(self.resource_check)
+        self.layout.addRow(self.resource_fields)
+
+    def get_resources(self):
+        return self.resource_fields.get_spec() if self.resource_check.isChecked() else None
+
     def create_custom_title_bar(self):
         # 创建自定义标题栏
         self.title_bar = QWidget()
@@ -160,11 +450,31 @@ class AddProgramDialog(QDialog):
     def validate_and_accept(self):
         # 1. 从输入框获取并清理文本
         path = self.path_edit.text().strip()
-        name = self.name_edit.text().strip()
+        if not path:
+            self.error_label.setText("程序路径无效或不存在，请重新选择")
+            return
+
+        # 2. 路径检查在后台线程中进行，网络路径不会卡住界面
+        status = self.validator.cached(path)
+        if status is None:
+            self.error_label.setText("正在检查路径...")
+            self.validator.submit([path], self.pathChecked.emit)
+            return
+        self.finish_validation(path, status)
+
+    def on_path_checked(self, path, status):
+        if self.isVisible() and path == self.path_edit.text().strip():
+            self.finish_validation(path, status)
 
-        if not path or not os.path.exists(path):
+    def finish_validation(self, path, status):
+        name = self.name_edit.text().strip()
+        if status == PATH_MISSING:
             self.error_label.setText("程序路径无效或不存在，请重新选择")
             return
+        error = self.resource_fields.validate() if self.resource_check.isChecked() else None
+        if error:
+            self.error_label.setText(error)
+            return
 
         if not name:
             file_name = os.path.basename(path)
@@ -182,9 +492,13 @@ class AddProgramDialog(QDialog):
         )
 
 class EditProgramDialog(QDialog):
-    def __init__(self, name, path, delay, parent=None):
+    pathChecked = Signal(str, str)
+
+    def __init__(self, name, path, delay, parent=None, validator=None, resources=None):
         super().__init__(parent)
         self.setWindowTitle("编辑程序")
+        self.validator = validator or PathValidator()
+        self.pathChecked.connect(self.on_path_checked)
         
         # 设置无边框窗口
         self.setWindowFlag(Qt.FramelessWindowHint)
@@ -227,12 +541,20 @@ class EditProgramDialog(QDialog):
         self.delay_spin.setValue(int(delay))
         self.layout.addRow("延迟时间(秒):", self.delay_spin)
 
+        # 资源限制（已设置时展开）
+        self.create_resource_fields(resources)
+
+        # 错误提示
+        self.error_label = QLabel()
+        self.error_label.setStyleSheet("color: red;")
+        self.layout.addRow(self.error_label)
+
         # 按钮
         self.button_box = QHBoxLayout()
         ok_btn = QPushButton("确定")
         cancel_btn = QPushButton("取消")
         
-        ok_btn.clicked.connect(self.accept)
+        ok_btn.clicked.connect(self.validate_and_accept)
         cancel_btn.clicked.connect(self.reject)
         
         self.button_box.addStretch()
@@ -250,6 +572,18 @@ class EditProgramDialog(QDialog):
         # 设置对话框尺寸
         self.resize(400, 300)  # 设置固定尺寸
 
+    def create_resource_fields(self, resources):
+        self.resource_check = QCheckBox("资源限制")
+        self.resource_check.setChecked(bool(resources))
+        self.resource_fields = ResourceFields(resources)
+        self.resource_fields.setVisible(bool(resources))
+        self.resource_check.toggled.connect(self.resource_fields.setVisible)
+        self.layout.addRow(self.resource_check)
+        self.layout.addRow(self.resource_fields)
+
+    def get_resources(self):
+        return self.resource_fields.get_spec() if self.resource_check.isChecked() else None
+
     def create_custom_title_bar(self):
         # 创建自定义标题栏
         self.title_bar = QWidget()
@@ -310,36 +644,363 @@ class EditProgramDialog(QDialog):
         if path:
             self.path_edit.setText(path)
 
+    def validate_and_accept(self):
+        path = self.path_edit.text().strip()
+        status = self.validator.cached(path) if path else PATH_MISSING
+        if status is None:
+            self.error_label.setText("正在检查路径...")
+            self.validator.submit([path], self.pathChecked.emit)
+            return
+        self.finish_validation(path, status)
+
+    def on_path_checked(self, path, status):
+        if self.isVisible() and path == self.path_edit.text().strip():
+            self.finish_validation(path, status)
+
+    def finish_validation(self, path, status):
+        if status == PATH_MISSING:
+            self.error_label.setText("程序路径不存在，请重新选择")
+            return
+        error = self.resource_fields.validate() if self.resource_check.isChecked() else None
+        if error:
+            self.error_label.setText(error)
+            return
+        self.error_label.setText("")
+        self.accept()
+
     def get_data(self):
         return (
             self.name_edit.text(),
-            self.path_edit.text(),
+            self.path_edit.text().strip(),
             str(self.delay_spin.value())
         )
 
-class ProgramTableWidget(QTableWidget):
+class OptimizeDialog(QDialog):
+    # 预览启动顺序优化的结果：各程序的建议延迟和预计就绪时刻，以及优化前后的预计总耗时
+    def __init__(self, rows, result, columns, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("优化启动顺序")
+        layout = QVBoxLayout(self)
+
+        summary = f"当前预计总耗时: {result.current.makespan:.1f} 秒"
+        if result.programs is not None:
+            summary += f"\n优化后预计总耗时: {result.proposed.makespan:.1f} 秒"
+        else:
+            summary += f"\n{result.message}"
+        layout.addWidget(QLabel(summary))
+
+        table = QTableWidget(len(rows), len(columns))
+        table.setHorizontalHeaderLabels(list(columns))
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(value))
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(table)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Cancel)
+        if result.programs is not None:
+            buttons.addButton("应用", QDialogButtonBox.AcceptRole)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.resize(640, 420)
+
+
+class SimulationPane(QDialog):
+    # 模拟启动的预览：显示虚拟时钟上的启动时间线；不阻塞主窗口，修改列表后可重新模拟。
+    # run() 在界面线程中调用，返回在后台线程中运行、返回时间线文本的函数
+    simulated = Signal(str)
+
+    def __init__(self, run, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("模拟启动")
+        self.run = run
+        self.running = False
+        self.simulated.connect(self.on_simulated)
+        layout = QVBoxLayout(self)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.text)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        self.refresh_btn = buttons.addButton("重新模拟", QDialogButtonBox.ActionRole)
+        self.refresh_btn.clicked.connect(self.refresh)
+        buttons.rejected.connect(self.close)
+        layout.addWidget(buttons)
+        self.resize(640, 480)
+
+    def refresh(self):
+        if self.running:
+            return
+        job = self.run()
+        self.running = True
+        self.refresh_btn.setEnabled(False)
+        self.text.setPlainText("正在模拟...")
+        threading.Thread(target=self.run_job, args=(job,), daemon=True).start()
+
+    def run_job(self, job):
+        try:
+            text = job()
+        except Exception as e:
+            traceback.print_exc()
+            text = f"模拟出错: {e}"
+        self.simulated.emit(text)
+
+    def on_simulated(self, text):
+        self.running = False
+        self.refresh_btn.setEnabled(True)
+        self.text.setPlainText(text)
+
+
+class ProgramTableModel(QAbstractTableModel):
+    # 程序列表的数据模型，数据保存在 ProgramRecord 列表中。
+    # 搜索时表格只显示匹配的条目 (filtered)，行号都是显示的行号；records 始终是完整列表，保存和启动都使用它
+    COLUMNS = ["程序名称", "延迟 (秒)", "状态"]
+    indexBuilt = Signal(object)
+    # PySide6 每次读取 Qt.XxxRole 都要几微秒，data 每次重绘要调用上千次，先取好
+    DISPLAY_ROLE = Qt.DisplayRole
+    ALIGNMENT_ROLE = Qt.TextAlignmentRole
+    FOREGROUND_ROLE = Qt.ForegroundRole
+    TOOLTIP_ROLE = Qt.ToolTipRole
+    USER_ROLE = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.path_status = {}  # 后台路径检查的结果
+        self.run_status = {}  # 守护中的程序的运行状态，按名称
+        self.filter_text = ''
+        self.filtered = None  # 搜索中显示的条目，按在完整列表中的顺序；不搜索时为 None
+        self.search_index = None  # 界面显示后在后台建立，之后随增删改更新
+        self._index_building = False
+        self._source_rows = None  # 条目 -> 在完整列表中的行号，列表结构变化后重新建立
+        self.indexBuilt.connect(self.on_index_built)
+
+    def visible_records(self):
+        return self.records if self.filtered is None else self.filtered
+
+    def source_row(self, record):
+        if self._source_rows is None:
+            self._source_rows = {record: row for row, record in enumerate(self.records)}
+        return self._source_rows[record]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.visible_records())
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.record(index.row())
+        if role == self.DISPLAY_ROLE:
+            if index.column() == 0:
+                return record.name
+            if index.column() == 1:
+                return str(record.delay)
+            return self.run_status.get(record.name, '')
+        if role == self.ALIGNMENT_ROLE and index.column() == 1:
+            return Qt.AlignCenter
+        if role == self.FOREGROUND_ROLE:
+            status = self.path_status.get(record.path, PATH_OK)
+            if status == PATH_MISSING:
+                return QColor("#ff6b6b")
+            if status != PATH_OK:
+                return QColor("#ffb86c")
+            return None
+        if role == self.TOOLTIP_ROLE:
+            message = STATUS_MESSAGES.get(self.path_status.get(record.path, PATH_OK))
+            return f"{record.path}\n{message}" if message else record.path
+        if role == self.USER_ROLE:
+            return record.path
+        return None
+
+    def set_path_status(self, path, status):
+        if self.path_status.get(path) == status:
+            return
+        self.path_status[path] = status
+        last_column = self.columnCount() - 1
+        for row, record in enumerate(self.visible_records()):
+            if record.path == path:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+
+    def set_run_status(self, name, text):
+        if text:
+            self.run_status[name] = text
+        else:
+            self.run_status.pop(name, None)
+        for row, record in enumerate(self.visible_records()):
+            if record.name == name:
+                self.dataChanged.emit(self.index(row, 2), self.index(row, 2))
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled  # 允许拖放到列表空白处
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled | Qt.ItemIsDropEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def record(self, row):
+        return self.visible_records()[row]
+
+    def prepare_search(self):
+        # 在后台线程建立搜索索引，建立期间列表的增删改在完成后补上
+        if self.search_index is not None or self._index_building:
+            return
+        self._index_building = True
+        records = tuple(self.records)
+        threading.Thread(target=lambda: self.indexBuilt.emit(ProgramIndex(records)), daemon=True).start()
+
+    def on_index_built(self, index):
+        self._index_building = False
+        index.sync(self.records)
+        self.search_index = index
+        if self.filter_text.strip():
+            self.set_filter(self.filter_text)
+
+    def set_filter(self, text):
+        # 只处理索引给出的候选条目，不逐行检查整个列表；索引还没建好时等建好后再过滤
+        self.filter_text = text
+        if self.search_index is None:
+            self.prepare_search()
+            if text.strip():
+                return
+        matches = self.search_index.search(text) if self.search_index is not None else None
+        self.beginResetModel()
+        self.filtered = None if matches is None else sorted(matches, key=self.source_row)
+        self.endResetModel()
+
+    def matches_filter(self, records):
+        # 搜索中新加入的条目只显示匹配的
+        if self.filtered is None:
+            return records
+        matches = self.search_index.search(self.filter_text)
+        return [record for record in records if record in matches]
+
+    def set_records(self, records):
+        self.beginResetModel()
+        self.records = list(records)
+        self._source_rows = None
+        if self.search_index is not None:
+            self.search_index.sync(self.records)
+        if self.filtered is not None:
+            self.filtered = sorted(self.search_index.search(self.filter_text), key=self.source_row)
+        self.endResetModel()
+
+    def add_records(self, records):
+        records = list(records)
+        if not records:
+            return
+        if self.search_index is not None:
+            for record in records:
+                self.search_index.add(record)
+        visible = self.matches_filter(records)
+        first = self.rowCount()
+        if visible:
+            self.beginInsertRows(QModelIndex(), first, first + len(visible) - 1)
+        if self._source_rows is not None:
+            self._source_rows.update((record, len(self.records) + i) for i, record in enumerate(records))
+        self.records.extend(records)
+        if self.filtered is not None:
+            self.filtered.extend(visible)
+        if visible:
+            self.endInsertRows()
+
+    def add_record(self, record):
+        self.add_records([record])
+
+    def update_record(self, row, record):
+        # 编辑后不再匹配的条目也留在当前的搜索结果中，修改搜索内容后才消失
+        old = self.record(row)
+        source_row = self.source_row(old)
+        self.records[source_row] = record
+        if self._source_rows is not None:
+            del self._source_rows[old]
+            self._source_rows[record] = source_row
+        if self.filtered is not None:
+            self.filtered[row] = record
+        if self.search_index is not None:
+            self.search_index.replace(old, record)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def remove_record(self, row):
+        record = self.record(row)
+        source_row = self.source_row(record)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.records[source_row]
+        self._source_rows = None
+        if self.filtered is not None:
+            del self.filtered[row]
+        if self.search_index is not None:
+            self.search_index.remove(record)
+        self.endRemoveRows()
+
+    def move_record(self, source_row, target_row):
+        # target_row 为移动前的插入位置（移到该行之前），与 beginMoveRows 的约定一致；
+        # 搜索中按显示的行号拖动，在完整列表中移到目标条目之前（拖到末尾时移到最后一个显示的条目之后）
+        if target_row in (source_row, source_row + 1):
+            return False
+        visible = self.visible_records()
+        record = visible[source_row]
+        if target_row < len(visible):
+            full_target = self.source_row(visible[target_row])
+        else:
+            full_target = self.source_row(visible[-1]) + 1
+        full_source = self.source_row(record)
+        if not self.beginMoveRows(QModelIndex(), source_row, source_row, QModelIndex(), target_row):
+            return False
+        self.records.pop(full_source)
+        self.records.insert(full_target - 1 if full_target > full_source else full_target, record)
+        self._source_rows = None
+        if self.filtered is not None:
+            self.filtered.pop(source_row)
+            self.filtered.insert(target_row - 1 if target_row > source_row else target_row, record)
+        self.endMoveRows()
+        return True
+
+    def to_programs(self):
+        return [record.to_dict() for record in self.records]
+
+
+class ProgramTableView(QTableView):
     itemDropped = Signal()
+    pathsDropped = Signal(list)
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setModel(ProgramTableModel(self))
         self.setAcceptDrops(True)
-        self.setDragDropMode(QTableWidget.InternalMove)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setDropIndicatorShown(True)
+        self.setDragDropMode(QAbstractItemView.InternalMove)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
         
-        self.setColumnCount(2)
-        self.setHorizontalHeaderLabels(["程序名称", "延迟 (秒)"])
         self.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        # 按内容调整列宽时只测量可见的行；默认会测量前 1000 行，列表很长时每次搜索或重置都要逐行取数据
+        self.horizontalHeader().setResizeContentsPrecision(0)
         self.verticalHeader().setVisible(False) # 隐藏行号
         
         # 允许行拖放
         self.setDragEnabled(True)
         self.setDropIndicatorShown(True)
         self.setDragDropOverwriteMode(False)
-        self.setSelectionMode(QTableWidget.SingleSelection)
-        self.setEditTriggers(QTableWidget.NoEditTriggers) # 禁止编辑
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers) # 禁止编辑
 
+    def current_row(self):
+        return self.currentIndex().row()
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -355,72 +1016,43 @@ class ProgramTableWidget(QTableWidget):
 
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
-            for url in event.mimeData().urls():
-                file_path = url.toLocalFile()
-                if os.path.isfile(file_path) and file_path.endswith('.exe'):
-                    name = os.path.basename(file_path)
-                    self.add_program_item(name, file_path, "0")
+            # 拖入的文件和文件夹交给主窗口在后台扫描
+            paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
             event.acceptProposedAction()
-            self.itemDropped.emit()
+            if paths:
+                self.pathsDropped.emit(paths)
             return
 
-        if not (isinstance(event.source(), ProgramTableWidget) and event.source() is self):
+        if event.source() is not self:
             return
 
-        source_row = self.currentRow()
-        target_index = self.indexAt(event.position().toPoint())
-        target_row = target_index.row()
+        source_row = self.current_row()
+        target_row = self.indexAt(event.position().toPoint()).row()
 
         indicator = self.dropIndicatorPosition()
         if target_row == -1:
-            if indicator == QAbstractItemView.DropIndicatorPosition.OnViewport:
-                target_row = self.rowCount()
+            if indicator != QAbstractItemView.DropIndicatorPosition.OnViewport:
+                return
+            target_row = self.model().rowCount()
         elif indicator == QAbstractItemView.DropIndicatorPosition.BelowItem:
             target_row += 1
 
-        if source_row == target_row or source_row + 1 == target_row:
+        # 行移动由模型的 beginMoveRows 完成，不重建单元格；自行处理后忽略默认的拖放行为
+        event.setDropAction(Qt.IgnoreAction)
+        event.accept()
+        if not self.model().move_record(source_row, target_row):
             return
 
-        self.blockSignals(True)
-        
-        taken_items = []
-        for i in range(self.columnCount()):
-            taken_items.append(self.takeItem(source_row, i))
-
-        self.removeRow(source_row)
-        
         if source_row < target_row:
             target_row -= 1
-            
-        self.insertRow(target_row)
-        for i, item in enumerate(taken_items):
-            self.setItem(target_row, i, item)
-            
-        self.blockSignals(False)
-        self.setCurrentCell(target_row, 0)
+        self.setCurrentIndex(self.model().index(target_row, 0))
         self.itemDropped.emit()
 
-    def add_program_item(self, name, path, delay):
-        row_position = self.rowCount()
-        self.insertRow(row_position)
-        
-        name_item = QTableWidgetItem(name)
-        name_item.setData(Qt.UserRole, path) # 将路径存在第一个单元格的 UserRole 中
-        
-        delay_item = QTableWidgetItem(str(delay))
-        delay_item.setTextAlignment(Qt.AlignCenter)
-
-        self.setItem(row_position, 0, name_item)
-        self.setItem(row_position, 1, delay_item)
-
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("FastStart")
         
-        # 设置应用程序图标
-        self.setWindowIcon(QIcon('assets/images/app.png'))
-        
         # 创建自定义标题栏
         self.create_title_bar()
         
@@ -434,6 +1066,7 @@ class MainWindow(QMainWindow):
         
         # 加载样式表
         self.load_stylesheet()
+        profiler.mark('加载样式表')
         
         # 创建主窗口容器
         main_widget = QWidget()
@@ -443,12 +1076,27 @@ class MainWindow(QMainWindow):
         splitter = QSplitter(Qt.Horizontal)
         
         # 左侧面板（支持拖放）
-        self.left_panel = ProgramTableWidget()
-        # self.left_panel.itemChanged.connect(self.save_programs) # QTableWidget 没有 itemChanged 信号，拖放后由 itemDropped 触发保存
+        self.left_panel = ProgramTableView()
+        self.program_model = self.left_panel.model()
         # 绑定双击事件
-        self.left_panel.itemDoubleClicked.connect(self.edit_selected_program)
+        self.left_panel.doubleClicked.connect(self.edit_selected_program)
         # 绑定拖放完成信号
         self.left_panel.itemDropped.connect(self.save_programs)
+        self.left_panel.pathsDropped.connect(self.import_paths)
+
+        # 搜索框：按名称、路径、标签过滤列表，Ctrl+F 定位到搜索框
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索名称、路径或标签")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setFixedHeight(32)
+        self.search_edit.textChanged.connect(self.filter_programs)
+        QShortcut(QKeySequence.Find, self, activated=self.search_edit.setFocus)
+        left_widget = QWidget()
+        left_layout = QVBoxLayout(left_widget)
+        left_layout.setSpacing(0)
+        left_layout.setContentsMargins(0, 0, 0, 0)
+        left_layout.addWidget(self.search_edit)
+        left_layout.addWidget(self.left_panel)
         
         # 右侧按钮面板
         right_button_panel = QWidget()
@@ -459,20 +1107,39 @@ class MainWindow(QMainWindow):
         launch_btn.setFixedHeight(40)
         launch_btn.clicked.connect(self.launch_all_programs)
         
+        # 启动方案选择（start.json 中定义了 profiles 时才显示）
+        self.profile_combo = QComboBox()
+        self.profile_combo.setFixedHeight(40)
+        self.profile_combo.setToolTip("启动方案")
+        self.profile_combo.setVisible(False)
+        
         add_btn = QPushButton("添加程序")
+        import_btn = QPushButton("导入文件夹")
         edit_btn = QPushButton("编辑程序")
         delete_btn = QPushButton("删除程序")
+        optimize_btn = QPushButton("优化顺序")
+        simulate_btn = QPushButton("模拟启动")
+        trace_btn = QPushButton("导出时间线")
         
         # 设置按钮固定高度
         add_btn.setFixedHeight(40)
+        import_btn.setFixedHeight(40)
         edit_btn.setFixedHeight(40)
         delete_btn.setFixedHeight(40)
+        optimize_btn.setFixedHeight(40)
+        simulate_btn.setFixedHeight(40)
+        trace_btn.setFixedHeight(40)
         
         # 添加按钮到布局（按垂直顺序）
         right_layout.addWidget(launch_btn)
+        right_layout.addWidget(self.profile_combo)
         right_layout.addWidget(add_btn)
+        right_layout.addWidget(import_btn)
         right_layout.addWidget(edit_btn)
         right_layout.addWidget(delete_btn)
+        right_layout.addWidget(optimize_btn)
+        right_layout.addWidget(simulate_btn)
+        right_layout.addWidget(trace_btn)
         
         # 添加定时启动控件
         right_layout.addStretch() # 添加一个伸缩项
@@ -498,7 +1165,7 @@ class MainWindow(QMainWindow):
         right_button_panel.setLayout(right_layout)
         
         # 添加到分割器
-        splitter.addWidget(self.left_panel)
+        splitter.addWidget(left_widget)
         splitter.addWidget(right_button_panel)
         
         # 设置默认分割比例
@@ -526,10 +1193,15 @@ class MainWindow(QMainWindow):
 
         # 绑定按钮和复选框的点击事件
         add_btn.clicked.connect(self.add_program)
+        import_btn.clicked.connect(self.choose_import_folder)
         edit_btn.clicked.connect(self.edit_selected_program)
         delete_btn.clicked.connect(self.delete_selected_program)
+        optimize_btn.clicked.connect(self.optimize_programs)
+        simulate_btn.clicked.connect(self.show_simulation)
+        trace_btn.clicked.connect(self.export_trace)
         self.schedule_btn.clicked.connect(self.toggle_schedule)
         self.exit_after_launch_checkbox.stateChanged.connect(self.save_programs)
+        self.profile_combo.currentIndexChanged.connect(self.on_profile_selected)
         
         # 设置窗口标志
         self.setWindowFlags(Qt.Window | Qt.FramelessWindowHint)
@@ -539,39 +1211,163 @@ class MainWindow(QMainWindow):
         
         # 初始化定时启动状态
         self.is_schedule_enabled = False
-        self.scheduled_launch_triggered_today = False
-        self.last_check_date = QDate.currentDate()
-        
-        # 创建用于检查计划的定时器
+        self.schedule_engine = None
+
+        # 启动线程状态
+        self.config_data = {}
+        self.launch_scheduler = None
+        self.launch_samples = []  # 最近一次启动期间的系统负载采样，导出时间线用
+        self.launch_profile = None
+        self.launch_thread = None
+        self.launch_signals = LaunchSignals(self)
+        self.launch_signals.message.connect(self.statusBar.showMessage)
+        self.launch_signals.finished.connect(self.on_launch_finished)
+        # 启动计划：方案内容没有变化时复用上次编译的结果
+        self.plan_cache = PlanCache(plan_cache_path(CONFIG_FILE))
+
+        # 进程守护：配置了 restart 的程序退出后按退避策略重新启动，由退出事件驱动，不轮询
+        self.supervisor = None
+        self.child_watcher = ChildWatcher(self.on_child_exited, self)
+
+        # 运行指标：配置了 metrics 时累加启动和守护的统计，写入 textfile 或在本机端口提供
+        self.metrics = None
+        self.metrics_server = None
+        self.schedule_next_fire = None
+
+        # 批量导入：后台扫描，分批插入表格
+        self.import_thread = None
+        self.simulation_pane = None
+        self.import_found = 0
+        self.import_signals = ImportSignals(self)
+        self.import_signals.batch.connect(self.on_import_batch)
+        self.import_signals.finished.connect(self.on_import_finished)
+
+        # 优化启动顺序：要模拟几十次，在后台线程中计算，完成后再显示预览
+        self.optimize_thread = None
+        self.optimize_signals = OptimizeSignals(self)
+        self.optimize_signals.finished.connect(self.on_optimize_finished)
+        self.optimize_signals.failed.connect(lambda message: self.statusBar.showMessage(message, 5000))
+
+        # 配置保存：短时间内的多次修改合并为一次，在后台线程原子写入
+        self.config_writer = ConfigWriter(CONFIG_FILE)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(300)
+        self.save_timer.timeout.connect(self.flush_save)
+        self.save_signals = SaveSignals(self)
+        self.save_signals.finished.connect(self.on_config_saved)
+
+        # 路径检查：加载后在后台并发检查所有路径，结果缓存供表格标记和启动使用
+        self.path_validator = PathValidator()
+        self.path_signals = PathSignals(self)
+        self.path_signals.checked.connect(self.program_model.set_path_status)
+        QApplication.instance().aboutToQuit.connect(self.flush_pending_save)
+        
+        # 定时启动：按下一次触发时间设置单次精确定时器，不再每 5 秒轮询
         self.schedule_timer = QTimer(self)
+        self.schedule_timer.setSingleShot(True)
+        self.schedule_timer.setTimerType(Qt.PreciseTimer)
         self.schedule_timer.timeout.connect(self.check_schedule)
-        self.schedule_timer.start(5000) # 每5秒检查一次
+        self.schedule_time_edit.timeChanged.connect(self.on_schedule_time_changed)
+        profiler.mark('构建窗口')
         
+        self.tray_icon = None
+        self.tray_profile_menu = None
         self.load_programs()
+        profiler.mark('加载程序列表')
         
-        # 初始化系统托盘图标
+        # 托盘图标和标题栏图标在首次绘制之后再创建，先让程序列表显示出来
+        self.startup_finished = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.startup_finished:
+            self.startup_finished = True
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        profiler.mark('首次绘制')
+        # 设置应用程序图标
+        self.setWindowIcon(iconcache.icon(iconcache.APP_ICON))
+        self.load_title_icons()
         self.create_tray_icon()
+        profiler.mark('图标和托盘')
+        self.start_instance_server()
+        profiler.mark('单实例监听')
+        self.start_metrics_server()
+        self.program_model.prepare_search()
+        profiler.report()
 
     def create_tray_icon(self):
         self.tray_icon = QSystemTrayIcon(self)
-        self.tray_icon.setIcon(QIcon('assets/images/app.png'))
+        self.tray_icon.setIcon(iconcache.icon(iconcache.APP_ICON))
         
         show_action = QAction("显示", self)
+        launch_action = QAction("启动程序", self)
         quit_action = QAction("退出", self)
         
         show_action.triggered.connect(self.show)
+        launch_action.triggered.connect(self.launch_all_programs)
         quit_action.triggered.connect(QApplication.quit)
         
-        tray_menu = QMenu()
-        tray_menu.addAction(show_action)
-        tray_menu.addAction(quit_action)
+        self.tray_menu = QMenu(self)
+        self.tray_menu.addAction(show_action)
+        self.tray_menu.addAction(launch_action)
+        self.tray_profile_menu = self.tray_menu.addMenu("启动方案")
+        self.tray_menu.addAction(quit_action)
+        self.update_profile_ui()
         
-        self.tray_icon.setContextMenu(tray_menu)
+        self.tray_icon.setContextMenu(self.tray_menu)
         self.tray_icon.show()
         
         # 连接双击事件
         self.tray_icon.activated.connect(self.on_tray_icon_activated)
 
+    def start_instance_server(self):
+        self.instance_server = InstanceServer(self.handle_instance_command, self)
+        if not self.instance_server.listen():
+            # 几乎同时启动了两个界面，保留先启动的那个
+            send_command('show')
+            QTimer.singleShot(0, QApplication.quit)
+
+    def handle_instance_command(self, request):
+        # 处理 FastStart.py --launch / --show / --status 转发过来的命令
+        command = request.get('command')
+        if command not in COMMANDS:
+            return {'ok': False, 'message': f"未知命令: {command}"}
+        if command == 'show':
+            self.showNormal()
+            self.raise_()
+            self.activateWindow()
+            return {'ok': True, 'message': "已显示窗口"}
+        if command == 'status':
+            return {'ok': True, 'pid': os.getpid(), 'profile': self.current_profile(),
+                    'programs': len(self.program_model.records), 'launching': self.is_launching(),
+                    'schedule': self.status_schedule_label.text(), 'message': self.statusBar.currentMessage()}
+        if command == 'launch':
+            profile = request.get('profile')
+            if profile and profile not in profile_names(self.config_data):
+                return {'ok': False, 'message': f"未找到启动方案: {profile}"}
+            if self.is_launching():
+                return {'ok': False, 'message': "正在启动中，请稍候"}
+            self.statusBar.showMessage("启动中... 准备开始")
+            self.start_launch_session(profile)
+            return {'ok': True, 'message': f"已交给正在运行的 FastStart 启动 (方案: {profile or self.current_profile() or '默认方案'})"}
+        if command == 'import':
+            if self.import_thread is not None and self.import_thread.is_alive():
+                return {'ok': False, 'message': "正在导入，请稍候"}
+            self.import_paths(request.get('paths', []))
+            return {'ok': True, 'message': "已交给正在运行的 FastStart 导入"}
+
+    def start_metrics_server(self):
+        if self.metrics is None:
+            return
+        from metrics import start_metrics_server
+        try:
+            self.metrics_server = start_metrics_server(self.metrics, self.config_data)
+        except (OSError, ValueError) as e:
+            self.statusBar.showMessage(f"运行指标端口无法监听: {e}", 5000)
+
     def on_tray_icon_activated(self, reason):
         if reason == QSystemTrayIcon.DoubleClick:
             self.showNormal()
@@ -591,16 +1387,6 @@ class MainWindow(QMainWindow):
         self.title_icon = QLabel()
         self.title_icon.setObjectName("titleIcon")
         
-        # 加载图标
-        try:
-            from PySide6.QtGui import QPixmap
-            icon = QPixmap('assets/images/app.png')
-            self.title_icon.setPixmap(icon.scaled(24, 24, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        except Exception as e:
-            print(f"加载图标失败: {str(e)}")
-            self.title_icon.setText("F")
-            self.title_icon.setStyleSheet("color: #ffffff; font-size: 18px; font-weight: bold;")
-        
         self.title_icon.setFixedWidth(36)
         self.title_icon.setFixedHeight(36)
         self.title_icon.setAlignment(Qt.AlignCenter)
@@ -619,22 +1405,6 @@ class MainWindow(QMainWindow):
         self.pin_button.setChecked(False)
         self.pin_button.clicked.connect(self.toggle_pin)
         
-        # 加载置顶图标
-        try:
-            from PySide6.QtGui import QPixmap
-            pin_icon = QPixmap('assets/images/pin.png')
-            if pin_icon.isNull():
-                raise Exception("图片加载失败或为空")
-            self.pin_button.setIcon(QIcon(pin_icon))
-            self.pin_button.setIconSize(pin_icon.size())
-        except Exception as e:
-            print(f"加载置顶图标失败: {str(e)}")
-            # 优雅降级：使用文字图标
-            self.pin_button.setText("📌")
-            self.pin_button.setStyleSheet("font-size: 18px; font-weight: bold;")
-            # 显示友好提示
-            self.statusBar.showMessage("置顶图标加载失败，请检查assets/images/pin.png是否存在", 5000)
-        
         # 创建最小化按钮
         self.minimize_button = QPushButton("—")
         self.minimize_button.setObjectName("minimizeButton")
@@ -674,6 +1444,29 @@ class MainWindow(QMainWindow):
         # 用于拖动窗口
         self.drag_position = QPoint()
 
+    def load_title_icons(self):
+        # 加载标题栏图标（首次绘制之后调用）
+        icon = iconcache.pixmap(iconcache.APP_ICON, 24)
+        if icon.isNull():
+            print(f"加载图标失败: {iconcache.APP_ICON}")
+            self.title_icon.setText("F")
+            self.title_icon.setStyleSheet("color: #ffffff; font-size: 18px; font-weight: bold;")
+        else:
+            self.title_icon.setPixmap(icon)
+
+        # 加载置顶图标
+        pin_icon = iconcache.pixmap(iconcache.PIN_ICON)
+        if pin_icon.isNull():
+            print("加载置顶图标失败: 图片加载失败或为空")
+            # 优雅降级：使用文字图标
+            self.pin_button.setText("📌")
+            self.pin_button.setStyleSheet("font-size: 18px; font-weight: bold;")
+            # 显示友好提示
+            self.statusBar.showMessage("置顶图标加载失败，请检查assets/images/pin.png是否存在", 5000)
+        else:
+            self.pin_button.setIcon(iconcache.icon(iconcache.PIN_ICON))
+            self.pin_button.setIconSize(pin_icon.size())
+
     def toggle_pin(self):
         # 切换窗口置顶状态
         self.is_pinned = not self.is_pinned
@@ -692,11 +1485,8 @@ class MainWindow(QMainWindow):
         # 重新设置窗口
         self.show()  # 必须调用show()使窗口标志生效
         
-        # 更新状态栏提示
+        # 更新状态栏提示（只改变窗口标志，标题栏和图标保持不变）
         self.statusBar.showMessage("窗口置顶: " + ("开启" if self.is_pinned else "关闭"), 2000)
-        
-        # 保持原有的拖动窗口功能
-        self.create_title_bar()  # 重新创建标题栏以保持原有功能正常
 
     def mousePressEvent(self, event: QMouseEvent):
         if event.button() == Qt.LeftButton:
@@ -720,218 +1510,559 @@ class MainWindow(QMainWindow):
 
     def load_programs(self):
         try:
-            with open('start.json', 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
-                self.left_panel.setRowCount(0)  # 清空表格
-
-                programs = []
-                # 兼容旧格式 (list) 和新格式 (dict)
-                if isinstance(config_data, dict):
-                    programs = config_data.get('programs', [])
-
-                    # 在设置复选框状态前先阻止信号，防止触发 save_programs
-                    self.exit_after_launch_checkbox.blockSignals(True)
-                    self.exit_after_launch_checkbox.setChecked(config_data.get('exit_after_launch', False))
-                    # 设置完成后再恢复信号
-                    self.exit_after_launch_checkbox.blockSignals(False)
-
-                    schedule_data = config_data.get('schedule', {})
-                    self.is_schedule_enabled = schedule_data.get('enabled', False)
-                    if self.is_schedule_enabled:
-                        time_str = schedule_data.get('time', '00:00:00')
-                        self.schedule_time_edit.setTime(QTime.fromString(time_str, 'HH:mm:ss'))
-                    self.update_schedule_ui()
-                elif isinstance(config_data, list):
-                    programs = config_data
-
-                for item_data in programs:
-                    name = item_data['name']
-                    path = item_data['path']
-                    delay = item_data['delay']
-                    self.left_panel.add_program_item(name, path, delay)
+            # 兼容旧格式 (list) 和新格式 (dict) 由 load_config 统一处理
+            config_data = load_config(CONFIG_FILE)
         except FileNotFoundError:
-            pass
+            return
 
-    def save_programs(self):
-        programs = []
-        for i in range(self.left_panel.rowCount()):
-            name_item = self.left_panel.item(i, 0)
-            delay_item = self.left_panel.item(i, 1)
+        self.config_data = config_data
+        programs = config_data.get('programs', [])
+        if config_data.get('metrics'):
+            from metrics import create_metrics
+            self.metrics = create_metrics(config_data, CONFIG_FILE)
 
-            if not name_item or not delay_item:
-                continue
+        # 在设置复选框状态前先阻止信号，防止触发 save_programs
+        self.exit_after_launch_checkbox.blockSignals(True)
+        self.exit_after_launch_checkbox.setChecked(config_data.get('exit_after_launch', False))
+        # 设置完成后再恢复信号
+        self.exit_after_launch_checkbox.blockSignals(False)
+
+        schedule_data = config_data.get('schedule', {})
+        self.is_schedule_enabled = schedule_data.get('enabled', False)
+        if self.is_schedule_enabled:
+            time_str = schedule_data.get('time', '00:00:00')
+            self.schedule_time_edit.blockSignals(True)
+            self.schedule_time_edit.setTime(QTime.fromString(time_str, 'HH:mm:ss'))
+            self.schedule_time_edit.blockSignals(False)
+        # 配置了 rules 时以 rules 为准，界面中的时间不再生效
+        self.schedule_time_edit.setEnabled(not schedule_data.get('rules'))
+        if schedule_data.get('rules'):
+            self.schedule_time_edit.setToolTip("已使用 start.json 中的 schedule.rules")
+
+        self.program_model.set_records(ProgramRecord.from_dict(item_data) for item_data in programs)
+        self.validate_paths(record.path for record in self.program_model.records)
+        self.update_profile_ui()
+
+        # 使用上次触发时间初始化，启动时即可补上关机或睡眠期间错过的定时；
+        # 必须在程序列表加载之后检查，否则补启动会启动一个空列表并写入 last_run
+        self.schedule_engine = self.create_schedule_engine()
+        self.check_schedule()
+
+    def current_profile(self):
+        return self.config_data.get('profile') or DEFAULT_PROFILE
+
+    def update_profile_ui(self):
+        # 同步界面下拉框和托盘菜单中的方案列表
+        names = profile_names(self.config_data)
+        current = self.current_profile()
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItem("默认方案", DEFAULT_PROFILE)
+        for name in names:
+            self.profile_combo.addItem(name, name)
+        self.profile_combo.setCurrentIndex(max(self.profile_combo.findData(current), 0))
+        self.profile_combo.blockSignals(False)
+        self.profile_combo.setVisible(bool(names))
+
+        if self.tray_profile_menu is None:
+            return
+        self.tray_profile_menu.clear()
+        self.tray_profile_group = QActionGroup(self)
+        for label, name in [("默认方案", DEFAULT_PROFILE)] + [(name, name) for name in names]:
+            action = self.tray_profile_menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(name == current)
+            action.triggered.connect(lambda checked=False, name=name: self.select_profile(name))
+            self.tray_profile_group.addAction(action)
+        self.tray_profile_menu.menuAction().setVisible(bool(names))
+
+    def on_profile_selected(self, index):
+        self.select_profile(self.profile_combo.itemData(index))
+
+    def select_profile(self, name):
+        if name == self.current_profile():
+            return
+        config_data = dict(self.config_data)
+        if name:
+            config_data['profile'] = name
+        else:
+            config_data.pop('profile', None)
+        self.config_data = config_data
+        self.save_programs()
+        self.update_profile_ui()
+        self.statusBar.showMessage(f"启动方案: {name or '默认方案'}", 3000)
 
-            name = name_item.text()
-            path = name_item.data(Qt.UserRole)
-            delay = delay_item.text() or "0"
+    def validate_paths(self, paths):
+        self.path_validator.submit(list(paths), self.path_signals.checked.emit)
 
-            try:
-                delay_int = int(delay)
-            except (ValueError, TypeError):
-                delay_int = 0
-
-            programs.append({
-                "name": name,
-                "path": path,
-                "delay": delay_int
-            })
-
-        config_data = {
-            "programs": programs,
+    def collect_programs(self):
+        return self.program_model.to_programs()
+
+    def save_programs(self):
+        # 重新计时，连续的拖放、编辑只在最后一次修改 300 毫秒后保存一次
+        self.save_timer.start()
+
+    def flush_save(self):
+        # 以加载时的配置为基础，保留 parallel、groups 等界面未涉及的设置
+        config_data = dict(self.config_data)
+        config_data.update({
+            "programs": self.collect_programs(),
             "exit_after_launch": self.exit_after_launch_checkbox.isChecked(),
-            "schedule": {
-                "enabled": self.is_schedule_enabled,
-                "time": self.schedule_time_edit.time().toString('HH:mm:ss')
-            }
-        }
-        with open('start.json', 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, ensure_ascii=False, indent=4)
-        self.statusBar.showMessage("配置已保存", 2000)
+            "schedule": self.schedule_settings()
+        })
+        self.config_data = config_data
+        signals = self.save_signals
+        self.config_writer.submit(config_data, lambda error: signals.finished.emit('' if error is None else str(error)))
+
+    def on_config_saved(self, error):
+        if error:
+            self.statusBar.showMessage(f"保存配置失败: {error}", 5000)
+        else:
+            self.statusBar.showMessage("配置已保存", 2000)
+
+    def flush_pending_save(self):
+        # 退出前写入尚未保存的修改，并等待写入线程结束
+        if self.save_timer.isActive():
+            self.save_timer.stop()
+            self.flush_save()
+        self.config_writer.close()
+
+    def filter_programs(self, text):
+        # 过滤后尽量保持选中原来的程序
+        current_row = self.left_panel.current_row()
+        current = self.program_model.record(current_row) if current_row >= 0 else None
+        self.program_model.set_filter(text)
+        visible = self.program_model.visible_records()
+        if current is not None and current in visible:
+            self.left_panel.setCurrentIndex(self.program_model.index(visible.index(current), 0))
 
     def add_program(self):
-        dialog = AddProgramDialog(self)
+        dialog = AddProgramDialog(self, self.path_validator)
         if dialog.exec() == QDialog.Accepted:
             # 获取输入数据
             name, path, delay = dialog.get_data()
-            
-            self.left_panel.add_program_item(name, path, delay)
+            resources = dialog.get_resources()
+
+            self.program_model.add_record(ProgramRecord(name, path, delay, {'resources': resources} if resources else None))
+            self.validate_paths([path])
             self.save_programs()
             self.statusBar.showMessage(f"已添加程序: {name}", 3000)
 
-    def edit_selected_program(self, item=None):
-        current_row = self.left_panel.currentRow()
+    def choose_import_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "选择要导入的文件夹")
+        if folder:
+            self.import_paths([folder])
+
+    def import_paths(self, paths):
+        # 在后台线程中递归扫描，找到的程序分批插入表格，全部完成后只保存一次
+        if self.import_thread is not None and self.import_thread.is_alive():
+            self.statusBar.showMessage("正在导入，请稍候", 3000)
+            return
+        scanner = ProgramScanner(paths, [record.path for record in self.program_model.records])
+        self.import_found = 0
+        self.import_thread = threading.Thread(target=self.run_import, args=(scanner,), daemon=True)
+        self.import_thread.start()
+        self.statusBar.showMessage("正在扫描...")
+
+    def run_import(self, scanner):
+        found = scanner.run(self.import_signals.batch.emit)
+        self.import_signals.finished.emit(found, int(scanner.truncated))
+
+    def on_import_batch(self, records):
+        # 扫描时已确认这些文件存在且可执行，不再重新检查路径
+        self.program_model.add_records(records)
+        self.import_found += len(records)
+        self.statusBar.showMessage(f"正在导入... 已找到 {self.import_found} 个程序")
+
+    def on_import_finished(self, found, truncated):
+        if not found:
+            self.statusBar.showMessage("没有找到可以导入的程序", 3000)
+            return
+        self.save_programs()
+        message = f"已导入 {found} 个程序"
+        if truncated:
+            message += "（已达到单次导入上限）"
+        self.statusBar.showMessage(message, 5000)
+
+    def optimize_programs(self):
+        # 根据启动记录预览并应用更快的顺序和延迟（针对列表中的程序和顶层的启动设置）
+        if self.optimize_thread is not None and self.optimize_thread.is_alive():
+            self.statusBar.showMessage("正在计算优化结果，请稍候", 3000)
+            return
+        programs = self.collect_programs()
+        if not programs:
+            self.statusBar.showMessage("列表中没有程序", 3000)
+            return
+        records = list(self.program_model.records)
+        self.optimize_thread = threading.Thread(target=self.run_optimize,
+                                                args=(programs, records, dict(self.config_data)), daemon=True)
+        self.optimize_thread.start()
+        self.statusBar.showMessage("正在计算优化结果...")
+
+    def run_optimize(self, programs, records, config_data):
+        from optimizer import load_history_profiles, optimize
+
+        try:
+            result = optimize(programs, config_data, load_history_profiles(config_data, CONFIG_FILE),
+                              validator=self.path_validator)
+        except Exception as e:
+            traceback.print_exc()
+            self.optimize_signals.failed.emit(f"优化出错: {e}")
+            return
+        self.optimize_signals.finished.emit((programs, records, result))
+
+    def on_optimize_finished(self, outcome):
+        from optimizer import PREVIEW_COLUMNS, preview_rows
+
+        programs, records, result = outcome
+        self.statusBar.clearMessage()
+        dialog = OptimizeDialog(preview_rows(programs, result), result, PREVIEW_COLUMNS, self)
+        if dialog.exec() != QDialog.Accepted or result.programs is None:
+            return
+        if self.program_model.records != records:
+            # 计算期间列表被修改（如导入），结果对应的已不是当前的列表
+            self.statusBar.showMessage("程序列表已修改，请重新优化", 5000)
+            return
+        self.program_model.set_records([ProgramRecord(records[index].name, records[index].path, delay,
+                                                      records[index].extra)
+                                        for index, delay in result.order])
+        self.save_programs()
+        self.statusBar.showMessage(f"已应用优化: {result.message}", 5000)
+
+    def export_trace(self):
+        # 导出最近一次启动（含之后守护的重启）的时间线
+        from trace_export import save_trace, trace_file_name
+
+        scheduler = self.launch_scheduler
+        if scheduler is None or scheduler.finished_at is None:
+            self.statusBar.showMessage("还没有完成的启动可以导出", 3000)
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出启动时间线", trace_file_name(scheduler),
+                                              "Chrome Trace (*.json)")
+        if not path:
+            return
+        try:
+            save_trace(path, scheduler, self.launch_samples, self.supervisor, self.launch_profile)
+        except OSError as e:
+            self.statusBar.showMessage(f"导出失败: {e}", 5000)
+            return
+        self.statusBar.showMessage(f"已导出，可在 ui.perfetto.dev 中打开: {path}", 5000)
+
+    def show_simulation(self):
+        if self.simulation_pane is None:
+            self.simulation_pane = SimulationPane(self.simulate_launch, self)
+        self.simulation_pane.refresh()
+        self.simulation_pane.show()
+        self.simulation_pane.raise_()
+
+    def simulate_launch(self):
+        # 在界面线程取当前列表和选择的方案，模拟本身交给 SimulationPane 在后台线程中运行
+        config_data = dict(self.config_data, programs=self.collect_programs())
+        profile = self.current_profile()
+        return lambda: self.run_simulation(config_data, profile)
+
+    def run_simulation(self, config_data, profile):
+        # 在虚拟时钟上模拟一次启动，返回时间线文本；路径只读取检查缓存（见 simulate.py）
+        from optimizer import WorkloadModel, auto_optimize, load_history_profiles
+        from simulate import format_timeline, simulate
+
+        try:
+            plan, _ = self.plan_cache.get(config_data, profile, self.path_validator)
+        except KeyError as e:
+            return f"未找到启动方案: {e.args[0]}"
+        except ValueError as e:
+            return str(e)
+        programs = auto_optimize(config_data, CONFIG_FILE, plan.programs, plan.settings, self.path_validator)
+        model = WorkloadModel(load_history_profiles(config_data, CONFIG_FILE))
+        result = simulate(programs, plan.settings, model, self.path_validator)
+        return format_timeline(result, plan.profile)
+
+    def edit_selected_program(self, index=None):
+        current_row = self.left_panel.current_row()
         if current_row < 0:
             self.statusBar.showMessage("请先选择要编辑的程序", 3000)
             return
 
         # 获取当前程序信息
-        name_item = self.left_panel.item(current_row, 0)
-        delay_item = self.left_panel.item(current_row, 1)
-
-        name = name_item.text()
-        path = name_item.data(Qt.UserRole)
-        delay = delay_item.text() or "0"
+        record = self.program_model.record(current_row)
         
         # 创建编辑对话框
-        dialog = EditProgramDialog(name, path, delay, self)
+        dialog = EditProgramDialog(record.name, record.path, record.delay, self, self.path_validator,
+                                   record.extra.get('resources'))
         if dialog.exec() == QDialog.Accepted:
-            # 获取更新后的数据
+            # 获取更新后的数据（路径已由对话框在后台检查）
             new_name, new_path, new_delay = dialog.get_data()
-            
-            # 验证路径是否存在
-            if not os.path.exists(new_path):
-                self.statusBar.showMessage("程序路径不存在，请重新选择", 5000)
-                return
 
-            # 更新列表项
-            name_item.setText(new_name)
-            name_item.setData(Qt.UserRole, new_path)
-            delay_item.setText(new_delay)
+            # 更新列表项，保留 after、group 等界面不显示的字段
+            extra = dict(record.extra)
+            resources = dialog.get_resources()
+            if resources:
+                extra['resources'] = resources
+            else:
+                extra.pop('resources', None)
+            self.program_model.update_record(current_row, ProgramRecord(new_name, new_path, new_delay, extra))
+            self.validate_paths([new_path])
             
             # 保存更新
             self.save_programs()
             self.statusBar.showMessage("程序信息已更新", 3000)
 
     def delete_selected_program(self):
-        current_row = self.left_panel.currentRow()
+        current_row = self.left_panel.current_row()
         if current_row < 0:
             self.statusBar.showMessage("请先选择要删除的程序", 3000)
             return
 
         # 显示删除确认对话框
-        program_name = self.left_panel.item(current_row, 0).text()
+        program_name = self.program_model.record(current_row).name
         dialog = DeleteConfirmationDialog(program_name, self)
         if dialog.exec() == QMessageBox.Yes:
             # 从列表中移除
-            self.left_panel.removeRow(current_row)
+            self.program_model.remove_record(current_row)
             # 保存更新
             self.save_programs()
             self.statusBar.showMessage("程序已删除", 3000)
 
-    def launch_selected_program(self, item):
-        current_row = self.left_panel.currentRow()
+    def launch_selected_program(self, index=None):
+        current_row = self.left_panel.current_row()
         if current_row >= 0:
-            program_path = self.left_panel.item(current_row, 0).data(Qt.UserRole)
-            if os.path.exists(program_path):
-                os.startfile(program_path)  # Windows系统
-            else:
+            program_path = self.program_model.record(current_row).path
+            # 只查询缓存，不在界面线程中访问文件系统
+            if self.path_validator.cached(program_path) == PATH_MISSING:
                 self.statusBar.showMessage(f"程序路径不存在: {program_path}", 5000)
+                return
+            from launcher import create_backend, start_program
+            try:
+                handle = start_program(program_path, create_backend(self.config_data))
+            except FileNotFoundError:
+                self.statusBar.showMessage(f"程序路径不存在: {program_path}", 5000)
+                return
+            except OSError as e:
+                self.statusBar.showMessage(f"启动失败: {program_path} ({e})", 5000)
+                return
+            self.child_watcher.reap(handle)
+            self.statusBar.showMessage(f"已启动: {program_path} (PID {handle.pid})", 3000)
+
+    def is_launching(self):
+        return self.launch_thread is not None and self.launch_thread.is_alive()
 
     def launch_all_programs(self):
-        self.current_index = 0
+        if self.is_launching():
+            self.statusBar.showMessage("正在启动中，请稍候", 3000)
+            return
         self.statusBar.showMessage("启动中... 准备开始")
-        QTimer.singleShot(1000, self.launch_next_program)  # 初始延迟1秒
-
-    def launch_next_program(self):
-        if self.current_index >= self.left_panel.rowCount():
-            self.current_index = 0
+        QTimer.singleShot(1000, self.start_launch_session)  # 初始延迟1秒
+
+    def start_launch_session(self, profile=None):
+        # 启动计划的编译和调度器都在后台线程中运行，界面线程只接收进度信号
+        config_data = dict(self.config_data, programs=self.collect_programs())
+        self.launch_thread = threading.Thread(target=self.run_launch_session, args=(config_data, profile),
+                                              daemon=True)
+        self.launch_thread.start()
+
+    def run_launch_session(self, config_data, profile=None):
+        # 无论成功与否都发出 finished，配置错误或调度器异常时界面不会一直停在“启动中”
+        completed = False
+        try:
+            completed = self.launch_session(config_data, profile)
+        except Exception as e:
+            traceback.print_exc()
+            self.launch_signals.message.emit(f"启动出错: {e}")
+        finally:
+            self.launch_signals.finished.emit(completed)
+
+    def launch_session(self, config_data, profile=None):
+        from history import record_session
+        from launcher import create_scheduler
+        from optimizer import auto_optimize
+        from trace_export import LoadSampler, save_session_trace
+
+        signals = self.launch_signals
+        try:
+            plan, _ = self.plan_cache.get(config_data, profile, self.path_validator)
+        except KeyError as e:
+            signals.message.emit(f"未找到启动方案: {e.args[0]}")
+            return False
+        except ValueError as e:
+            signals.message.emit(str(e))
+            return False
+        plan.prime(self.path_validator)
+
+        self.launch_scheduler = None
+        try:
+            programs = auto_optimize(config_data, CONFIG_FILE, plan.programs, plan.settings, self.path_validator)
+            scheduler = create_scheduler(plan.settings, programs,
+                                         notify=lambda kind, task, message: signals.message.emit(message),
+                                         validator=self.path_validator)
+        except (ValueError, TypeError) as e:
+            # 配置错误（未知的 backend、max_concurrency 不是数字、admission 格式不对等）在创建调度器时就会发现
+            signals.message.emit(f"配置错误: {e}")
+            return False
+        self.launch_scheduler = scheduler
+        self.launch_profile = plan.profile
+        sampler = LoadSampler().start()
+        try:
+            scheduler.run()
+        finally:
+            sampler.stop()
+        self.launch_samples = sampler.samples
+        # 启动记录和时间线在后台线程写入，不阻塞界面
+        record_session(config_data, CONFIG_FILE, scheduler, plan.profile or None)
+        if self.metrics is not None:
+            self.metrics.observe_session(scheduler, plan.profile)
+        save_session_trace(config_data, CONFIG_FILE, scheduler, sampler.samples, plan.profile)
+        return True
+
+    def on_launch_finished(self, completed):
+        # 出错时状态栏保留错误信息，也不按“启动完成后退出”退出；已经启动的程序仍然交给守护和回收
+        if completed:
             self.statusBar.showMessage("全部启动完成", 3000)
-            if self.exit_after_launch_checkbox.isChecked():
-                QTimer.singleShot(1000, QApplication.quit) # 延迟1秒退出，让用户看到状态信息
-            return
+        if self.launch_scheduler is not None:
+            self.supervise_session(self.launch_scheduler)
+        if completed and self.exit_after_launch_checkbox.isChecked():
+            QTimer.singleShot(1000, QApplication.quit) # 延迟1秒退出，让用户看到状态信息
+
+    def supervise_session(self, scheduler):
+        for task in scheduler.tasks:
+            try:
+                policy = create_policy(task.restart_spec)
+            except (ValueError, TypeError) as e:
+                self.statusBar.showMessage(f"restart 配置无效: {task.name} ({e})", 5000)
+                policy = None
+            if task.handle is None:
+                continue
+            if policy is None:
+                self.child_watcher.reap(task.handle)
+                continue
+            if task.handle.pid is None:
+                self.statusBar.showMessage(f"无法守护: {task.name} (拿不到进程号)", 5000)
+                continue
+            if self.supervisor is None:
+                self.supervisor = Supervisor(scheduler.backend)
+            program = self.supervisor.watch(task.name, task.path, task.handle, policy)
+            if task.handle.poll() is not None:
+                # 启动会话结束前就已经退出
+                self.on_child_exited(task.name)
+            else:
+                self.child_watcher.watch(task.name, task.handle)
+                self.program_model.set_run_status(task.name, program.describe())
 
-        name_item = self.left_panel.item(self.current_index, 0)
-        delay_item = self.left_panel.item(self.current_index, 1)
+    def on_child_exited(self, name):
+        program = self.supervisor.programs.get(name)
+        if program is None:
+            return
+        delay = self.supervisor.on_exit(program)
+        self.program_model.set_run_status(name, program.describe())
+        if self.metrics is not None:
+            self.metrics.observe_exit(name)
+        if delay is None:
+            if program.state == 'gave_up':
+                self.statusBar.showMessage(f"{name} 重启次数过多，已停止守护", 5000)
+            return
+        self.statusBar.showMessage(f"{name} 已退出 (退出码 {program.returncode})，{delay:g} 秒后重启", 5000)
+        QTimer.singleShot(int(delay * 1000), lambda name=name: self.restart_supervised(name))
 
-        program_path = name_item.data(Qt.UserRole)
-        program_name = name_item.text()
-        delay = delay_item.text() or "0"
-        
+    def restart_supervised(self, name):
+        program = self.supervisor.programs.get(name)
+        if program is None or program.state != 'backoff':
+            return
         try:
-            deply_int = int(delay)
-        except (ValueError, TypeError):
-            deply_int = 0
-        
-        if deply_int < 0:
-            deply_int = 0
-
-        if os.path.exists(program_path):
-            self.statusBar.showMessage(f"正在启动: {program_name} (延迟{deply_int}秒)")
-            QTimer.singleShot(deply_int * 1000, lambda p=program_path: (
-                os.startfile(p),
-                setattr(self, 'current_index', self.current_index + 1),
-                self.launch_next_program()
-            ))
-        else:
-            self.statusBar.showMessage(f"程序路径不存在: {program_path}", 5000)
-            self.current_index += 1
-            self.launch_next_program()
+            handle = self.supervisor.restart(program)
+        except OSError as e:
+            self.statusBar.showMessage(f"重启失败: {name} ({e})", 5000)
+            if self.metrics is not None:
+                self.metrics.observe_restart(name, e)
+            self.on_child_exited(name)
+            return
+        if self.metrics is not None:
+            self.metrics.observe_restart(name)
+        self.child_watcher.watch(name, handle)
+        self.program_model.set_run_status(name, program.describe())
+        self.statusBar.showMessage(f"已重启: {name} (PID {handle.pid})", 3000)
+
+    def schedule_settings(self):
+        # 保留 rules、catch_up、last_run 等界面未涉及的设置
+        schedule_data = dict(self.config_data.get('schedule', {}))
+        schedule_data.update({
+            "enabled": self.is_schedule_enabled,
+            "time": self.schedule_time_edit.time().toString('HH:mm:ss')
+        })
+        return schedule_data
+
+    def create_schedule_engine(self):
+        # 无效的定时规则跳过并提示，不影响界面启动和其他规则
+        engine = ScheduleEngine(self.schedule_settings())
+        for problem in engine.problems:
+            print(problem)
+        if engine.problems:
+            self.statusBar.showMessage(engine.problems[0], 10000)
+        return engine
 
     def toggle_schedule(self):
         self.is_schedule_enabled = not self.is_schedule_enabled
-        self.update_schedule_ui()
+        self.reset_schedule()
         self.save_programs()
 
-    def update_schedule_ui(self):
+    def on_schedule_time_changed(self, time):
+        if self.is_schedule_enabled:
+            self.reset_schedule()
+            self.save_programs()
+
+    def reset_schedule(self):
+        # 规则变化后从现在开始重新计算，不把之前的时间当作错过
+        self.schedule_engine = self.create_schedule_engine()
+        self.schedule_engine.last_checked = datetime.datetime.now()
+        self.arm_schedule_timer(self.schedule_engine.last_checked)
+
+    def update_schedule_ui(self, next_fire=None):
         if self.is_schedule_enabled:
             self.schedule_btn.setText("禁用定时启动")
-            self.status_schedule_label.setText(f"定时启动: {self.schedule_time_edit.time().toString('HH:mm')}")
+            if next_fire is None:
+                self.status_schedule_label.setText("定时启动: 无")
+            else:
+                weekday = WEEKDAY_NAMES[next_fire.weekday()]
+                self.status_schedule_label.setText(f"定时启动: {weekday} {next_fire.strftime('%H:%M:%S')}")
         else:
             self.schedule_btn.setText("启用定时启动")
             self.status_schedule_label.setText("定时启动: 禁用")
 
-    def check_schedule(self):
-        current_date = QDate.currentDate()
-        if self.last_check_date != current_date:
-            self.scheduled_launch_triggered_today = False
-            self.last_check_date = current_date
-
-        if not self.is_schedule_enabled or self.scheduled_launch_triggered_today:
+    def arm_schedule_timer(self, now):
+        self.schedule_timer.stop()
+        if not self.is_schedule_enabled or self.schedule_engine is None:
+            self.update_schedule_ui()
             return
 
-        current_time = QTime.currentTime()
-        scheduled_time = self.schedule_time_edit.time()
+        next_fire = self.schedule_engine.next_fire(now)
+        self.schedule_next_fire = next_fire
+        self.update_schedule_ui(next_fire)
+        if next_fire is None:
+            return
+        delay_ms = int((next_fire - now).total_seconds() * 1000)
+        self.schedule_timer.start(max(min(delay_ms, MAX_SCHEDULE_ARM_MS), 0))
 
-        if current_time.hour() == scheduled_time.hour() and current_time.minute() == scheduled_time.minute():
-            self.launch_all_programs()
-            self.scheduled_launch_triggered_today = True
-            # 定时启动完成后，禁用并更新UI
-            self.is_schedule_enabled = False
-            self.update_schedule_ui()
-            self.save_programs()
+    def check_schedule(self):
+        # 定时器到期（或每 5 分钟校准）时检查从上次检查到现在是否有应触发的定时
+        now = datetime.datetime.now()
+        if self.is_schedule_enabled and self.schedule_engine is not None:
+            fire, message = self.schedule_engine.evaluate(now)
+            if message:
+                self.statusBar.showMessage(message, 5000)
+            if fire:
+                if self.metrics is not None and self.schedule_next_fire is not None and now >= self.schedule_next_fire:
+                    self.metrics.observe_schedule(self.schedule_next_fire, now)
+                self.config_data = dict(self.config_data)
+                self.config_data['schedule'] = dict(self.schedule_settings(), last_run=now.isoformat(timespec='seconds'))
+                self.save_programs()
+                if self.is_launching():
+                    self.statusBar.showMessage("定时启动时上一次启动尚未完成，已跳过", 5000)
+                else:
+                    self.start_launch_session()  # 定时启动不再额外等待 1 秒
+        self.arm_schedule_timer(now)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    profiler.mark('创建 QApplication')
     window = MainWindow()
     window.show()
+    profiler.mark('显示窗口')
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,136 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+# 启动后端：负责真正创建进程，并返回带 PID、启动耗时和退出码的句柄。
+# 配置项 "backend" 可选 posix_spawn / subprocess / windows，默认按平台自动选择。
+
+
+class LaunchHandle:
+    # pid 为 None 表示后端无法得知进程号（例如 os.startfile 打开的文档）。
+    # POSIX 上子进程退出后要有人调用 poll/wait 回收，否则会变成僵尸进程：
+    # --launch 启动后即退出，由 init 接管；界面常驻时由 ChildWatcher 在退出事件到来时回收
+    __slots__ = ('path', 'pid', 'spawn_latency', 'returncode', '_process')
+
+    def __init__(self, path, pid, spawn_latency, process=None):
+        self.path = path
+        self.pid = pid
+        self.spawn_latency = spawn_latency
+        self.returncode = None
+        self._process = process
+
+    def poll(self):
+        if self.returncode is not None:
+            return self.returncode
+        if self._process is not None:
+            self.returncode = self._process.poll()
+        elif self.pid is not None and os.name == 'posix':
+            try:
+                pid, status = os.waitpid(self.pid, os.WNOHANG)
+            except ChildProcessError:
+                return None
+            if pid:
+                self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
+    def process_handle(self):
+        # Windows 上的进程句柄（用于等待退出事件），其他情况返回 None
+        if os.name == 'nt' and self._process is not None:
+            return int(self._process._handle)
+        return None
+
+    def wait(self, timeout=None):
+        if self._process is not None:
+            self.returncode = self._process.wait(timeout)
+            return self.returncode
+        if self.pid is None:
+            return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(self.path, timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+
+class LaunchBackend:
+    name = ''
+
+    def __init__(self, new_session=True):
+        self.new_session = new_session
+
+    def spawn(self, path):
+        start = time.perf_counter()
+        pid, process = self._spawn(path)
+        return LaunchHandle(path, pid, time.perf_counter() - start, process)
+
+    def _spawn(self, path):
+        raise NotImplementedError
+
+
+def opener_argv(path):
+    # 非可执行文件（文档、快捷方式等）交给桌面环境打开
+    if os.access(path, os.X_OK) and not os.path.isdir(path):
+        return [path]
+    opener = 'open' if sys.platform == 'darwin' else 'xdg-open'
+    return [shutil.which(opener) or opener, path]
+
+
+class PosixSpawnBackend(LaunchBackend):
+    # os.posix_spawn 不复制父进程的地址空间，对 Qt 这样的大进程比 fork+exec 开销小得多。
+    # 不经过 shell；Python 创建的文件描述符默认不可继承，子进程只会拿到标准输入输出。
+    name = 'posix_spawn'
+
+    def _spawn(self, path):
+        argv = opener_argv(path)
+        executable = argv[0] if os.path.isabs(argv[0]) else shutil.which(argv[0]) or argv[0]
+        pid = os.posix_spawn(executable, argv, os.environ, setsid=self.new_session)
+        return pid, None
+
+
+class SubprocessBackend(LaunchBackend):
+    name = 'subprocess'
+
+    def _spawn(self, path):
+        process = subprocess.Popen(opener_argv(path), close_fds=True,
+                                   start_new_session=self.new_session)
+        return process.pid, process
+
+
+class WindowsBackend(LaunchBackend):
+    # exe 直接创建进程以拿到 PID；其他文件（lnk、bat、文档）仍由 os.startfile 按文件关联打开
+    name = 'windows'
+
+    def _spawn(self, path):
+        if path.lower().endswith('.exe'):
+            flags = subprocess.DETACHED_PROCESS
+            if self.new_session:
+                flags |= subprocess.CREATE_NEW_PROCESS_GROUP
+            process = subprocess.Popen([path], close_fds=True, creationflags=flags)
+            return process.pid, process
+        os.startfile(path)
+        return None, None
+
+
+BACKENDS = {
+    PosixSpawnBackend.name: PosixSpawnBackend,
+    SubprocessBackend.name: SubprocessBackend,
+    WindowsBackend.name: WindowsBackend,
+}
+
+
+def default_backend_name():
+    if sys.platform == 'win32':
+        return WindowsBackend.name
+    if hasattr(os, 'posix_spawn'):
+        return PosixSpawnBackend.name
+    return SubprocessBackend.name
+
+
+def get_backend(name=None, new_session=True):
+    backend_class = BACKENDS.get(name or default_backend_name())
+    if backend_class is None:
+        raise ValueError(f"未知的启动后端: {name}")
+    return backend_class(new_session=new_session)
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import shlex
+import signal
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# 启动引擎基准测试：生成 N 个模拟程序组成的配置，用真实的调度器启动，
+# 统计总耗时 (makespan)、各程序实际启动时刻相对计划的偏差，以及（--gui 时）界面事件循环的延迟。
+#
+#   python benchmarks/bench_launch.py -n 20 --sleep 0.3 --cpu 0.1 --io 8 --probe port --parallel
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_launch.py -n 20 --gui
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from launcher import build_tasks, create_scheduler  # noqa: E402
+
+SYNTHETIC_PROGRAM = os.path.join(ROOT, 'benchmarks', 'synthetic_program.py')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='FastStart 启动引擎基准测试')
+    parser.add_argument('-n', '--count', type=int, default=10, help='模拟程序数量')
+    parser.add_argument('--sleep', type=float, default=0.2, help='每个程序的启动等待秒数')
+    parser.add_argument('--cpu', type=float, default=0.05, help='每个程序的 CPU 计算秒数')
+    parser.add_argument('--io', type=int, default=0, help='每个程序写入并读回的 MB 数')
+    parser.add_argument('--delay', type=int, default=0, help='配置中每个程序的 delay')
+    parser.add_argument('--probe', choices=['port', 'alive', 'none'], default='port', help='就绪检测方式')
+    parser.add_argument('--parallel', action='store_true', help='使用并行模式')
+    parser.add_argument('--chain', type=int, default=0, help='每 N 个程序依赖前一个（并行模式下构造依赖链）')
+    parser.add_argument('--max-concurrency', type=int, default=0)
+    parser.add_argument('--admission', help='负载检测配置 (JSON)')
+    parser.add_argument('--backend', help='启动后端')
+    parser.add_argument('--port-base', type=int, default=21000)
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    parser.add_argument('--gui', action='store_true', help='在 Qt 事件循环中运行并测量事件循环延迟')
+    parser.add_argument('--json', help='把结果写入 JSON 文件')
+    return parser
+
+
+def make_profile(args, work_dir):
+    programs = []
+    for i in range(args.count):
+        name = f'synthetic-{i:03d}'
+        port = args.port_base + i if args.probe == 'port' else 0
+        command = [sys.executable, SYNTHETIC_PROGRAM, '--sleep', str(args.sleep), '--cpu', str(args.cpu),
+                   '--io', str(args.io), '--port', str(port), '--hold', '30', '--dir', work_dir]
+        path = os.path.join(work_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('#!/bin/sh\nexec ' + ' '.join(shlex.quote(part) for part in command) + '\n')
+        os.chmod(path, 0o755)
+
+        item_data = {'name': name, 'path': path, 'delay': args.delay}
+        if args.probe == 'port':
+            item_data['ready'] = {'type': 'port', 'port': port, 'timeout': 60, 'interval': 0.05}
+        elif args.probe == 'alive':
+            item_data['ready'] = {'type': 'alive', 'ms': int(args.sleep * 1000) or 100}
+        if args.chain and i % args.chain and i > 0:
+            item_data['after'] = [programs[-1]['name']]
+        programs.append(item_data)
+
+    config_data = {'parallel': args.parallel, 'max_concurrency': args.max_concurrency, 'programs': programs}
+    if args.admission:
+        config_data['admission'] = json.loads(args.admission)
+    if args.backend:
+        config_data['backend'] = args.backend
+    return config_data
+
+
+def static_plan(config_data):
+    # 假设启动和就绪都不耗时时，每个程序应当开始启动的时刻
+    tasks, _ = build_tasks(config_data['programs'], config_data.get('parallel', False))
+    plan = {}
+    for task in tasks:
+        base = max((plan[dep.index] for dep in task.deps if dep.index in plan), default=0)
+        plan[task.index] = base + task.delay
+    return plan
+
+
+def stop_programs(scheduler):
+    for task in scheduler.tasks:
+        handle = task.handle
+        if handle is None or handle.pid is None:
+            continue
+        try:
+            os.killpg(handle.pid, signal.SIGTERM)
+        except OSError:
+            try:
+                os.kill(handle.pid, signal.SIGTERM)
+            except OSError:
+                pass
+        try:
+            handle.wait(5)
+        except Exception:
+            pass
+
+
+def run_headless(scheduler):
+    scheduler.run()
+    return None
+
+
+def run_in_event_loop(scheduler):
+    # 与界面相同：调度器在后台线程运行，主线程运行 Qt 事件循环；
+    # 用 10 毫秒的定时器测量事件循环被延迟的程度
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtCore import QCoreApplication, QTimer
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    lateness = []
+    interval = 0.010
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        lateness.append(max(now - last[0] - interval, 0))
+        last[0] = now
+
+    timer = QTimer()
+    timer.setInterval(int(interval * 1000))
+    timer.timeout.connect(tick)
+    timer.start()
+
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+    watcher = QTimer()
+    watcher.setInterval(5)
+    watcher.timeout.connect(lambda: None if thread.is_alive() else app.quit())
+    thread.start()
+    watcher.start()
+    app.exec()
+    timer.stop()
+    watcher.stop()
+    return lateness
+
+
+def run_once(args, config_data, plan):
+    scheduler = create_scheduler(config_data, config_data['programs'], notify=lambda kind, task, message: None)
+    try:
+        lateness = run_in_event_loop(scheduler) if args.gui else run_headless(scheduler)
+    finally:
+        stop_programs(scheduler)
+
+    skews = [task.started_at - scheduler.t0 - plan[task.index]
+             for task in scheduler.tasks if task.started_at is not None]
+    result = {
+        'makespan': scheduler.finished_at - scheduler.t0,
+        'failed': sum(1 for task in scheduler.tasks if task.state == 'failed'),
+        'skew_mean': statistics.mean(skews) if skews else None,
+        'skew_max': max(skews) if skews else None,
+        'spawn_latency_mean': statistics.mean(task.handle.spawn_latency for task in scheduler.tasks
+                                              if task.handle is not None),
+    }
+    if lateness is not None:
+        ordered = sorted(lateness)
+        result['loop_latency_p50'] = ordered[len(ordered) // 2] if ordered else None
+        result['loop_latency_max'] = ordered[-1] if ordered else None
+    return result
+
+
+def summarize(results, key):
+    values = [result[key] for result in results if result.get(key) is not None]
+    if not values:
+        return '-'
+    return f"{statistics.median(values) * 1000:9.1f} ms (min {min(values) * 1000:.1f}, max {max(values) * 1000:.1f})"
+
+
+def main(argv):
+    args = build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='faststart-bench-') as work_dir:
+        config_data = make_profile(args, work_dir)
+        plan = static_plan(config_data)
+        results = []
+        for i in range(args.repeat):
+            result = run_once(args, config_data, plan)
+            results.append(result)
+            print(f"第 {i + 1} 次: 总耗时 {result['makespan']:.3f} 秒, 失败 {result['failed']}")
+
+    print()
+    print(f"程序数量: {args.count}  并行: {args.parallel}  就绪检测: {args.probe}  重复: {args.repeat}")
+    print(f"总耗时 (makespan):     {summarize(results, 'makespan')}")
+    print(f"计划偏差 (平均):        {summarize(results, 'skew_mean')}")
+    print(f"计划偏差 (最大):        {summarize(results, 'skew_max')}")
+    print(f"启动调用耗时 (平均):    {summarize(results, 'spawn_latency_mean')}")
+    if args.gui:
+        print(f"事件循环延迟 (p50):     {summarize(results, 'loop_latency_p50')}")
+        print(f"事件循环延迟 (最大):    {summarize(results, 'loop_latency_max')}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
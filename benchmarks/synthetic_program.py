@@ -0,0 +1,62 @@
+import argparse
+import os
+import socket
+import sys
+import time
+
+# 基准测试用的模拟程序：按参数模拟启动耗时、CPU 计算、磁盘读写，最后监听端口表示就绪
+
+
+def burn_cpu(seconds):
+    deadline = time.process_time() + seconds
+    value = 0
+    while time.process_time() < deadline:
+        value = (value * 31 + 7) % 1000003
+    return value
+
+
+def do_io(megabytes, directory):
+    path = os.path.join(directory, f'synthetic-{os.getpid()}.bin')
+    block = os.urandom(1024 * 1024)
+    try:
+        with open(path, 'wb') as f:
+            for _ in range(megabytes):
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(path, 'rb') as f:
+            while f.read(1024 * 1024):
+                pass
+    finally:
+        os.remove(path)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sleep', type=float, default=0, help='启动等待秒数')
+    parser.add_argument('--cpu', type=float, default=0, help='CPU 计算秒数')
+    parser.add_argument('--io', type=int, default=0, help='写入并读回的 MB 数')
+    parser.add_argument('--port', type=int, default=0, help='初始化完成后监听的端口')
+    parser.add_argument('--hold', type=float, default=5, help='就绪后继续运行的秒数')
+    parser.add_argument('--dir', default='.', help='IO 临时文件目录')
+    args = parser.parse_args(argv)
+
+    time.sleep(args.sleep)
+    burn_cpu(args.cpu)
+    if args.io:
+        do_io(args.io, args.dir)
+
+    server = None
+    if args.port:
+        server = socket.socket()
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(('127.0.0.1', args.port))
+        server.listen()
+    time.sleep(args.hold)
+    if server is not None:
+        server.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+
+from config import CONFIG_FILE, load_config, write_config_atomic
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='FastStart', description='FastStart 命令行模式')
+    parser.add_argument('--launch', action='store_true',
+                        help='按配置启动全部程序；界面已在运行时交给它启动，否则不显示窗口启动后退出')
+    parser.add_argument('--show', action='store_true', help='显示正在运行的界面（没有时启动界面）')
+    parser.add_argument('--status', action='store_true', help='查看正在运行的界面的状态')
+    parser.add_argument('--import', dest='import_paths', nargs='+', metavar='PATH',
+                        help='递归扫描文件夹，把找到的程序加入列表')
+    parser.add_argument('--trace', metavar='FILE', help='--launch 结束后把启动时间线保存为 Chrome Trace 文件 (Perfetto 可打开)')
+    parser.add_argument('--profile', help='使用 start.json 中指定名称的启动方案 (默认为界面中选择的方案)')
+    parser.add_argument('--config', default=CONFIG_FILE, help='配置文件路径 (默认: start.json)')
+    parser.add_argument('--report', action='store_true', help='统计历次启动的耗时 (p50/p95)')
+    parser.add_argument('--optimize', action='store_true', help='根据启动记录预览更快的启动顺序和延迟')
+    parser.add_argument('--simulate', action='store_true', help='在虚拟时钟上模拟启动，输出时间线和问题，不启动任何程序')
+    parser.add_argument('--days', type=int, help='--report/--optimize/--simulate 只参考最近 N 天的记录')
+    parser.add_argument('--profile-startup', action='store_true', help='显示窗口时统计各启动阶段的耗时')
+    return parser
+
+
+def run_cli(argv):
+    # 没有命令行命令时返回 None，由调用方继续启动图形界面
+    # 使用 parse_known_args，让 Qt 自己的参数 (如 -platform) 原样保留
+    args, _ = build_parser().parse_known_args(argv)
+    if args.report:
+        return cmd_report(args)
+    if args.optimize:
+        return cmd_optimize(args)
+    if args.simulate:
+        return cmd_simulate(args)
+    if args.status:
+        return cmd_status(args)
+    if args.import_paths:
+        return cmd_import(args)
+    if args.show:
+        return cmd_show(args)
+    if not args.launch:
+        return None
+    return cmd_launch(args)
+
+
+def cmd_show(args):
+    from instance import send_command
+
+    # 没有正在运行的实例时返回 None，继续启动界面
+    return 0 if send_command('show', args.config) is not None else None
+
+
+def cmd_status(args):
+    from instance import format_status, send_command
+
+    status = send_command('status', args.config)
+    if status is None:
+        print("FastStart 没有在运行")
+        return 1
+    print(format_status(status))
+    return 0
+
+
+def read_config(args):
+    try:
+        return load_config(args.config)
+    except FileNotFoundError:
+        print(f"配置文件不存在: {args.config}")
+    except ValueError as e:
+        print(f"配置文件格式错误: {e}")
+    return None
+
+
+def cmd_import(args):
+    from importer import ProgramScanner
+    from instance import send_command
+
+    paths = [os.path.abspath(path) for path in args.import_paths]
+    reply = send_command('import', args.config, paths=paths)
+    if reply is not None:
+        print(reply.get('message', ''))
+        return 0 if reply.get('ok') else 2
+
+    if os.path.exists(args.config):
+        config_data = read_config(args)
+        if config_data is None:
+            return 1
+    else:
+        config_data = {'programs': []}
+
+    programs = config_data.setdefault('programs', [])
+    scanner = ProgramScanner(paths, [item_data.get('path') for item_data in programs])
+    found = []
+    scanner.run(found.extend)
+    for record in found:
+        print(f"{record.name}: {record.path}")
+    if found:
+        programs.extend(record.to_dict() for record in found)
+        write_config_atomic(args.config, json.dumps(config_data, ensure_ascii=False, indent=4))
+    print(f"已导入 {len(found)} 个程序" + ("（已达到单次导入上限）" if scanner.truncated else ""))
+    return 0
+
+
+def cmd_launch(args):
+    from instance import send_command
+
+    # 界面正在运行时由它启动，避免两个调度器同时启动同一批程序
+    reply = send_command('launch', args.config, profile=args.profile)
+    if reply is not None:
+        print(reply.get('message', ''))
+        return 0 if reply.get('ok') else 2
+
+    # 延迟导入，没有界面在运行、需要自己启动时才加载启动引擎（约 130 毫秒）
+    from history import record_session
+    from launcher import create_scheduler
+    from metrics import create_metrics
+    from optimizer import auto_optimize
+    from pathcache import PathValidator
+    from plan import PlanCache, plan_cache_path
+    from proctable import wait_focus
+    from trace_export import LoadSampler, save_session_trace, save_trace
+
+    config_data = read_config(args)
+    if config_data is None:
+        return 1
+
+    # 方案内容没有变化时直接使用缓存的启动计划，不再重新展开和检查路径
+    validator = PathValidator()
+    try:
+        plan, _ = PlanCache(plan_cache_path(args.config)).get(config_data, args.profile, validator)
+    except KeyError as e:
+        print(f"未找到启动方案: {e.args[0]}")
+        return 2
+    except ValueError as e:
+        print(e)
+        return 2
+    plan.prime(validator)
+
+    try:
+        programs = auto_optimize(config_data, args.config, plan.programs, plan.settings, validator)
+        scheduler = create_scheduler(plan.settings, programs, validator=validator)
+    except (ValueError, TypeError) as e:
+        # 未知的 backend、max_concurrency 不是数字等配置错误，创建调度器时就会发现
+        print(f"配置错误: {e}")
+        return 2
+    # 需要导出时间线时才采样系统负载
+    sampler = LoadSampler().start() if args.trace or config_data.get('trace_dir') else None
+    scheduler.run()
+    if sampler is not None:
+        sampler.stop()
+    # if_running 为 focus 时窗口切换在后台线程中进行，退出前等它完成
+    wait_focus()
+    record_session(config_data, args.config, scheduler, plan.profile or None)
+    metrics = create_metrics(config_data, args.config)
+    if metrics is not None:
+        metrics.observe_session(scheduler, plan.profile)
+    if args.trace:
+        try:
+            print(f"启动时间线已保存: {save_trace(args.trace, scheduler, sampler.samples, profile=plan.profile)}")
+        except OSError as e:
+            print(f"保存启动时间线失败: {e}")
+    elif sampler is not None:
+        save_session_trace(config_data, args.config, scheduler, sampler.samples, plan.profile)
+    return 0
+
+
+def load_plan(args, config_data):
+    from plan import PlanCache, plan_cache_path
+
+    try:
+        plan, _ = PlanCache(plan_cache_path(args.config)).get(config_data, args.profile)
+    except KeyError as e:
+        print(f"未找到启动方案: {e.args[0]}")
+        return None
+    except ValueError as e:
+        print(e)
+        return None
+    return plan
+
+
+def cmd_optimize(args):
+    from optimizer import DEFAULT_DAYS, format_preview, load_history_profiles, optimize
+
+    config_data = read_config(args)
+    if config_data is None:
+        return 1
+    plan = load_plan(args, config_data)
+    if plan is None:
+        return 2
+    profiles = load_history_profiles(config_data, args.config, args.days or DEFAULT_DAYS)
+    print(format_preview(plan.programs, optimize(plan.programs, plan.settings, profiles)))
+    return 0
+
+
+def cmd_simulate(args):
+    # 有问题（循环依赖、依赖或路径不存在）时返回 2，可用于检查配置
+    from optimizer import DEFAULT_DAYS, WorkloadModel, auto_optimize, load_history_profiles
+    from pathcache import PathValidator
+    from simulate import format_timeline, simulate
+
+    config_data = read_config(args)
+    if config_data is None:
+        return 1
+    plan = load_plan(args, config_data)
+    if plan is None:
+        return 2
+    # 模拟本身不访问文件系统；命令行中先同步检查一遍路径，才能报告不存在的路径
+    validator = PathValidator()
+    for item_data in plan.programs:
+        if item_data.get('path'):
+            validator.check(item_data['path'])
+    programs = auto_optimize(config_data, args.config, plan.programs, plan.settings, validator)
+    model = WorkloadModel(load_history_profiles(config_data, args.config, args.days or DEFAULT_DAYS))
+    result = simulate(programs, plan.settings, model, validator)
+    print(format_timeline(result, plan.profile))
+    return 2 if result.problems() or result.scheduler.stalled else 0
+
+
+def cmd_report(args):
+    from history import format_report, history_path, read_history
+
+    config_data = read_config(args)
+    if config_data is None:
+        return 1
+    path = history_path(config_data, args.config)
+    try:
+        records = read_history(path)
+    except FileNotFoundError:
+        print(f"还没有启动记录: {path}")
+        return 1
+    print(format_report(records, args.days))
+    return 0
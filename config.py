@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# 配置文件路径（与界面保持一致，相对于当前工作目录）
+CONFIG_FILE = 'start.json'
+
+
+def backup_path(path):
+    return path + '.bak'
+
+
+def load_config(path=CONFIG_FILE):
+    # 读取配置文件，兼容旧格式 (list) 和新格式 (dict)；文件损坏时回退到上一次的备份
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config_data = json.load(f)
+    except ValueError:
+        if not os.path.exists(backup_path(path)):
+            raise
+        print(f"配置文件已损坏，使用备份: {backup_path(path)}")
+        with open(backup_path(path), 'r', encoding='utf-8') as f:
+            config_data = json.load(f)
+
+    if isinstance(config_data, list):
+        return {'programs': config_data}
+    if isinstance(config_data, dict):
+        return config_data
+    return {'programs': []}
+
+
+def parse_delay(value):
+    # 延迟时间统一转换为非负整数秒
+    try:
+        delay = int(value or 0)
+    except (ValueError, TypeError):
+        delay = 0
+    return max(delay, 0)
+
+
+def current_umask():
+    # Linux 上从 /proc 读取，避免 os.umask 临时改动影响其他线程创建的文件
+    try:
+        with open('/proc/self/status', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+def file_mode(path):
+    # 替换后保持原文件的权限；新文件与 open() 创建的一致 (0666 去掉 umask)
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~current_umask()
+
+
+def write_config_atomic(path, text, backup=True):
+    # 先写临时文件并 fsync，再用原子重命名替换；替换前把当前文件复制为 .bak。
+    # mkstemp 创建的临时文件权限为 0600，替换前改回原文件的权限
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, file_mode(path))
+        if backup and os.path.exists(path):
+            shutil.copy2(path, backup_path(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if os.name == 'posix':
+        # 让重命名本身也落盘
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class ConfigWriter:
+    # 在单独的线程中按提交顺序写入配置，内容与上次写入相同时跳过
+    def __init__(self, path=CONFIG_FILE):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='config-writer')
+        self._last_text = None
+        self._pending = None
+
+    def submit(self, config_data, callback=None):
+        self._pending = self._executor.submit(self._write, config_data, callback)
+        return self._pending
+
+    def _write(self, config_data, callback):
+        text = json.dumps(config_data, ensure_ascii=False, indent=4)
+        error = None
+        if text != self._last_text:
+            try:
+                write_config_atomic(self.path, text)
+                self._last_text = text
+            except OSError as e:
+                error = e
+        if callback is not None:
+            callback(error)
+
+    def flush(self):
+        # 等待所有已提交的写入完成（退出程序前调用）
+        if self._pending is not None:
+            self._pending.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class ProgramRecord:
+    # 列表中的一个程序，是界面、启动和保存共用的唯一数据来源；
+    # extra 保存界面不显示的字段（after、group、ready 等），保存时原样写回
+    __slots__ = ('name', 'path', 'delay', 'extra')
+
+    def __init__(self, name, path, delay=0, extra=None):
+        self.name = name
+        self.path = path
+        self.delay = parse_delay(delay)
+        self.extra = extra or {}
+
+    @classmethod
+    def from_dict(cls, item_data):
+        extra = {key: value for key, value in item_data.items() if key not in ('name', 'path', 'delay')}
+        return cls(item_data.get('name', ''), item_data.get('path', ''), item_data.get('delay', 0), extra)
+
+    def to_dict(self):
+        item_data = {'name': self.name, 'path': self.path, 'delay': self.delay}
+        item_data.update(self.extra)
+        return item_data
@@ -0,0 +1,161 @@
+import json
+import math
+import os
+import time
+from collections import defaultdict
+
+# 启动记录：每次启动会话结束后向 JSONL 文件追加每个程序的耗时记录和一条会话汇总，
+# --report 根据这些记录统计各程序的 p50/p95 以及每天的会话总耗时。
+
+HISTORY_FILE = 'launch_history.jsonl'
+
+
+def history_path(config_data, config_path):
+    path = config_data.get('history_file', HISTORY_FILE)
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(config_path), path)
+
+
+def offset(value, t0):
+    return None if value is None else round(value - t0, 4)
+
+
+def process_usage(pid):
+    # Linux：进程到目前为止用掉的 CPU 时间（秒）和实际读盘量 (MB)，供启动顺序优化判断负载类型；读不到时为 None
+    if pid is None or not os.path.isdir('/proc'):
+        return None, None
+    try:
+        with open(f'/proc/{pid}/stat', 'r', encoding='utf-8', errors='replace') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu_time = round((int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK'), 3)
+    except (OSError, ValueError, IndexError):
+        return None, None
+    io_read_mb = None
+    try:
+        with open(f'/proc/{pid}/io', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('read_bytes:'):
+                    io_read_mb = round(int(line.split()[1]) / (1024 * 1024), 3)
+    except (OSError, ValueError):
+        pass
+    return cpu_time, io_read_mb
+
+
+def session_records(scheduler, profile=None):
+    t0 = scheduler.t0
+    session_id = time.strftime('%Y%m%d-%H%M%S', time.localtime(scheduler.started_wall)) + f'-{os.getpid()}'
+    records = []
+    for task in scheduler.tasks:
+        handle = task.handle
+        cpu_time, io_read_mb = process_usage(None if handle is None else handle.pid)
+        records.append({
+            'type': 'program',
+            'session': session_id,
+            'name': task.name,
+            'path': task.path,
+            'status': task.state,
+            'planned': offset(task.due_at, t0),
+            'spawned': offset(task.started_at, t0),
+            'spawn_latency': None if handle is None else round(handle.spawn_latency, 6),
+            'time_to_ready': None if task.ready_at is None else round(task.ready_at - task.started_at, 4),
+            'pid': None if handle is None else handle.pid,
+            'cpu_time': cpu_time,
+            'io_read_mb': io_read_mb,
+            'exit_code': None if handle is None else handle.poll(),
+            'error': task.error,
+        })
+    records.append({
+        'type': 'session',
+        'session': session_id,
+        'time': scheduler.started_wall,
+        'profile': profile,
+        'makespan': offset(scheduler.finished_at, t0),
+        'programs': len(scheduler.tasks),
+        'failed': sum(1 for task in scheduler.tasks if task.state == 'failed'),
+    })
+    return records
+
+
+def append_session(path, scheduler, profile=None):
+    lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n'
+                    for record in session_records(scheduler, profile))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(lines)
+
+
+def record_session(config_data, config_path, scheduler, profile=None):
+    # "history": false 可关闭记录
+    if not config_data.get('history', True):
+        return
+    try:
+        append_session(history_path(config_data, config_path), scheduler, profile)
+    except OSError as e:
+        print(f"写入启动记录失败: {e}")
+
+
+def read_history(path):
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # 跳过写入中断留下的残缺行
+    return records
+
+
+def percentile(values, pct):
+    # 最近秩法 (nearest-rank)
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def format_pair(values, scale=1.0, digits=2):
+    if not values:
+        return '-'
+    p50 = percentile(values, 50) * scale
+    p95 = percentile(values, 95) * scale
+    return f"{p50:.{digits}f} / {p95:.{digits}f}"
+
+
+def format_report(records, days=None):
+    sessions = [r for r in records if r.get('type') == 'session']
+    if days:
+        cutoff = time.time() - days * 86400
+        sessions = [r for r in sessions if r.get('time', 0) >= cutoff]
+    session_ids = {r['session'] for r in sessions}
+    programs = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        if record.get('type') != 'program' or record.get('session') not in session_ids:
+            continue
+        stats = programs[record['name']]
+        stats['count'].append(1)
+        if record.get('status') == 'failed':
+            stats['failed'].append(1)
+        for key in ('spawned', 'spawn_latency', 'time_to_ready'):
+            if record.get(key) is not None:
+                stats[key].append(record[key])
+
+    lines = [f"启动会话: {len(sessions)} 次", '',
+             f"{'程序':<24}{'次数':>6}{'失败':>6}  {'启动时刻 p50/p95 (秒)':<24}"
+             f"{'启动调用 p50/p95 (毫秒)':<26}{'就绪耗时 p50/p95 (秒)'}"]
+    for name in sorted(programs):
+        stats = programs[name]
+        lines.append(f"{name:<24}{len(stats['count']):>6}{len(stats['failed']):>6}  "
+                     f"{format_pair(stats['spawned']):<24}"
+                     f"{format_pair(stats['spawn_latency'], 1000):<26}"
+                     f"{format_pair(stats['time_to_ready'])}")
+
+    by_day = defaultdict(list)
+    for session in sessions:
+        if session.get('makespan') is not None:
+            by_day[time.strftime('%Y-%m-%d', time.localtime(session['time']))].append(session['makespan'])
+    lines += ['', f"{'日期':<14}{'次数':>6}  {'总耗时 p50/p95 (秒)':<22}{'最长 (秒)'}"]
+    for day in sorted(by_day):
+        makespans = by_day[day]
+        lines.append(f"{day:<14}{len(makespans):>6}  {format_pair(makespans):<22}{max(makespans):.2f}")
+    return '\n'.join(lines)
@@ -0,0 +1,35 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QPixmap
+
+# 图标缓存：同一张图片（按路径和尺寸）在整个进程中只从磁盘读取、缩放一次，
+# 主窗口、标题栏、托盘和对话框共用同一个 QPixmap/QIcon。必须在创建 QApplication 之后使用。
+# 只缓存 assets 中随程序发布的图片，运行期间不会变化，不需要清空。
+
+APP_ICON = 'assets/images/app.png'
+PIN_ICON = 'assets/images/pin.png'
+
+_pixmaps = {}
+_icons = {}
+
+
+def pixmap(path, size=None):
+    # size 为边长（保持比例缩放）；None 表示原始尺寸。加载失败时返回空 QPixmap，同样会被缓存
+    key = (path, size)
+    cached = _pixmaps.get(key)
+    if cached is None:
+        if size is None:
+            cached = QPixmap(path)
+        else:
+            source = pixmap(path)
+            cached = source if source.isNull() else source.scaled(size, size, Qt.KeepAspectRatio,
+                                                                  Qt.SmoothTransformation)
+        _pixmaps[key] = cached
+    return cached
+
+
+def icon(path):
+    cached = _icons.get(path)
+    if cached is None:
+        cached = QIcon(pixmap(path))
+        _icons[path] = cached
+    return cached
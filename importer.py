@@ -0,0 +1,210 @@
+import os
+import re
+import shlex
+import shutil
+import stat
+import struct
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import ProgramRecord
+from prefetch import ELF_MAGIC, parse_elf
+
+# 批量导入：递归扫描拖入的文件夹（或 --import 指定的目录），在线程池中并发列目录、判断文件类型，
+# 找到的程序分批交给调用方（界面每批插入一次表格），全部完成后只保存一次。
+#
+# 识别为程序的文件：
+#   Linux/macOS：有执行权限的 ELF 可执行文件（不含共享库）和以 #! 开头的脚本；.desktop 文件取 Exec 中的程序
+#   Windows：.exe、.bat、.cmd、.lnk
+#   任何系统上直接拖入的 .exe 文件（与旧版一致）
+
+WINDOWS_SUFFIXES = ('.exe', '.bat', '.cmd', '.lnk')
+SKIP_DIRS = {'node_modules', '__pycache__', 'site-packages'}
+ET_EXEC, ET_DYN = 2, 3
+SHARED_LIBRARY = re.compile(r'\.so(\.\d+)*$')
+
+MAX_DEPTH = 8
+MAX_RESULTS = 1000
+BATCH_SIZE = 50
+BATCH_INTERVAL = 0.1
+
+
+def is_elf_program(path):
+    # 共享库也是 ELF 且常有执行权限；位置无关的可执行文件 (PIE) 与共享库同为 ET_DYN，靠 PT_INTERP 区分
+    with open(path, 'rb') as f:
+        header = f.read(18)
+    if len(header) < 18 or header[:4] != ELF_MAGIC:
+        return False
+    e_type, = struct.unpack_from('<H' if header[5] == 1 else '>H', header, 16)
+    if e_type == ET_EXEC:
+        return True
+    if e_type != ET_DYN:
+        return False
+    info = parse_elf(path)
+    return info is not None and info.interpreter is not None
+
+
+def is_script(path):
+    with open(path, 'rb') as f:
+        return f.read(2) == b'#!'
+
+
+def read_desktop_entry(path):
+    # 返回 (名称, 程序路径)；不是可启动的应用时返回 None
+    entry = {}
+    section = None
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('['):
+                section = line
+            elif section == '[Desktop Entry]' and '=' in line:
+                key, value = line.split('=', 1)
+                entry.setdefault(key.strip(), value.strip())
+    if entry.get('Type', 'Application') != 'Application' or entry.get('Hidden') == 'true':
+        return None
+    try:
+        command = [part for part in shlex.split(entry.get('Exec', '')) if not part.startswith('%')]
+    except ValueError:
+        return None
+    if command and command[0] == 'env':
+        command = [part for part in command[1:] if '=' not in part]
+    if not command:
+        return None
+    program = command[0] if os.path.isabs(command[0]) else shutil.which(command[0])
+    if not program or not os.path.exists(program):
+        return None
+    return entry.get('Name') or os.path.basename(program), program
+
+
+def classify(path, explicit=False):
+    # 返回 ProgramRecord 或 None；explicit 表示文件是直接拖入的（而不是扫描目录时找到的）
+    lower = path.lower()
+    if lower.endswith('.exe') and explicit:
+        return ProgramRecord(os.path.basename(path), path, 0)
+    if os.name == 'nt':
+        if lower.endswith(WINDOWS_SUFFIXES):
+            return ProgramRecord(os.path.basename(path), path, 0)
+        return None
+    try:
+        if lower.endswith('.desktop'):
+            entry = read_desktop_entry(path)
+            return None if entry is None else ProgramRecord(entry[0], entry[1], 0)
+        if SHARED_LIBRARY.search(lower):
+            return None  # libc.so.6 这类带 PT_INTERP 的共享库也能直接运行，但不是要启动的程序
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode) or not st.st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
+            return None
+        if is_elf_program(path) or is_script(path):
+            return ProgramRecord(os.path.basename(path), path, 0)
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+class ProgramScanner:
+    # run() 在调用方的线程中协调扫描，on_batch(records) 也在该线程中调用；
+    # 列目录和读取文件头在线程池中并发进行
+    def __init__(self, paths, known_paths=(), max_workers=8, max_depth=MAX_DEPTH, max_results=MAX_RESULTS):
+        self.paths = list(paths)
+        self.known = {os.path.realpath(path) for path in known_paths if path}
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.max_results = max_results
+        self.found = 0
+        self.scanned = 0
+        self.truncated = False
+        self._seen_dirs = set()
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def _accept(self, record):
+        real_path = os.path.realpath(record.path)
+        with self._lock:
+            if real_path in self.known:
+                return False
+            self.known.add(real_path)
+        return True
+
+    def _scan_dir(self, directory, depth):
+        # 返回 (子目录, 找到的程序)
+        subdirs = []
+        records = []
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError:
+            return subdirs, records
+        for entry in entries:
+            if self._cancel_event.is_set():
+                break
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if depth < self.max_depth and entry.name not in SKIP_DIRS:
+                        subdirs.append((entry.path, depth + 1))
+                    continue
+            except OSError:
+                continue
+            with self._lock:
+                self.scanned += 1
+            record = classify(entry.path)
+            if record is not None and self._accept(record):
+                records.append(record)
+        return subdirs, records
+
+    def _enter(self, directory):
+        real_path = os.path.realpath(directory)
+        if real_path in self._seen_dirs:
+            return False
+        self._seen_dirs.add(real_path)
+        return True
+
+    def run(self, on_batch):
+        batch = []
+        last_flush = time.monotonic()
+
+        def collect(records):
+            nonlocal batch
+            room = self.max_results - self.found
+            if len(records) > room:
+                records = records[:room]
+                self.truncated = True
+                self.cancel()
+            self.found += len(records)
+            batch += records
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='import-scan') as executor:
+            pending = set()
+            for path in self.paths:
+                if os.path.isdir(path):
+                    if self._enter(path):
+                        pending.add(executor.submit(self._scan_dir, path, 0))
+                else:
+                    record = classify(path, explicit=True)
+                    if record is not None and self._accept(record):
+                        collect([record])
+
+            while pending and not self._cancel_event.is_set():
+                done, pending = wait(pending, timeout=BATCH_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    subdirs, records = future.result()
+                    collect(records)
+                    for subdir, depth in subdirs:
+                        if self._enter(subdir):
+                            pending.add(executor.submit(self._scan_dir, subdir, depth))
+                if batch and (len(batch) >= BATCH_SIZE or time.monotonic() - last_flush >= BATCH_INTERVAL):
+                    on_batch(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+            for future in pending:
+                future.cancel()
+
+        if batch:
+            on_batch(batch)
+        return self.found
@@ -0,0 +1,93 @@
+import getpass
+import hashlib
+import json
+import os
+import socket
+import tempfile
+
+from config import CONFIG_FILE
+
+# 单实例：界面运行时在本地 socket 上监听（Linux/macOS 为 Unix socket，Windows 为命名管道），
+# 之后再运行 FastStart.py --launch / --show / --status / --import 时只把命令转发给它，几毫秒内退出，不再启动第二个界面。
+# 不同目录（不同 start.json）的 FastStart 各自是独立的实例。
+#
+# 协议：客户端发送一行 JSON {"command": "launch", ...}，服务端回复一行 JSON {"ok": true, "message": "..."}。
+
+COMMANDS = ('launch', 'show', 'status', 'import')
+DEFAULT_TIMEOUT = 2.0
+MAX_MESSAGE = 64 * 1024
+
+
+def instance_name(config_path=CONFIG_FILE):
+    digest = hashlib.sha1(os.path.abspath(config_path).encode('utf-8')).hexdigest()[:12]
+    try:
+        user = str(os.getuid()) if hasattr(os, 'getuid') else getpass.getuser()
+    except Exception:
+        user = 'user'
+    return f'faststart-{user}-{digest}'
+
+
+def instance_address(config_path=CONFIG_FILE):
+    # 传给 QLocalServer.listen 的名称：Unix 上为完整的 socket 路径，Windows 上为管道名
+    name = instance_name(config_path)
+    if os.name == 'nt':
+        return name
+    directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(directory, name + '.sock')
+
+
+def encode_message(message):
+    return (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def decode_message(data):
+    message = json.loads(data.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError("消息格式错误")
+    return message
+
+
+def read_line(read, limit=MAX_MESSAGE):
+    data = b''
+    while not data.endswith(b'\n') and len(data) < limit:
+        chunk = read()
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def send_command(command, config_path=CONFIG_FILE, timeout=DEFAULT_TIMEOUT, **params):
+    # 把命令发送给正在运行的实例，返回回复；没有实例在运行时返回 None
+    if command not in COMMANDS:
+        raise ValueError(f"未知命令: {command}")
+    request = dict(params, command=command)
+    address = instance_address(config_path)
+    try:
+        if os.name == 'nt':
+            with open(r'\\.\pipe' + '\\' + address, 'r+b', buffering=0) as pipe:
+                pipe.write(encode_message(request))
+                data = read_line(lambda: pipe.read(4096))
+        else:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(timeout)
+                client.connect(address)
+                client.sendall(encode_message(request))
+                data = read_line(lambda: client.recv(4096))
+    except OSError:
+        return None
+    try:
+        return decode_message(data)
+    except ValueError:
+        return None
+
+
+def format_status(status):
+    lines = [f"FastStart 正在运行 (PID {status.get('pid')})",
+             f"启动方案: {status.get('profile') or '默认方案'}",
+             f"程序数量: {status.get('programs')}",
+             f"正在启动: {'是' if status.get('launching') else '否'}",
+             status.get('schedule', '')]
+    if status.get('message'):
+        lines.append(f"状态: {status['message']}")
+    return '\n'.join(line for line in lines if line)
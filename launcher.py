@@ -0,0 +1,423 @@
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backends import get_backend
+from config import parse_delay
+from pathcache import PATH_MISSING, PathValidator
+from prefetch import create_prefetcher
+from proctable import DEFAULT_IF_RUNNING, IF_RUNNING_POLICIES, ProcessTable, focus_process
+from pressure import create_admission
+from resources import create_resource_controller, parse_resources
+from probes import DEFAULT_TIMEOUT, ProbeFailed, create_probe, wait_ready
+
+
+def start_program(path, backend=None):
+    # 单独启动一个程序（界面中双击启动等场景），返回 LaunchHandle
+    return (backend or get_backend()).spawn(path)
+
+
+def print_event(kind, task, message):
+    print(message)
+
+
+class LaunchTask:
+    # 启动计划中的单个程序；state 依次为
+    # pending -> waiting(延迟计时) -> queued(等待并发名额) -> starting(就绪检测) -> ready / failed；
+    # 启动前发现已在运行并按 if_running 跳过时为 skipped；
+    # 失败时 failure 为原因：dependency_cycle / missing_path / spawn_error / probe_failed
+    __slots__ = ('index', 'name', 'path', 'delay', 'after', 'group', 'max_concurrency', 'ready_spec', 'if_running',
+                 'restart_spec', 'resources_spec', 'deps', 'dependents', 'state', 'due_at', 'started_at', 'ready_at', 'error', 'failure', 'handle', 'deferred')
+
+    def __init__(self, index, item_data):
+        self.index = index
+        self.name = item_data.get('name', '')
+        self.path = item_data.get('path', '')
+        self.delay = parse_delay(item_data.get('delay'))
+        self.after = item_data.get('after')
+        self.group = item_data.get('group')
+        self.max_concurrency = int(item_data.get('max_concurrency') or 0)
+        self.ready_spec = item_data.get('ready')
+        self.if_running = item_data.get('if_running')
+        self.restart_spec = item_data.get('restart')
+        self.resources_spec = item_data.get('resources')
+        self.deps = []
+        self.dependents = []
+        self.state = 'pending'
+        self.due_at = None
+        self.started_at = None
+        self.ready_at = None
+        self.error = None
+        self.failure = None
+        self.handle = None
+        self.deferred = False
+
+    @property
+    def done(self):
+        return self.state in ('ready', 'failed', 'skipped')
+
+
+def build_tasks(programs, parallel=False):
+    # 根据 after 建立依赖关系；未声明 after 时，串行模式下依赖上一个程序（与旧版逐个启动一致）
+    tasks = [LaunchTask(i, item_data) for i, item_data in enumerate(programs)]
+    by_name = {}
+    for task in tasks:
+        by_name.setdefault(task.name, []).append(task)
+
+    problems = []
+    for task in tasks:
+        if task.after is None:
+            deps = [] if parallel or task.index == 0 else [tasks[task.index - 1]]
+        else:
+            names = [task.after] if isinstance(task.after, str) else task.after
+            deps = []
+            for name in names:
+                found = by_name.get(name)
+                if not found:
+                    problems.append((task, f"依赖的程序不存在: {name}"))
+                    continue
+                deps.extend(dep for dep in found if dep is not task and dep not in deps)
+        task.deps = deps
+        for dep in deps:
+            dep.dependents.append(task)
+
+    return tasks, problems
+
+
+def find_blocked(tasks):
+    # 拓扑排序后仍剩下的程序处于循环依赖中（或依赖于循环），永远无法启动
+    remaining = {task: len(task.deps) for task in tasks}
+    ready = [task for task, count in remaining.items() if count == 0]
+    while ready:
+        task = ready.pop()
+        del remaining[task]
+        for dependent in task.dependents:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    return sorted(remaining, key=lambda task: task.index)
+
+
+class LaunchScheduler:
+    # 按依赖关系并行启动程序：互不依赖的程序同时计时，
+    # 只有声明了 after 的程序才等待其依赖就绪，总耗时接近关键路径而不是所有延迟之和。
+    # delay 表示“依赖就绪后再等待 N 秒”。并发名额在启动到就绪期间占用。
+    # 配置了 ready 的程序在后台线程中做就绪检测，通过（或超时）后才算就绪。
+    # 启用负载检测 (admission) 时，系统压力过高会暂缓启动，并且每个检测间隔最多启动一个程序。
+    # 配置了预读 (prefetcher) 时，程序开始等待自己的启动时刻就把它的文件读入页缓存。
+    # 会话开始时拍一次进程快照，已在运行的程序按 if_running 跳过或切换到前台。
+    # 配置了 resources 的程序创建后立即设置优先级、CPU 亲和性和 cgroup (resource_controller)。
+    def __init__(self, programs, parallel=False, max_concurrency=0, groups=None,
+                 notify=print_event, backend=None, admission=None, validator=None, prefetcher=None,
+                 if_running=DEFAULT_IF_RUNNING, resource_controller=None, clock=time.monotonic):
+        self.tasks, self.problems = build_tasks(programs, parallel)
+        self._check_specs()
+        self.max_concurrency = int(max_concurrency or 0)
+        self.group_limits = {}
+        for name, group_data in (groups or {}).items():
+            limit = group_data.get('max_concurrency') if isinstance(group_data, dict) else group_data
+            self.group_limits[name] = int(limit or 0)
+        self.notify = notify
+        self.backend = backend or get_backend()
+        self.admission = admission
+        # 路径检查优先使用缓存（界面加载时已在后台检查过），过期时才重新 stat
+        self.validator = validator or PathValidator()
+        self.prefetcher = prefetcher
+        self.if_running = if_running
+        self.resource_controller = resource_controller
+        self.clock = clock
+        self.processes = None
+
+        self.t0 = None
+        self.started_wall = None
+        self.finished_at = None
+        self._timers = []
+        self._queue = []
+        self._in_flight = 0
+        self._group_in_flight = {}
+        self._remaining = len(self.tasks)
+        self._events = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._probe_pool = None
+        self._next_admission_at = None
+
+    def _check_specs(self):
+        # 就绪检测和资源限制的配置在创建调度器时检查：无效的项给出提示后忽略，启动过程中不再处理配置错误
+        for task in self.tasks:
+            if task.ready_spec:
+                try:
+                    create_probe(task.ready_spec, None)
+                    float(task.ready_spec.get('timeout', DEFAULT_TIMEOUT))
+                except (ValueError, TypeError) as e:
+                    self.problems.append((task, f"就绪检测配置无效，不做检测: {task.name} ({e})"))
+                    task.ready_spec = None
+            if task.resources_spec:
+                try:
+                    parse_resources(task.resources_spec)
+                except ValueError as e:
+                    self.problems.append((task, f"resources 配置无效: {task.name} ({e})"))
+                    task.resources_spec = None
+
+    def cancel(self):
+        self._cancel_event.set()
+        self._events.put(None)
+
+    def run(self):
+        self.t0 = self.clock()
+        self.started_wall = time.time()
+        # 会话开始时并发检查所有路径，等到各自的启动时刻基本都已命中缓存
+        self.validator.submit(task.path for task in self.tasks if self.validator.cached(task.path) is None)
+
+        for task, message in self.problems:
+            self.notify('warning', task, message)
+        for task in self.tasks:
+            if task.if_running is not None and task.if_running not in IF_RUNNING_POLICIES:
+                self.notify('warning', task, f"if_running 取值无效: {task.if_running}，按 {self.if_running} 处理")
+                task.if_running = None
+        if any(self._policy(task) != 'start' for task in self.tasks):
+            self.processes = ProcessTable.snapshot()
+        for task in find_blocked(self.tasks):
+            self._fail(task, f"循环依赖，无法启动: {task.name}", 'dependency_cycle', release=False)
+
+        for task in self.tasks:
+            if task.state == 'pending' and not task.deps:
+                self._arm(task)
+
+        try:
+            self._loop()
+        finally:
+            self.finished_at = self.clock()
+            if self._probe_pool is not None:
+                self._probe_pool.shutdown(wait=False)
+            if self.prefetcher is not None:
+                self.prefetcher.close()
+
+        if not self._cancel_event.is_set():
+            self.notify('finished', None, "全部启动完成")
+        return self.tasks
+
+    def _loop(self):
+        while self._remaining > 0 and not self._cancel_event.is_set():
+            now = self.clock()
+            while self._timers and self._timers[0][0] <= now:
+                _, _, task = heapq.heappop(self._timers)
+                task.state = 'queued'
+                self._queue.append(task)
+            self._admit()
+
+            if self._remaining == 0:
+                break
+            wake_times = [self._timers[0][0]] if self._timers else []
+            if self._queue and self._next_admission_at is not None:
+                wake_times.append(self._next_admission_at)
+            timeout = max(min(wake_times) - self.clock(), 0) if wake_times else None
+            self._wait(timeout)
+
+    def _wait(self, timeout):
+        # 等待下一个延迟到期，或者就绪检测线程送回结果
+        try:
+            event = self._events.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while event is not None:
+            self._handle_probe_result(*event)
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return
+
+    def _arm(self, task):
+        # 依赖全部就绪后开始计算该程序自己的延迟
+        task.state = 'waiting'
+        task.due_at = self.clock() + task.delay
+        heapq.heappush(self._timers, (task.due_at, task.index, task))
+        self.notify('waiting', task, f"正在启动: {task.name} (延迟{task.delay}秒)")
+        self._prefetch(task)
+
+    def _prefetch(self, task):
+        if self.prefetcher is not None and self.validator.cached(task.path) != PATH_MISSING:
+            self.prefetcher.submit(task.path)
+
+    def _admit(self):
+        # 按配置顺序为排队的程序分配并发名额
+        self._queue.sort(key=lambda task: task.index)
+        for task in list(self._queue):
+            if not self._has_slot(task):
+                continue
+            if self.admission is not None and not self._admitted(task):
+                return
+            self._queue.remove(task)
+            self._launch(task)
+
+    def _admitted(self, task):
+        now = self.clock()
+        if self._next_admission_at is not None and now < self._next_admission_at:
+            return False
+        self._next_admission_at = now + self.admission.interval
+
+        reason = self.admission.check()
+        if reason is None:
+            return True
+        waited = now - task.due_at
+        if waited >= self.admission.max_wait:
+            # 等待上限到达后不再推迟，避免程序一直启动不了
+            self.notify('admitted', task, f"系统持续繁忙 ({reason})，已等待{waited:.0f}秒，继续启动: {task.name}")
+            return True
+        if not task.deferred:
+            task.deferred = True
+            self.notify('deferred', task, f"系统繁忙 ({reason})，暂缓启动: {task.name}")
+        return False
+
+    def _has_slot(self, task):
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            return False
+        if task.max_concurrency and self._in_flight >= task.max_concurrency:
+            return False
+        limit = self.group_limits.get(task.group, 0)
+        if limit and self._group_in_flight.get(task.group, 0) >= limit:
+            return False
+        return True
+
+    def _policy(self, task):
+        return task.if_running or self.if_running
+
+    def _launch(self, task):
+        policy = self._policy(task)
+        if policy != 'start' and self.processes is not None:
+            pids = self.processes.find(task.path)
+            if pids:
+                self._skip_running(task, policy, pids)
+                return
+
+        if not self.validator.exists(task.path):
+            self._fail(task, f"程序路径不存在: {task.path}", 'missing_path')
+            return
+
+        task.state = 'starting'
+        self._in_flight += 1
+        self._group_in_flight[task.group] = self._group_in_flight.get(task.group, 0) + 1
+        task.started_at = self.clock()
+        try:
+            task.handle = self.backend.spawn(task.path)
+        except OSError as e:
+            self._release(task)
+            self._fail(task, f"启动失败: {task.name} ({e})", 'spawn_error')
+            return
+
+        pid = task.handle.pid if task.handle.pid is not None else '未知'
+        self.notify('started', task, f"已启动: {task.name} (PID {pid}, "
+                                     f"{task.handle.spawn_latency * 1000:.1f}毫秒)")
+        self._apply_resources(task)
+        if task.ready_spec:
+            # 就绪检测期间顺带预读依赖它的程序，它们会在本程序就绪后开始计时
+            for dependent in task.dependents:
+                if dependent.state == 'pending':
+                    self._prefetch(dependent)
+            self._start_probe(task)
+        else:
+            self._mark_ready(task)
+
+    def _apply_resources(self, task):
+        if self.resource_controller is None or not task.resources_spec:
+            return
+        spec = parse_resources(task.resources_spec)  # 创建调度器时已检查过
+        if task.handle.pid is None:
+            self.notify('warning', task, f"无法设置资源限制: {task.name} (拿不到进程号)")
+            return
+        for problem in self.resource_controller.apply(task.name, task.handle.pid, spec):
+            self.notify('warning', task, f"资源设置未生效: {task.name} ({problem})")
+
+    def _start_probe(self, task):
+        # 配置在创建调度器时已检查过（见 _check_specs）
+        probe = create_probe(task.ready_spec, task.handle)
+        timeout = float(task.ready_spec.get('timeout', DEFAULT_TIMEOUT))
+
+        if self._probe_pool is None:
+            workers = sum(1 for t in self.tasks if t.ready_spec)
+            self._probe_pool = ThreadPoolExecutor(max_workers=min(max(workers, 1), 32),
+                                                  thread_name_prefix='probe')
+        self.notify('probing', task, f"等待就绪: {task.name} ({probe.describe()})")
+        self._probe_pool.submit(self._run_probe, task, probe, timeout)
+
+    def _run_probe(self, task, probe, timeout):
+        # 在检测线程中运行，结果交回调度线程处理
+        try:
+            result = wait_ready(probe, timeout, self._cancel_event)
+        except ProbeFailed as e:
+            result = e
+        except Exception as e:
+            result = ProbeFailed(str(e))
+        self._events.put((task, result))
+
+    def _handle_probe_result(self, task, result):
+        if isinstance(result, ProbeFailed):
+            self._release(task)
+            self._fail(task, f"启动后异常: {task.name} ({result})", 'probe_failed')
+            return
+        if result:
+            elapsed = self.clock() - task.started_at
+            self.notify('ready', task, f"已就绪: {task.name} ({elapsed:.1f}秒)")
+        else:
+            # 超时后按旧版固定延迟的方式继续，不让一个程序卡住整个启动过程
+            self.notify('timeout', task, f"就绪检测超时，继续启动: {task.name}")
+        self._mark_ready(task)
+
+    def _skip_running(self, task, policy, pids):
+        # 已在运行的程序视为已就绪，依赖它的程序照常继续
+        task.state = 'skipped'
+        task.ready_at = self.clock()
+        self._remaining -= 1
+        if policy == 'focus' and focus_process(pids):
+            self.notify('running', task, f"已在运行，尝试切换到窗口: {task.name} (PID {pids[0]})")
+        else:
+            self.notify('running', task, f"已在运行，跳过: {task.name} (PID {pids[0]})")
+        self._wake_dependents(task)
+
+    def _release(self, task):
+        self._in_flight -= 1
+        self._group_in_flight[task.group] -= 1
+
+    def _mark_ready(self, task):
+        self._release(task)
+        task.state = 'ready'
+        task.ready_at = self.clock()
+        self._remaining -= 1
+        self._wake_dependents(task)
+
+    def _fail(self, task, message, reason, release=True):
+        # 失败的程序视为已完成，依赖它的程序继续启动（与旧版跳过不存在路径的行为一致）
+        task.state = 'failed'
+        task.error = message
+        task.failure = reason
+        self._remaining -= 1
+        self.notify('failed', task, message)
+        if release:
+            self._wake_dependents(task)
+
+    def _wake_dependents(self, task):
+        for dependent in task.dependents:
+            if dependent.state == 'pending' and all(dep.done for dep in dependent.deps):
+                self._arm(dependent)
+
+
+def create_backend(config_data):
+    return get_backend(config_data.get('backend'), config_data.get('start_new_session', True))
+
+
+def create_scheduler(config_data, programs, notify=print_event, validator=None):
+    return LaunchScheduler(
+        programs,
+        parallel=config_data.get('parallel', False),
+        max_concurrency=config_data.get('max_concurrency', 0),
+        groups=config_data.get('groups'),
+        notify=notify,
+        backend=create_backend(config_data),
+        admission=create_admission(config_data),
+        validator=validator,
+        prefetcher=create_prefetcher(config_data),
+        if_running=config_data.get('if_running', DEFAULT_IF_RUNNING),
+        resource_controller=create_resource_controller(config_data, programs),
+    )
+
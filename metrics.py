@@ -0,0 +1,348 @@
+import http.server
+import math
+import os
+import re
+import tempfile
+import threading
+
+# 运行指标：以 Prometheus 文本格式导出启动和守护的统计，便于在多台机器上画图和告警。
+#
+# "metrics": {
+#     "textfile": "/var/lib/node_exporter/textfile_collector/faststart.prom",   # 供 node_exporter 的 textfile collector 读取
+#     "port": 9477                                                            # 界面常驻时在 http://127.0.0.1:9477/metrics 提供
+# }
+#
+# 指标在每次启动会话结束、守护的程序退出或重启、定时启动触发时累加，导出时只格式化当前的值，不从启动记录重新统计。
+# textfile 中已有的计数在下次运行时读回来接着累加，--launch 每次都是新进程也不会从 0 开始。
+# 端口默认只监听本机，可用 "host" 修改；--launch 启动后即退出，只写 textfile。
+
+SPAWN_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+READY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+DRIFT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0)
+SCHEDULE_DRIFT_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 3600.0)
+DEFAULT_HOST = '127.0.0.1'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)$')
+LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def unescape_label(value):
+    return re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), value)
+
+
+def format_value(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def parse_sample(line):
+    # "名称{标签} 值" -> (名称, {标签}, 值)；注释和无法解析的行返回 None
+    match = SAMPLE_PATTERN.match(line.strip())
+    if match is None:
+        return None
+    name, labels, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        return None
+    return name, {key: unescape_label(text) for key, text in LABEL_PATTERN.findall(labels or '')}, value
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def sample_names(self):
+        return (self.name,)
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, list(zip(self.labelnames, labels)), value
+
+    def key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def restore(self, name, labels, value):
+        self.values[self.key(labels)] = value
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, labels=()):
+        self.values[labels] = value
+
+
+class Histogram(Counter):
+    # 每组标签保存各桶的累计计数，最后两项为总和与次数
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames, buckets):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def state(self, labels):
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        return state
+
+    def observe(self, value, labels=()):
+        state = self.state(labels)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def sample_names(self):
+        return (self.name + '_bucket', self.name + '_sum', self.name + '_count')
+
+    def samples(self):
+        for labels, state in sorted(self.values.items()):
+            pairs = list(zip(self.labelnames, labels))
+            for bound, count in zip(self.buckets, state):
+                yield self.name + '_bucket', pairs + [('le', format_value(bound))], count
+            yield self.name + '_bucket', pairs + [('le', '+Inf')], state[-1]
+            yield self.name + '_sum', pairs, state[-2]
+            yield self.name + '_count', pairs, state[-1]
+
+    def restore(self, name, labels, value):
+        state = self.state(self.key(labels))
+        if name.endswith('_sum'):
+            state[-2] = value
+        elif name.endswith('_count'):
+            state[-1] = value
+        else:
+            try:
+                bound = float(labels.get('le', ''))
+            except ValueError:
+                return
+            # 桶的划分变了时对不上的桶直接丢弃
+            for i, known in enumerate(self.buckets):
+                if math.isclose(bound, known):
+                    state[i] = value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.families = []
+        self.lock = threading.Lock()
+
+    def add(self, family):
+        self.families.append(family)
+        return family
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for family in self.families:
+                lines.append(f"# HELP {family.name} {family.help_text}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for name, pairs, value in family.samples():
+                    lines.append(f"{name}{format_labels(pairs)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def restore(self, text):
+        index = {name: family for family in self.families for name in family.sample_names()}
+        with self.lock:
+            for line in text.splitlines():
+                sample = parse_sample(line)
+                if sample is not None and sample[0] in index:
+                    index[sample[0]].restore(*sample)
+
+
+def write_textfile(path, text):
+    # 启动线程和界面线程可能同时写入，每次使用单独的临时文件，写完原子替换，不会读到写了一半的文件；
+    # 临时文件不以 .prom 结尾，不会被 collector 读到。node_exporter 一般以其他用户运行，
+    # mkstemp 创建的文件为 0600，替换前改为普通权限
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                     prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class LaunchMetrics:
+    def __init__(self, textfile=None):
+        self.textfile = textfile
+        self._write_lock = threading.Lock()
+        self.registry = registry = MetricsRegistry()
+        self.sessions = registry.add(Counter(
+            'faststart_launch_sessions_total', "启动会话次数", ('profile',)))
+        self.last_session = registry.add(Gauge(
+            'faststart_last_session_timestamp_seconds', "最近一次启动会话开始的时间 (Unix 时间)", ('profile',)))
+        self.session_duration = registry.add(Gauge(
+            'faststart_last_session_duration_seconds', "最近一次启动会话的总耗时", ('profile',)))
+        self.spawn_latency = registry.add(Histogram(
+            'faststart_spawn_latency_seconds', "创建进程的耗时", ('program',), SPAWN_BUCKETS))
+        self.ready_time = registry.add(Histogram(
+            'faststart_ready_seconds', "从创建进程到就绪的耗时", ('program',), READY_BUCKETS))
+        self.drift = registry.add(Histogram(
+            'faststart_launch_drift_seconds', "计划启动时刻（依赖就绪加延迟）与实际创建进程时刻之差",
+            ('program',), DRIFT_BUCKETS))
+        self.failures = registry.add(Counter(
+            'faststart_launch_failures_total', "启动失败次数", ('program', 'reason')))
+        self.skipped = registry.add(Counter(
+            'faststart_launch_skipped_total', "已在运行而跳过的次数", ('program',)))
+        self.exits = registry.add(Counter(
+            'faststart_supervised_exits_total', "守护中的程序退出次数", ('program',)))
+        self.restarts = registry.add(Counter(
+            'faststart_restarts_total', "守护重启次数", ('program',)))
+        self.schedule_drift = registry.add(Histogram(
+            'faststart_schedule_drift_seconds', "定时启动的计划时间与实际触发时间之差", (), SCHEDULE_DRIFT_BUCKETS))
+
+    def load(self):
+        # 读回上次写入的计数；文件不存在或无法读取时从 0 开始
+        if not self.textfile:
+            return self
+        try:
+            with open(self.textfile, 'r', encoding='utf-8') as f:
+                self.registry.restore(f.read())
+        except OSError:
+            pass
+        return self
+
+    def write(self):
+        if not self.textfile:
+            return
+        try:
+            # 格式化和替换放在同一把锁内，较早的内容不会覆盖较新的
+            with self._write_lock:
+                write_textfile(self.textfile, self.registry.render())
+        except OSError as e:
+            print(f"写入运行指标失败: {e}")
+
+    def observe_session(self, scheduler, profile=None):
+        profile = (profile or '',)
+        with self.registry.lock:
+            self.sessions.inc(profile)
+            self.last_session.set(scheduler.started_wall, profile)
+            self.session_duration.set(scheduler.finished_at - scheduler.t0, profile)
+            for task in scheduler.tasks:
+                program = (task.name,)
+                if task.handle is not None:
+                    self.spawn_latency.observe(task.handle.spawn_latency, program)
+                if task.started_at is not None and task.due_at is not None:
+                    self.drift.observe(max(task.started_at - task.due_at, 0.0), program)
+                if task.state == 'ready' and task.started_at is not None:
+                    self.ready_time.observe(task.ready_at - task.started_at, program)
+                elif task.state == 'failed':
+                    self.failures.inc((task.name, task.failure or 'unknown'))
+                elif task.state == 'skipped':
+                    self.skipped.inc(program)
+        self.write()
+
+    def observe_exit(self, name):
+        with self.registry.lock:
+            self.exits.inc((name,))
+        self.write()
+
+    def observe_restart(self, name, error=None):
+        # 重启时创建进程失败按 restart_error 计入启动失败
+        with self.registry.lock:
+            if error is None:
+                self.restarts.inc((name,))
+            else:
+                self.failures.inc((name, 'restart_error'))
+        self.write()
+
+    def observe_schedule(self, planned, fired):
+        with self.registry.lock:
+            self.schedule_drift.observe(max((fired - planned).total_seconds(), 0.0))
+        self.write()
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.metrics.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    # 在后台线程中提供 /metrics，每次请求只格式化当前的值
+    def __init__(self, metrics, port, host=DEFAULT_HOST):
+        self.server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.metrics = metrics
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-server', daemon=True)
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def metrics_settings(config_data):
+    settings = config_data.get('metrics')
+    return settings if isinstance(settings, dict) else None
+
+
+def textfile_path(settings, config_path):
+    path = settings.get('textfile')
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(config_path), path)
+
+
+def create_metrics(config_data, config_path):
+    # 未配置 metrics 时返回 None
+    settings = metrics_settings(config_data)
+    if settings is None:
+        return None
+    return LaunchMetrics(textfile_path(settings, config_path)).load()
+
+
+def start_metrics_server(metrics, config_data):
+    # 未配置端口时返回 None；端口被占用等错误抛出 OSError
+    settings = metrics_settings(config_data)
+    if not settings.get('port'):
+        return None
+    return MetricsServer(metrics, int(settings['port']), settings.get('host', DEFAULT_HOST)).start()
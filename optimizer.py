@@ -0,0 +1,373 @@
+import heapq
+import math
+import os
+import time
+from collections import defaultdict
+
+from history import percentile
+from launcher import build_tasks, find_blocked
+from simulate import simulate
+
+# 启动顺序优化：根据 launch_history.jsonl 中各程序实测的就绪耗时和资源占用，在当前并发上限下
+# 重新安排顺序和延迟，让全部程序尽早就绪。
+#
+# 模型：程序从启动到就绪期间占用一个并发名额；I/O 密集的程序同时运行时平分磁盘，CPU 密集的程序超过
+# CPU 核心数时平分 CPU，耗时相应拉长。优化时关键路径长（自身耗时加上依赖它的程序）的程序先启动，
+# 同类的重负载程序错开启动。没有启动记录的程序保留原来的延迟。
+#
+# 只在并行模式 (parallel) 下优化：串行模式下每个程序都等上一个程序，顺序不影响总耗时。
+# 界面中“优化顺序”先预览预计总耗时再应用；"auto_optimize": true 时每次启动都按优化结果启动（不修改配置）。
+
+DEFAULT_DAYS = 30
+IO_HEAVY_MB_PER_S = 20     # 就绪前平均每秒读盘超过该值视为 I/O 密集
+CPU_HEAVY_RATIO = 0.5      # 就绪前 CPU 时间占耗时的比例超过该值视为 CPU 密集
+MIN_IMPROVEMENT = 0.05     # 预计总耗时至少缩短这么多秒才算有改进
+MAX_PRUNE_TRIALS = 32      # 逐个尝试去掉延迟时最多再模拟这么多次（每次模拟与程序数成正比）
+EPSILON = 1e-9
+
+KIND_LABELS = {'io': 'I/O 密集', 'cpu': 'CPU 密集', 'light': '轻量', None: '无记录'}
+
+
+class ProgramProfile:
+    # 某个程序在历次启动中的 p50：就绪耗时、就绪前的 CPU 时间和读盘量
+    __slots__ = ('name', 'duration', 'cpu_time', 'io_read_mb', 'samples')
+
+    def __init__(self, name, duration, cpu_time=None, io_read_mb=None, samples=0):
+        self.name = name
+        self.duration = duration
+        self.cpu_time = cpu_time
+        self.io_read_mb = io_read_mb
+        self.samples = samples
+
+    @property
+    def kind(self):
+        if self.duration <= 0:
+            return 'light'
+        if self.io_read_mb is not None and self.io_read_mb / self.duration >= IO_HEAVY_MB_PER_S:
+            return 'io'
+        if self.cpu_time is not None and self.cpu_time / self.duration >= CPU_HEAVY_RATIO:
+            return 'cpu'
+        return 'light'
+
+
+def load_profiles(records, days=DEFAULT_DAYS):
+    sessions = {r['session'] for r in records
+                if r.get('type') == 'session' and (not days or r.get('time', 0) >= time.time() - days * 86400)}
+    samples = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        if (record.get('type') != 'program' or record.get('session') not in sessions
+                or record.get('status') != 'ready' or record.get('time_to_ready') is None):
+            continue
+        values = samples[record['name']]
+        values['duration'].append(record['time_to_ready'] + (record.get('spawn_latency') or 0))
+        for key in ('cpu_time', 'io_read_mb'):
+            if record.get(key) is not None:
+                values[key].append(record[key])
+    return {name: ProgramProfile(name, percentile(values['duration'], 50), percentile(values['cpu_time'], 50),
+                                 percentile(values['io_read_mb'], 50), len(values['duration']))
+            for name, values in samples.items()}
+
+
+class WorkloadModel:
+    def __init__(self, profiles, cpu_count=None):
+        self.profiles = profiles
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+
+    def profile(self, task):
+        return self.profiles.get(task.name)
+
+    def work(self, task):
+        profile = self.profile(task)
+        return profile.duration if profile is not None else 0.0
+
+    def kind(self, task):
+        profile = self.profile(task)
+        return profile.kind if profile is not None else None
+
+    def rates(self, running):
+        # 各程序当前的推进速度（1 为独占时的速度）
+        counts = defaultdict(int)
+        for task in running:
+            counts[self.kind(task)] += 1
+        rates = {}
+        for task in running:
+            kind = self.kind(task)
+            if kind == 'io':
+                rates[task] = 1.0 / counts['io']
+            elif kind == 'cpu':
+                rates[task] = min(1.0, self.cpu_count / counts['cpu'])
+            else:
+                rates[task] = 1.0
+        return rates
+
+
+class Prediction:
+    __slots__ = ('starts', 'readies', 'blocked')
+
+    def __init__(self, starts, readies, blocked):
+        self.starts = starts
+        self.readies = readies
+        self.blocked = blocked
+
+    @property
+    def makespan(self):
+        return max(self.readies.values(), default=0.0)
+
+    def score(self):
+        # 先比总耗时，再比各程序就绪时刻之和（错开重负载程序不缩短总耗时，但能让多数程序更早就绪）
+        return round(self.makespan, 6), round(sum(self.readies.values()), 6)
+
+
+def run_model(tasks, model, delay_of, can_start, order_key):
+    # 按模型安排一次启动（优化时使用自己的顺序和错峰规则）：返回各程序的启动时刻和就绪时刻
+    blocked = set(find_blocked(tasks))
+    now = 0.0
+    timers = [(delay_of(task), task.index, task) for task in tasks if not task.deps and task not in blocked]
+    heapq.heapify(timers)
+    queue = []
+    running = {}
+    starts = {}
+    readies = {}
+
+    def finish(task):
+        readies[task] = now
+        for dependent in task.dependents:
+            if dependent not in blocked and dependent not in starts and all(dep in readies for dep in dependent.deps):
+                heapq.heappush(timers, (now + delay_of(dependent), dependent.index, dependent))
+
+    while timers or queue or running:
+        while timers and timers[0][0] <= now + EPSILON:
+            queue.append(heapq.heappop(timers)[2])
+        queue.sort(key=order_key)
+        for task in list(queue):
+            if can_start(task, running):
+                queue.remove(task)
+                starts[task] = now
+                work = model.work(task)
+                if work > 0:
+                    running[task] = work
+                else:
+                    finish(task)
+        if timers and timers[0][0] <= now + EPSILON:
+            continue  # 刚就绪的程序唤醒了不需要延迟的依赖者
+
+        rates = model.rates(running)
+        steps = [remaining / rates[task] for task, remaining in running.items()]
+        if timers:
+            steps.append(timers[0][0] - now)
+        if not steps:
+            break
+        step = max(min(steps), 0.0)
+        now += step
+        for task in list(running):
+            running[task] -= rates[task] * step
+            if running[task] <= EPSILON:
+                del running[task]
+                finish(task)
+    return Prediction({task.index: value for task, value in starts.items()},
+                      {task.index: value for task, value in readies.items()},
+                      sorted(task.index for task in blocked))
+
+
+def slot_checker(settings):
+    # 与调度器相同的并发限制：总上限、程序自己的上限、分组上限
+    max_concurrency = int(settings.get('max_concurrency') or 0)
+    group_limits = {}
+    for name, group_data in (settings.get('groups') or {}).items():
+        limit = group_data.get('max_concurrency') if isinstance(group_data, dict) else group_data
+        group_limits[name] = int(limit or 0)
+
+    def has_slot(task, running):
+        if max_concurrency and len(running) >= max_concurrency:
+            return False
+        if task.max_concurrency and len(running) >= task.max_concurrency:
+            return False
+        limit = group_limits.get(task.group, 0)
+        return not limit or sum(1 for other in running if other.group == task.group) < limit
+
+    return has_slot
+
+
+def predict(programs, settings, model, validator=None):
+    # 在虚拟时钟上运行真正的调度器得到预计结果（见 simulate.py）
+    return simulate(programs, settings, model, validator).prediction()
+
+
+def critical_paths(tasks, model):
+    # 自身耗时加上依赖它的程序中最长的一条链
+    lengths = {}
+    for task in reversed(topological_order(tasks)):
+        lengths[task] = model.work(task) + max((lengths.get(dependent, 0.0) for dependent in task.dependents),
+                                               default=0.0)
+    return lengths
+
+
+def topological_order(tasks):
+    blocked = set(find_blocked(tasks))
+    order = []
+    remaining = {task: len(task.deps) for task in tasks if task not in blocked}
+    ready = [task for task, count in remaining.items() if count == 0]
+    while ready:
+        task = ready.pop()
+        order.append(task)
+        for dependent in task.dependents:
+            if dependent in remaining:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+    return order
+
+
+class OptimizeResult:
+    # programs 为建议的程序列表（已按建议顺序排列）；没有改进时为 None，message 说明原因
+    __slots__ = ('current', 'proposed', 'programs', 'order', 'message', 'profiles')
+
+    def __init__(self, current, proposed=None, programs=None, order=None, message='', profiles=None):
+        self.current = current
+        self.proposed = proposed
+        self.programs = programs
+        self.order = order or []
+        self.message = message
+        self.profiles = profiles or {}
+
+
+def optimize(programs, settings, profiles, cpu_count=None, validator=None):
+    # validator 只用于读取已有的路径检查结果（见 simulate.py），不访问文件系统
+    model = WorkloadModel(profiles, cpu_count)
+    current = predict(programs, settings, model, validator)
+    if not settings.get('parallel', False):
+        return OptimizeResult(current, message="串行模式下顺序不影响总耗时，开启并行启动 (parallel) 后才能优化",
+                              profiles=profiles)
+    if not any(item_data.get('name') in profiles for item_data in programs):
+        return OptimizeResult(current, message="还没有启动记录，无法优化", profiles=profiles)
+
+    tasks, _ = build_tasks(programs, True)
+    lengths = critical_paths(tasks, model)
+    has_slot = slot_checker(settings)
+    heavy_limits = {'io': 1, 'cpu': model.cpu_count}
+
+    def delay_of(task):
+        # 有记录的程序由模型决定何时启动；没有记录的程序保留原来的延迟
+        return 0 if model.profile(task) is not None else task.delay
+
+    def can_start(task, running):
+        # 同类的重负载程序错开启动；没有其他程序在运行时总可以启动
+        kind = model.kind(task)
+        if kind in heavy_limits and sum(1 for other in running if model.kind(other) == kind) >= heavy_limits[kind]:
+            return False
+        return has_slot(task, running)
+
+    schedule = run_model(tasks, model, delay_of, can_start, lambda task: (-lengths.get(task, 0.0), task.index))
+
+    # 把推演出的启动时刻换算为配置中的顺序和延迟（延迟为整数秒，向下取整，剩下的交给并发排队）
+    order = []
+    for task in sorted(tasks, key=lambda task: (schedule.starts.get(task.index, math.inf),
+                                                -lengths.get(task, 0.0), task.index)):
+        start = schedule.starts.get(task.index)
+        if start is None or model.profile(task) is None:
+            delay = task.delay
+        else:
+            earliest = max((schedule.readies[dep.index] for dep in task.deps), default=0.0)
+            delay = max(int(math.floor(start - earliest + EPSILON)), 0)
+        order.append((task.index, delay))
+    proposed_programs = [dict(programs[index], delay=delay) for index, delay in order]
+    proposed = predict(proposed_programs, settings, model, validator)
+
+    # 只是在等并发名额的程序不需要延迟，排队即可；去掉不会让预计结果变差的延迟，实际耗时有出入时更稳妥。
+    # 先一次去掉全部延迟，结果变差时再从前往后逐个尝试，最多 MAX_PRUNE_TRIALS 次，程序很多时也不会模拟上百次
+    positions = [position for position, (index, delay) in enumerate(order)
+                 if delay and model.profile(tasks[index]) is not None]
+    if positions:
+        proposed_programs, proposed = prune_delays(proposed_programs, proposed, positions, order,
+                                                   settings, model, validator)
+
+    if proposed.makespan > current.makespan - MIN_IMPROVEMENT:
+        return OptimizeResult(current, proposed, message="当前的顺序和延迟已经是最优的", profiles=profiles)
+    return OptimizeResult(current, proposed, proposed_programs, order,
+                          f"预计总耗时 {current.makespan:.1f} 秒 → {proposed.makespan:.1f} 秒", profiles)
+
+
+def prune_delays(programs, prediction, positions, order, settings, model, validator):
+    # 把 positions 中的延迟改为 0，只保留不会让预计结果变差的修改；同时更新 order
+    def without_delays(programs, positions):
+        candidate = list(programs)
+        for position in positions:
+            candidate[position] = dict(candidate[position], delay=0)
+        return candidate
+
+    trials = [positions] if len(positions) > 1 else []
+    trials += [[position] for position in positions[:MAX_PRUNE_TRIALS]]
+    for trial in trials:
+        candidate = without_delays(programs, trial)
+        candidate_prediction = predict(candidate, settings, model, validator)
+        if candidate_prediction.score() <= prediction.score():
+            programs, prediction = candidate, candidate_prediction
+            for position in trial:
+                order[position] = (order[position][0], 0)
+            if trial is positions:
+                break
+    return programs, prediction
+
+
+def load_history_profiles(config_data, config_path, days=DEFAULT_DAYS):
+    from history import history_path, read_history
+
+    try:
+        records = read_history(history_path(config_data, config_path))
+    except FileNotFoundError:
+        return {}
+    except OSError as e:
+        print(f"读取启动记录失败: {e}")
+        return {}
+    return load_profiles(records, days)
+
+
+def auto_optimize(config_data, config_path, programs, settings, validator=None):
+    # "auto_optimize": true 时返回按优化结果排列的程序列表，没有改进时原样返回
+    if not settings.get('auto_optimize'):
+        return programs
+    profiles = load_history_profiles(config_data, config_path)
+    if not profiles:
+        # 还没有启动记录时优化不出结果，不必在启动前模拟
+        return programs
+    result = optimize(programs, settings, profiles, validator=validator)
+    return result.programs or programs
+
+
+PREVIEW_COLUMNS = ("程序", "类型", "就绪耗时", "当前延迟", "建议延迟", "当前就绪", "预计就绪")
+
+
+def preview_rows(programs, result):
+    # 按建议顺序（没有建议时按原顺序）列出各程序，界面预览和 --optimize 共用
+    proposed_readies = {}
+    if result.programs is not None:
+        proposed_readies = {index: result.proposed.readies.get(position)
+                            for position, (index, _) in enumerate(result.order)}
+    order = result.order or [(index, programs[index].get('delay', 0)) for index in range(len(programs))]
+    rows = []
+    for index, delay in order:
+        item_data = programs[index]
+        profile = result.profiles.get(item_data.get('name'))
+        rows.append((item_data.get('name', ''),
+                     KIND_LABELS[profile.kind if profile is not None else None],
+                     format_seconds(None if profile is None else profile.duration),
+                     str(item_data.get('delay', 0)),
+                     str(delay),
+                     format_seconds(result.current.readies.get(index)),
+                     format_seconds(proposed_readies.get(index))))
+    return rows
+
+
+def format_preview(programs, result):
+    widths = (24, 10, 8, 8, 8, 10, 10)
+    lines = [result.message, '', ''.join(f"{column:<{width}}" for column, width in zip(PREVIEW_COLUMNS, widths))]
+    for row in preview_rows(programs, result):
+        lines.append(''.join(f"{value:<{width}}" for value, width in zip(row, widths)))
+    lines += ['', f"当前预计总耗时: {result.current.makespan:.1f} 秒"]
+    if result.proposed is not None:
+        lines.append(f"优化后预计总耗时: {result.proposed.makespan:.1f} 秒")
+    return '\n'.join(lines)
+
+
+def format_seconds(value):
+    return '-' if value is None else f"{value:.1f}"
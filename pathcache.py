@@ -0,0 +1,89 @@
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 路径检查：在线程池中并发 stat 所有程序路径，并缓存结果。
+# 网络共享或休眠的磁盘上一次 stat 可能阻塞数秒，界面线程只读取缓存，不直接访问文件系统。
+
+PATH_OK = 'ok'
+PATH_MISSING = 'missing'
+PATH_NOT_EXECUTABLE = 'not_executable'
+
+STATUS_MESSAGES = {
+    PATH_OK: '',
+    PATH_MISSING: '程序路径不存在',
+    PATH_NOT_EXECUTABLE: '不是可执行文件，将用关联程序打开',
+}
+
+
+def stat_path(path):
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return PATH_MISSING
+    if os.name != 'posix':
+        return PATH_OK
+    if stat.S_ISDIR(st.st_mode) or not st.st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
+        return PATH_NOT_EXECUTABLE
+    return PATH_OK
+
+
+class PathValidator:
+    def __init__(self, ttl=10, max_workers=8, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor = None
+
+    def cached(self, path):
+        # 缓存过期或没有记录时返回 None
+        with self._lock:
+            entry = self._cache.get(path)
+        if entry is None or self.clock() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def check(self, path):
+        # 阻塞检查并更新缓存，只应在后台线程中调用
+        status = stat_path(path)
+        with self._lock:
+            self._cache[path] = (status, self.clock())
+        return status
+
+    def status(self, path):
+        cached = self.cached(path)
+        return cached if cached is not None else self.check(path)
+
+    def exists(self, path):
+        return bool(path) and self.status(path) != PATH_MISSING
+
+    def submit(self, paths, callback=None):
+        # 并发检查多个路径；callback(path, status) 在工作线程中调用
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='path-check')
+        for path in dict.fromkeys(paths):
+            if path:
+                self._executor.submit(self._check_and_report, path, callback)
+
+    def _check_and_report(self, path, callback):
+        status = self.check(path)
+        if callback is not None:
+            callback(path, status)
+
+    def prime(self, statuses):
+        # 写入已知的检查结果（如启动计划编译时的结果）
+        now = self.clock()
+        with self._lock:
+            for path, status in statuses.items():
+                self._cache[path] = (status, now)
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import threading
+
+from config import write_config_atomic
+from pathcache import PATH_MISSING
+
+# 启动方案：start.json 的 profiles 中可以定义多个方案，方案可以继承另一个方案再做修改。
+#
+# "profile": "工作",                         # 界面和 --launch 默认使用的方案；不设置时使用顶层 programs
+# "profiles": {
+#     "工作": {"extends": "", "parallel": true},   # extends 为 "" 表示继承顶层 programs
+#     "精简": {"extends": "工作", "exclude": ["微信"],
+#              "programs": [{"name": "clash", "delay": 0}, {"name": "记事本", "path": "..."}]}
+# }
+#
+# 继承时与上级同名的条目只覆盖给出的字段，其余条目追加到末尾；没有 extends 的方案只包含自己的 programs。
+# parallel、max_concurrency 等启动设置未在方案中指定时沿用顶层配置。
+#
+# 每个方案编译为启动计划：展开继承、解析路径 (~ 和环境变量)、记录已检查过的路径状态，并记录内容的校验和。
+# 编译时不访问文件系统（界面线程中也会编译），路径由后台的路径检查负责。
+# 计划缓存在配置文件旁的 start.json.plan 中，只有方案内容（校验和）变化时才重新编译。
+
+DEFAULT_PROFILE = ''
+PLAN_SETTINGS = ('parallel', 'max_concurrency', 'groups', 'admission', 'prefetch', 'backend', 'start_new_session',
+                 'if_running', 'cgroup_root', 'auto_optimize')
+PLAN_VERSION = 2
+
+
+def plan_cache_path(config_path):
+    return config_path + '.plan'
+
+
+def profile_names(config_data):
+    return list(config_data.get('profiles', {}))
+
+
+def active_profile(config_data, profile=None):
+    # 命令行或界面指定的方案优先，其次是配置中保存的 profile
+    if profile is not None:
+        return profile
+    return config_data.get('profile') or DEFAULT_PROFILE
+
+
+def resolve_profile(config_data, name, chain=()):
+    # 返回 (programs, settings)；方案不存在时抛出 KeyError，循环继承时抛出 ValueError
+    settings = {key: config_data[key] for key in PLAN_SETTINGS if key in config_data}
+    if not name:
+        return [dict(item_data) for item_data in config_data.get('programs', [])], settings
+
+    profiles = config_data.get('profiles', {})
+    if name not in profiles:
+        raise KeyError(name)
+    if name in chain:
+        raise ValueError(f"启动方案循环继承: {' -> '.join(chain + (name,))}")
+    profile_data = profiles[name]
+
+    parent = profile_data.get('extends')
+    if parent is None:
+        programs = []
+    else:
+        programs, settings = resolve_profile(config_data, parent, chain + (name,))
+
+    excluded = set(profile_data.get('exclude', []))
+    programs = [item_data for item_data in programs if item_data.get('name') not in excluded]
+    inherited = {item_data.get('name'): item_data for item_data in programs}
+    for item_data in profile_data.get('programs', []):
+        if item_data.get('name') in inherited:
+            inherited[item_data.get('name')].update(item_data)
+        else:
+            programs.append(dict(item_data))
+
+    settings.update({key: profile_data[key] for key in PLAN_SETTINGS if key in profile_data})
+    return programs, settings
+
+
+def resolve_path(path):
+    return os.path.expandvars(os.path.expanduser(path)) if path else path
+
+
+def resolve_programs(programs):
+    return [dict(item_data, path=resolve_path(item_data.get('path', ''))) for item_data in programs]
+
+
+def plan_checksum(programs, settings):
+    # programs 为展开 ~ 和环境变量之后的条目：HOME 或路径中用到的环境变量变化时也重新编译
+    text = json.dumps({'programs': programs, 'settings': settings}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LaunchPlan:
+    # 编译好的启动计划：programs 中的路径已解析，statuses 为编译时已有的路径检查结果
+    __slots__ = ('profile', 'checksum', 'programs', 'settings', 'statuses')
+
+    def __init__(self, profile, checksum, programs, settings, statuses):
+        self.profile = profile
+        self.checksum = checksum
+        self.programs = programs
+        self.settings = settings
+        self.statuses = statuses
+
+    def prime(self, validator):
+        # 把编译时检查过的路径放入缓存，启动时不再逐个 stat；
+        # 当时不存在的路径不放入，启动时重新检查（程序可能已经安装）
+        validator.prime({path: status for path, status in self.statuses.items() if status != PATH_MISSING})
+
+    def to_dict(self):
+        return {'profile': self.profile, 'checksum': self.checksum, 'programs': self.programs,
+                'settings': self.settings, 'statuses': self.statuses}
+
+    @classmethod
+    def from_dict(cls, plan_data):
+        return cls(plan_data['profile'], plan_data['checksum'], plan_data['programs'],
+                   plan_data['settings'], plan_data['statuses'])
+
+
+def build_plan(name, programs, settings, validator=None, checksum=None):
+    # programs 为已展开路径的条目
+    checksum = checksum or plan_checksum(programs, settings)
+    statuses = {}
+    if validator is not None:
+        # 只取缓存中的结果；没有检查过的路径不记录，启动时由调度器交给检查线程
+        for item_data in programs:
+            status = validator.cached(item_data['path']) if item_data['path'] else None
+            if status is not None:
+                statuses[item_data['path']] = status
+    return LaunchPlan(name, checksum, programs, settings, statuses)
+
+
+class PlanCache:
+    # 内存中和磁盘上 (path) 各保存一份；path 为 None 时只缓存在内存中
+    def __init__(self, path=None):
+        self.path = path
+        self._plans = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._plans is None:
+            self._plans = {}
+            if self.path is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        cache_data = json.load(f)
+                    if cache_data.get('version') == PLAN_VERSION:
+                        self._plans = {name: LaunchPlan.from_dict(plan_data)
+                                       for name, plan_data in cache_data.get('plans', {}).items()}
+                except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                    pass  # 缓存损坏或不存在时重新编译
+        return self._plans
+
+    def get(self, config_data, profile=None, validator=None):
+        # 返回 (计划, 是否重新编译)
+        name = active_profile(config_data, profile)
+        programs, settings = resolve_profile(config_data, name)
+        programs = resolve_programs(programs)
+        checksum = plan_checksum(programs, settings)
+        with self._lock:
+            plan = self._load().get(name)
+        if plan is not None and plan.checksum == checksum:
+            return plan, False
+
+        plan = build_plan(name, programs, settings, validator, checksum)
+        with self._lock:
+            plans = self._load()
+            plans[name] = plan
+            # 删除的方案不再保留
+            known = set(profile_names(config_data)) | {DEFAULT_PROFILE}
+            for stale in [key for key in plans if key not in known]:
+                del plans[stale]
+            self._save(plans)
+        return plan, True
+
+    def _save(self, plans):
+        if self.path is None:
+            return
+        text = json.dumps({'version': PLAN_VERSION,
+                           'plans': {name: plan.to_dict() for name, plan in plans.items()}},
+                          ensure_ascii=False, indent=4)
+        try:
+            write_config_atomic(self.path, text, backup=False)
+        except OSError as e:
+            print(f"保存启动计划失败: {e}")
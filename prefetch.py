@@ -0,0 +1,304 @@
+import glob
+import os
+import shutil
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 预读：在程序等待启动（delay 计时、等待依赖就绪）期间，提前把可执行文件及其依赖的共享库
+# 读入页缓存，轮到它启动时就不必再等磁盘。Linux 上用 posix_fadvise(WILLNEED) 交给内核异步预读；
+# 其他系统没有该接口，只有在配置中明确开启时才改为顺序读取一遍。
+# 每次启动会话预读的总量受 budget_mb 限制，同一个文件（如 libc）只预读一次。
+#
+# "prefetch": {"enabled": true, "budget_mb": 256, "libraries": true}
+# "prefetch": false                                 # 关闭预读
+
+DEFAULT_BUDGET_MB = 256
+MAX_LIBRARIES = 256
+READ_CHUNK = 1024 * 1024
+
+ELF_MAGIC = b'\x7fELF'
+PT_LOAD, PT_DYNAMIC, PT_INTERP = 1, 2, 3
+DT_NULL, DT_NEEDED, DT_STRTAB, DT_RPATH, DT_RUNPATH = 0, 1, 5, 15, 29
+
+DEFAULT_LIBRARY_DIRS = ['/lib64', '/usr/lib64', '/lib', '/usr/lib',
+                        '/lib/x86_64-linux-gnu', '/usr/lib/x86_64-linux-gnu',
+                        '/lib/aarch64-linux-gnu', '/usr/lib/aarch64-linux-gnu', '/usr/local/lib']
+
+_library_dirs = None
+
+
+def read_ld_so_conf(path='/etc/ld.so.conf', depth=0):
+    dirs = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return dirs
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith('include ') and depth < 4:
+            pattern = line.split(None, 1)[1]
+            if not os.path.isabs(pattern):
+                pattern = os.path.join(os.path.dirname(path), pattern)
+            for included in sorted(glob.glob(pattern)):
+                dirs += read_ld_so_conf(included, depth + 1)
+        elif os.path.isabs(line):
+            dirs.append(line)
+    return dirs
+
+
+def library_dirs():
+    # 与动态链接器的默认搜索顺序大致相同：ld.so.conf 中的目录，再是系统默认目录
+    global _library_dirs
+    if _library_dirs is None:
+        dirs = read_ld_so_conf() + DEFAULT_LIBRARY_DIRS
+        _library_dirs = [d for d in dict.fromkeys(dirs) if os.path.isdir(d)]
+    return _library_dirs
+
+
+class ElfInfo:
+    __slots__ = ('elf_class', 'interpreter', 'needed', 'search_paths')
+
+    def __init__(self, elf_class, interpreter=None, needed=(), search_paths=()):
+        self.elf_class = elf_class
+        self.interpreter = interpreter
+        self.needed = list(needed)
+        self.search_paths = list(search_paths)
+
+
+def read_cstring(f, offset, limit=4096):
+    f.seek(offset)
+    data = f.read(limit)
+    end = data.find(b'\0')
+    return (data if end < 0 else data[:end]).decode('utf-8', errors='replace')
+
+
+def parse_elf(path):
+    # 只读取程序头和 .dynamic 段，得到解释器 (ld-linux)、DT_NEEDED 和 RPATH/RUNPATH；不是 ELF 时返回 None
+    with open(path, 'rb') as f:
+        ident = f.read(64)
+        if len(ident) < 64 or ident[:4] != ELF_MAGIC:
+            return None
+        elf_class = ident[4]
+        order = '<' if ident[5] == 1 else '>'
+        if elf_class == 2:
+            phoff, = struct.unpack_from(order + 'Q', ident, 0x20)
+            phentsize, phnum = struct.unpack_from(order + 'HH', ident, 0x36)
+            ph_format, dyn_format = order + 'IIQQQQQQ', order + 'qQ'
+        elif elf_class == 1:
+            phoff, = struct.unpack_from(order + 'I', ident, 0x1C)
+            phentsize, phnum = struct.unpack_from(order + 'HH', ident, 0x2A)
+            ph_format, dyn_format = order + 'IIIIIIII', order + 'iI'
+        else:
+            return None
+
+        f.seek(phoff)
+        table = f.read(phentsize * phnum)
+        loads = []
+        dynamic = None
+        info = ElfInfo(elf_class)
+        for i in range(phnum):
+            fields = struct.unpack_from(ph_format, table, i * phentsize)
+            if elf_class == 2:
+                p_type, _, p_offset, p_vaddr, _, p_filesz = fields[:6]
+            else:
+                p_type, p_offset, p_vaddr, _, p_filesz = fields[:5]
+            if p_type == PT_LOAD:
+                loads.append((p_vaddr, p_offset, p_filesz))
+            elif p_type == PT_DYNAMIC:
+                dynamic = (p_offset, p_filesz)
+            elif p_type == PT_INTERP:
+                info.interpreter = read_cstring(f, p_offset, p_filesz)
+        if dynamic is None:
+            return info
+
+        f.seek(dynamic[0])
+        data = f.read(dynamic[1])
+        entry_size = struct.calcsize(dyn_format)
+        entries = []
+        strtab = None
+        for pos in range(0, len(data) - entry_size + 1, entry_size):
+            tag, value = struct.unpack_from(dyn_format, data, pos)
+            if tag == DT_NULL:
+                break
+            if tag == DT_STRTAB:
+                strtab = value
+            elif tag in (DT_NEEDED, DT_RPATH, DT_RUNPATH):
+                entries.append((tag, value))
+        if strtab is None:
+            return info
+
+        # DT_STRTAB 是虚拟地址，按 PT_LOAD 段换算成文件偏移
+        strtab_offset = None
+        for vaddr, offset, size in loads:
+            if vaddr <= strtab < vaddr + size:
+                strtab_offset = strtab - vaddr + offset
+                break
+        if strtab_offset is None:
+            return info
+
+        origin = os.path.dirname(os.path.abspath(path))
+        for tag, value in entries:
+            text = read_cstring(f, strtab_offset + value)
+            if tag == DT_NEEDED:
+                info.needed.append(text)
+            else:
+                info.search_paths += [part.replace('$ORIGIN', origin).replace('${ORIGIN}', origin)
+                                      for part in text.split(':') if part]
+    return info
+
+
+def elf_class_of(path):
+    try:
+        with open(path, 'rb') as f:
+            ident = f.read(5)
+    except OSError:
+        return None
+    return ident[4] if ident[:4] == ELF_MAGIC else None
+
+
+def find_library(name, elf_class, search_paths):
+    if '/' in name:
+        return name if os.path.isfile(name) else None
+    env_paths = [p for p in os.environ.get('LD_LIBRARY_PATH', '').split(':') if p]
+    for directory in list(search_paths) + env_paths + library_dirs():
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate) and elf_class_of(candidate) == elf_class:
+            return candidate
+    return None
+
+
+def script_interpreter(path):
+    # "#!/usr/bin/env python3" 这类脚本真正读取的是解释器
+    try:
+        with open(path, 'rb') as f:
+            first_line = f.readline(256)
+    except OSError:
+        return None
+    if not first_line.startswith(b'#!'):
+        return None
+    parts = first_line[2:].decode('utf-8', errors='replace').split()
+    if not parts:
+        return None
+    if os.path.basename(parts[0]) == 'env' and len(parts) > 1:
+        return shutil.which(parts[1])
+    return parts[0]
+
+
+def resolve_files(path, libraries=True):
+    # 启动 path 时会读取的文件：程序本身、脚本解释器、ELF 解释器和（递归的）共享库
+    files = [path]
+    interpreter = script_interpreter(path)
+    if interpreter:
+        files.append(interpreter)
+    if not libraries:
+        return files
+
+    pending = [files[-1]]
+    seen = set(files)
+    while pending and len(files) < MAX_LIBRARIES:
+        current = pending.pop(0)
+        try:
+            info = parse_elf(current)
+        except (OSError, struct.error):
+            continue
+        if info is None:
+            continue
+        found = [info.interpreter] if info.interpreter else []
+        found += [find_library(name, info.elf_class, info.search_paths) for name in info.needed]
+        for library in found:
+            if library and library not in seen:
+                seen.add(library)
+                files.append(library)
+                pending.append(library)
+    return files
+
+
+def advise_willneed(path):
+    # 返回请求预读的字节数
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+    return size
+
+
+def read_through(path):
+    size = 0
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return size
+            size += len(chunk)
+
+
+class Prefetcher:
+    # 在单独的线程中按提交顺序预读，不阻塞调度线程
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, libraries=True):
+        self.budget = int(float(budget_mb) * 1024 * 1024)
+        self.libraries = libraries
+        self.used = 0
+        self.files = 0
+        self.skipped = 0
+        self.timings = []  # 每个程序的预读 (路径, 开始, 结束, 文件数)，供导出启动时间线
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self._advise = advise_willneed if hasattr(os, 'posix_fadvise') else read_through
+
+    def submit(self, path):
+        if path:
+            self._executor.submit(self.prefetch, path)
+
+    def prefetch(self, path):
+        start = time.monotonic()
+        files = self.files
+        self._prefetch_files(path)
+        if self.files > files:
+            self.timings.append((path, start, time.monotonic(), self.files - files))
+
+    def _prefetch_files(self, path):
+        for file_path in resolve_files(path, self.libraries):
+            real_path = os.path.realpath(file_path)
+            with self._lock:
+                if real_path in self._seen:
+                    continue
+                self._seen.add(real_path)
+            try:
+                size = os.path.getsize(real_path)
+            except OSError:
+                continue
+            with self._lock:
+                if self.used + size > self.budget:
+                    self.skipped += 1
+                    continue
+                self.used += size
+            try:
+                self._advise(real_path)
+            except OSError:
+                continue
+            with self._lock:
+                self.files += 1
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_prefetcher(config_data):
+    # 默认开启（仅限支持 posix_fadvise 的系统）；"prefetch": false 关闭
+    settings = config_data.get('prefetch', True)
+    if settings is False:
+        return None
+    if not isinstance(settings, dict):
+        settings = {}
+    if not settings.get('enabled', hasattr(os, 'posix_fadvise')):
+        return None
+    return Prefetcher(settings.get('budget_mb', DEFAULT_BUDGET_MB), settings.get('libraries', True))
+
@@ -0,0 +1,113 @@
+import os
+import time
+
+# 系统负载检测：启动下一个程序前检查 CPU/IO/内存压力，过高时暂缓启动。
+# 数据来源为 Linux 的 /proc/pressure (PSI)、/proc/loadavg 和 /proc/meminfo，
+# 读取不到的指标（其他系统或旧内核）视为不限制。
+
+PSI_DIR = '/proc/pressure'
+PSI_RESOURCES = ('cpu', 'io', 'memory')
+RESOURCE_NAMES = {'cpu': 'CPU 压力', 'io': 'IO 压力', 'memory': '内存压力'}
+
+
+def read_psi(resource):
+    # 返回 some 行的 (total 微秒, avg10 百分比)
+    with open(os.path.join(PSI_DIR, resource), 'r') as f:
+        for line in f:
+            if line.startswith('some'):
+                fields = dict(field.split('=', 1) for field in line.split()[1:])
+                return int(fields['total']), float(fields['avg10'])
+    raise OSError(f"无法解析 {resource} 压力数据")
+
+
+def read_load_per_cpu():
+    with open('/proc/loadavg', 'r') as f:
+        load1 = float(f.read().split()[0])
+    return load1 / (os.cpu_count() or 1)
+
+
+def read_mem_available_mb():
+    with open('/proc/meminfo', 'r') as f:
+        for line in f:
+            if line.startswith('MemAvailable:'):
+                return int(line.split()[1]) / 1024
+    raise OSError("无法读取可用内存")
+
+
+class PressureMonitor:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._last_totals = {}
+
+    def psi(self, resource):
+        # 用两次采样之间 total 的增量计算当前压力，比 avg10 反应更快；首次采样使用 avg10
+        try:
+            total, avg10 = read_psi(resource)
+        except (OSError, ValueError, KeyError):
+            return None
+        now = self.clock()
+        last = self._last_totals.get(resource)
+        self._last_totals[resource] = (now, total)
+        if last is None or now - last[0] < 0.05:
+            return avg10
+        return min((total - last[1]) / ((now - last[0]) * 1e6) * 100, 100.0)
+
+    def sample(self):
+        values = {resource: self.psi(resource) for resource in PSI_RESOURCES}
+        try:
+            values['load'] = read_load_per_cpu()
+        except (OSError, ValueError):
+            values['load'] = None
+        try:
+            values['free_mb'] = read_mem_available_mb()
+        except (OSError, ValueError):
+            values['free_mb'] = None
+        return values
+
+
+class AdmissionControl:
+    # 配置示例："admission": {"io": 40, "cpu": 80, "memory": 20, "load": 1.5, "min_free_mb": 512, "max_wait": 30}
+    # cpu/io/memory 为 PSI 百分比上限，load 为每个 CPU 的 1 分钟负载上限
+    def __init__(self, settings, monitor=None):
+        # 上限不是数字时抛出 ValueError，不等到启动过程中比较时才出错
+        self.limits = {resource: optional_number(settings, resource) for resource in PSI_RESOURCES}
+        self.load_limit = optional_number(settings, 'load')
+        self.min_free_mb = optional_number(settings, 'min_free_mb')
+        self.max_wait = float(settings.get('max_wait', 30))
+        self.interval = float(settings.get('interval', 0.2))
+        self.monitor = monitor or PressureMonitor()
+        self.last_sample = {}
+
+    def check(self):
+        # 返回超限原因；未超限时返回 None
+        values = self.last_sample = self.monitor.sample()
+        for resource, limit in self.limits.items():
+            value = values.get(resource)
+            if limit is not None and value is not None and value > limit:
+                return f"{RESOURCE_NAMES[resource]} {value:.0f}%"
+        if self.load_limit is not None and values['load'] is not None and values['load'] > self.load_limit:
+            return f"负载 {values['load']:.2f}"
+        if self.min_free_mb is not None and values['free_mb'] is not None and values['free_mb'] < self.min_free_mb:
+            return f"可用内存 {values['free_mb']:.0f}MB"
+        return None
+
+
+def optional_number(settings, key):
+    value = settings.get(key)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"admission 的 {key} 应为数字，实际为: {value!r}")
+
+
+def create_admission(config_data):
+    settings = config_data.get('admission')
+    if not settings:
+        return None
+    if not isinstance(settings, dict):
+        raise ValueError(f"admission 应为对象，例如 {{\"io\": 40, \"cpu\": 80}}，实际为: {settings!r}")
+    if not settings.get('enabled', True):
+        return None
+    return AdmissionControl(settings)
@@ -0,0 +1,147 @@
+import os
+import socket
+import time
+
+# 就绪检测：程序启动后轮询检查条件，通过后才放行依赖它的程序。
+# 配置示例："ready": {"type": "port", "port": 7890, "timeout": 30}
+
+DEFAULT_TIMEOUT = 30
+
+
+class ProbeFailed(Exception):
+    pass
+
+
+class Probe:
+    interval = 0.2
+
+    def __init__(self, spec, process):
+        # 配置无效时抛出 ValueError，调度器只在创建检测时处理配置错误，检测过程中不再访问缺少的字段
+        self.spec = spec
+        self.process = process
+        self.interval = float(spec.get('interval', self.interval))
+
+    def required(self, key):
+        value = self.spec.get(key)
+        if value is None or value == '':
+            raise ValueError(f"{self.spec.get('type')} 就绪检查缺少 {key}")
+        return value
+
+    def check(self, elapsed):
+        raise NotImplementedError
+
+    def describe(self):
+        return self.spec.get('type', '')
+
+
+class PortProbe(Probe):
+    # TCP 端口开始监听
+    def __init__(self, spec, process):
+        super().__init__(spec, process)
+        self.host = spec.get('host', '127.0.0.1')
+        self.port = int(self.required('port'))
+
+    def check(self, elapsed):
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.interval):
+                return True
+        except OSError:
+            return False
+
+    def describe(self):
+        return f"端口 {self.host}:{self.port}"
+
+
+class FileProbe(Probe):
+    # 文件或 Unix socket 出现
+    def __init__(self, spec, process):
+        super().__init__(spec, process)
+        self.path = str(self.required('path'))
+
+    def check(self, elapsed):
+        return os.path.exists(self.path)
+
+    def describe(self):
+        return f"文件 {self.path}"
+
+
+class AliveProbe(Probe):
+    # 进程持续存活 N 毫秒（用于排除启动即崩溃的情况）
+    def __init__(self, spec, process):
+        super().__init__(spec, process)
+        self.duration = int(spec.get('ms', 1000)) / 1000
+
+    def check(self, elapsed):
+        if self.process is not None and self.process.poll() is not None:
+            raise ProbeFailed(f"进程已退出 (退出码 {self.process.returncode})")
+        return elapsed >= self.duration
+
+    def describe(self):
+        return f"存活 {int(self.duration * 1000)} 毫秒"
+
+
+class CpuProbe(Probe):
+    # 进程 CPU 占用回落到阈值以下，说明初始化已经完成；只在有 /proc 的系统上可用
+    interval = 0.5
+
+    def __init__(self, spec, process):
+        super().__init__(spec, process)
+        self.threshold = float(spec.get('threshold', 5))
+        self.last_sample = None
+        self.clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    def read_cpu_seconds(self):
+        with open(f'/proc/{self.process.pid}/stat', 'rb') as f:
+            fields = f.read().rsplit(b')', 1)[1].split()
+        # utime、stime 分别是第 14、15 个字段（去掉 pid 和进程名后为第 12、13 个）
+        return (int(fields[11]) + int(fields[12])) / self.clock_ticks
+
+    def check(self, elapsed):
+        if self.process is None or self.process.pid is None:
+            return True  # 无法获取进程信息时不阻塞后续程序
+        if self.process.poll() is not None:
+            raise ProbeFailed(f"进程已退出 (退出码 {self.process.returncode})")
+        try:
+            cpu_seconds = self.read_cpu_seconds()
+        except OSError:
+            return True
+
+        sample = (elapsed, cpu_seconds)
+        last_sample, self.last_sample = self.last_sample, sample
+        if last_sample is None or sample[0] <= last_sample[0]:
+            return False
+        usage = (sample[1] - last_sample[1]) / (sample[0] - last_sample[0]) * 100
+        return usage < self.threshold
+
+    def describe(self):
+        return f"CPU 低于 {self.threshold:g}%"
+
+
+PROBE_TYPES = {
+    'port': PortProbe,
+    'file': FileProbe,
+    'alive': AliveProbe,
+    'cpu': CpuProbe,
+}
+
+
+def create_probe(spec, process):
+    if not isinstance(spec, dict):
+        raise ValueError(f"ready 应为对象，例如 {{\"type\": \"port\", \"port\": 7890}}，实际为: {spec!r}")
+    probe_class = PROBE_TYPES.get(spec.get('type'))
+    if probe_class is None:
+        raise ValueError(f"未知的就绪检测类型: {spec.get('type')}")
+    return probe_class(spec, process)
+
+
+def wait_ready(probe, timeout, cancel_event, clock=time.monotonic):
+    # 返回 True 表示检测通过，False 表示超时或被取消；进程异常时抛出 ProbeFailed
+    start = clock()
+    while True:
+        elapsed = clock() - start
+        if probe.check(elapsed):
+            return True
+        if elapsed >= timeout:
+            return False
+        if cancel_event.wait(probe.interval):
+            return False
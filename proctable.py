@@ -0,0 +1,184 @@
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+
+# 进程快照：启动会话开始时遍历一次正在运行的进程，按可执行文件的真实路径建立索引，
+# 之后每个程序只需查一次字典就知道是否已经在运行，不必为每个程序重新遍历进程表。
+#
+# Linux 读取 /proc/<pid>/exe 和 cmdline（脚本由解释器运行时，脚本路径在 cmdline 中）；只有解释器的第一个
+# 非选项参数算作正在运行的脚本，less /opt/app/app、vim tool.sh 这类打开文件的进程不算；
+# Windows 用 EnumProcesses + QueryFullProcessImageNameW；其他系统没有快照，视为都未运行。
+#
+# 程序条目的 "if_running"（或顶层的默认值）决定已在运行时怎么做：
+#   "skip"   不再启动，视为已就绪（默认）
+#   "focus"  不再启动，并把已有的窗口切换到前台
+#   "start"  照常再启动一个
+
+IF_RUNNING_POLICIES = ('skip', 'focus', 'start')
+DEFAULT_IF_RUNNING = 'skip'
+
+# 运行脚本的解释器，允许带版本号（python3.11）和 .exe 后缀
+INTERPRETER_PATTERN = re.compile(r'(python|pythonw|pypy|sh|bash|dash|zsh|ksh|fish|node|nodejs|perl|ruby|php|lua|'
+                                 r'tclsh|wish|wscript|cscript)[\d.]*(\.exe)?', re.IGNORECASE)
+
+
+def path_key(path):
+    return os.path.normcase(os.path.realpath(path))
+
+
+def linux_processes():
+    # 产生 (pid, 可执行文件路径, cmdline)；其他用户的进程读不到 exe，跳过
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit():
+            continue
+        try:
+            exe = os.readlink(f'/proc/{entry.name}/exe')
+            with open(f'/proc/{entry.name}/cmdline', 'rb') as f:
+                cmdline = f.read().split(b'\0')
+        except OSError:
+            continue
+        if exe.endswith(' (deleted)'):
+            exe = exe[:-len(' (deleted)')]
+        yield int(entry.name), exe, [arg.decode('utf-8', errors='replace') for arg in cmdline[:3] if arg]
+
+
+def windows_processes():
+    import ctypes
+    from ctypes import wintypes
+
+    psapi = ctypes.WinDLL('psapi')
+    kernel32 = ctypes.WinDLL('kernel32')
+    process_query_limited_information = 0x1000
+    pids = (wintypes.DWORD * 8192)()
+    needed = wintypes.DWORD()
+    if not psapi.EnumProcesses(pids, ctypes.sizeof(pids), ctypes.byref(needed)):
+        return
+    buffer = ctypes.create_unicode_buffer(32768)
+    for pid in pids[:needed.value // ctypes.sizeof(wintypes.DWORD)]:
+        handle = kernel32.OpenProcess(process_query_limited_information, False, pid)
+        if not handle:
+            continue
+        try:
+            size = wintypes.DWORD(len(buffer))
+            if kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                yield pid, buffer.value, []
+        finally:
+            kernel32.CloseHandle(handle)
+
+
+def list_processes():
+    if os.path.isdir('/proc/self'):
+        return linux_processes()
+    if os.name == 'nt':
+        return windows_processes()
+    return iter(())
+
+
+def script_argument(exe, cmdline):
+    # 解释器进程运行的脚本（第一个非选项参数，须为绝对路径），其他进程返回 None
+    if not INTERPRETER_PATTERN.fullmatch(os.path.basename(exe)):
+        return None
+    for arg in cmdline[1:]:
+        if not arg.startswith('-'):
+            return arg if os.path.isabs(arg) else None
+    return None
+
+
+class ProcessTable:
+    def __init__(self, processes=()):
+        self.by_path = {}
+        own_pid = os.getpid()
+        for pid, exe, cmdline in processes:
+            if pid == own_pid:
+                continue
+            paths = [exe]
+            script = script_argument(exe, cmdline)
+            if script is not None:
+                paths.append(script)
+            for path in paths:
+                self.by_path.setdefault(path_key(path), []).append(pid)
+
+    @classmethod
+    def snapshot(cls):
+        try:
+            return cls(list_processes())
+        except OSError:
+            return cls()
+
+    def find(self, path):
+        # 返回以 path 运行的进程 PID 列表
+        if not path:
+            return []
+        return self.by_path.get(path_key(path), [])
+
+
+def focus_windows_process(pids):
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL('user32')
+    targets = set(pids)
+    found = []
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, _):
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        if pid.value in targets and user32.IsWindowVisible(hwnd):
+            found.append(hwnd)
+            return False
+        return True
+
+    user32.EnumWindows(callback, 0)
+    if not found:
+        return False
+    user32.ShowWindow(found[0], 9)  # SW_RESTORE
+    return bool(user32.SetForegroundWindow(found[0]))
+
+
+def focus_process(pids):
+    # 在后台线程把 pids 中任一进程的窗口切换到前台，不等待结果（xdotool 每个 PID 最多要 2 秒，
+    # 不能卡住调度循环）。返回是否发起了切换；命令行退出前用 wait_focus 等待切换完成
+    if os.name == 'nt':
+        target = focus_windows_process
+    else:
+        xdotool = shutil.which('xdotool')
+        if xdotool is None:
+            return False
+        target = lambda pids: focus_xdotool_process(xdotool, pids)
+    thread = threading.Thread(target=focus_quietly, args=(target, list(pids)), daemon=True)
+    thread.start()
+    _focus_threads.append(thread)
+    return True
+
+
+_focus_threads = []
+
+
+def wait_focus(timeout=2.0):
+    # 等待尚未完成的窗口切换，最多 timeout 秒；进程退出时守护线程会被直接结束
+    deadline = time.monotonic() + timeout
+    while _focus_threads:
+        _focus_threads.pop().join(max(deadline - time.monotonic(), 0))
+
+
+def focus_quietly(target, pids):
+    try:
+        target(pids)
+    except OSError:
+        pass
+
+
+def focus_xdotool_process(xdotool, pids):
+    for pid in pids:
+        try:
+            result = subprocess.run([xdotool, 'search', '--onlyvisible', '--pid', str(pid), 'windowactivate'],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=2)
+        except subprocess.TimeoutExpired:
+            return False
+        if result.returncode == 0:
+            return True
+    return False
@@ -0,0 +1,293 @@
+import atexit
+import ctypes
+import os
+import platform
+import re
+import threading
+
+# 资源控制：程序条目的 resources 在进程创建后立即作用到新进程上，让后台工具不和急需的程序抢资源。
+#
+# "resources": {
+#     "nice": 10,                                      # -20..19，越大越让步；负值需要权限
+#     "ionice": "idle",                                # 或 {"class": "best-effort", "level": 7}；realtime 需要权限
+#     "affinity": "0-3,6",                             # 或 [0, 1, 2, 3]
+#     "cgroup": {"cpu_max": 50, "memory_max_mb": 1024},   # cgroup v2：CPU 百分比（100 为一个核心）和内存上限
+#     "boost": 10                                      # 或 {"seconds": 10, "nice": -5}：前 N 秒高优先级运行，之后恢复为上面的设置
+# }
+#
+# boost 默认只提高磁盘优先级；CPU 方面加速期间按 nice 0 运行（配置了正的 nice 时才有区别），
+# 负的 boost nice 需要权限。FastStart 退出时（如 --launch 启动完成后）立即恢复仍在加速中的程序，不等加速结束。
+#
+# 只支持 Linux（nice 也适用于其他类 Unix 系统）；不支持或没有权限的项给出提示后跳过，不影响启动。
+# Linux 的优先级和 CPU 亲和性按线程生效，恢复时对进程当前的所有线程逐个设置。
+# cgroup 在顶层 "cgroup_root" 指定的目录下创建（默认为 FastStart 所在 cgroup 的上一级），每个程序一个子目录。
+
+IONICE_CLASSES = {'none': 0, 'realtime': 1, 'best-effort': 2, 'idle': 3}
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_SYSCALLS = {'x86_64': 251, 'aarch64': 30, 'i386': 289, 'i686': 289, 'armv7l': 314, 'ppc64le': 273,
+                   'riscv64': 30, 's390x': 282}
+CGROUP_MOUNT = '/sys/fs/cgroup'
+CPU_PERIOD = 100000
+DEFAULT_BOOST_NICE = 0
+
+
+def parse_cpu_list(value):
+    # "0-3,6" 或 [0, 1] -> {0, 1, 2, 3, 6}
+    if isinstance(value, (list, tuple)):
+        return {int(cpu) for cpu in value}
+    cpus = set()
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    if not cpus:
+        raise ValueError(f"CPU 列表为空: {value}")
+    return cpus
+
+
+def parse_ionice(value):
+    # 返回 (class, level)
+    if isinstance(value, dict):
+        io_class, level = value.get('class', 'best-effort'), value.get('level', 4)
+    else:
+        io_class, level = value, 4
+    if io_class not in IONICE_CLASSES:
+        raise ValueError(f"未知的磁盘优先级: {io_class}")
+    level = int(level)
+    if not 0 <= level <= 7:
+        raise ValueError(f"磁盘优先级等级应为 0-7: {level}")
+    return io_class, level
+
+
+class ResourceSpec:
+    __slots__ = ('nice', 'ionice', 'affinity', 'cpu_max', 'memory_max_mb', 'boost_seconds', 'boost_nice')
+
+    def __init__(self, spec):
+        nice = spec.get('nice')
+        self.nice = None if nice is None else max(-20, min(19, int(nice)))
+        self.ionice = None if spec.get('ionice') is None else parse_ionice(spec['ionice'])
+        self.affinity = None if spec.get('affinity') in (None, '', []) else parse_cpu_list(spec['affinity'])
+        cgroup = spec.get('cgroup') or {}
+        self.cpu_max = float(cgroup['cpu_max']) if cgroup.get('cpu_max') else None
+        self.memory_max_mb = int(cgroup['memory_max_mb']) if cgroup.get('memory_max_mb') else None
+        boost = spec.get('boost')
+        if isinstance(boost, dict):
+            self.boost_seconds = float(boost.get('seconds', 0))
+            self.boost_nice = int(boost.get('nice', DEFAULT_BOOST_NICE))
+        else:
+            self.boost_seconds = float(boost or 0)
+            self.boost_nice = DEFAULT_BOOST_NICE
+
+    @property
+    def cgroup(self):
+        return self.cpu_max is not None or self.memory_max_mb is not None
+
+    @property
+    def boost(self):
+        return self.boost_seconds > 0
+
+
+def parse_resources(spec):
+    # 没有配置时返回 None；配置无效时抛出 ValueError
+    if not spec:
+        return None
+    if not isinstance(spec, dict):
+        raise ValueError("resources 应为对象")
+    try:
+        return ResourceSpec(spec)
+    except (TypeError, KeyError) as e:
+        raise ValueError(str(e))
+
+
+def process_threads(pid):
+    # Linux 上进程的所有线程 ID；读不到时只返回 pid 本身
+    try:
+        return [int(tid) for tid in os.listdir(f'/proc/{pid}/task')]
+    except OSError:
+        return [pid]
+
+
+_libc = None
+
+
+def ioprio_set(pid, io_class, level):
+    global _libc
+    number = IOPRIO_SYSCALLS.get(platform.machine())
+    if number is None or not os.path.isdir('/proc'):
+        raise OSError("当前系统不支持设置磁盘优先级")
+    if _libc is None:
+        _libc = ctypes.CDLL(None, use_errno=True)
+    value = (IONICE_CLASSES[io_class] << IOPRIO_CLASS_SHIFT) | (level if io_class != 'none' else 0)
+    if _libc.syscall(number, IOPRIO_WHO_PROCESS, pid, value) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+def own_cgroup():
+    # cgroup v2 下 /proc/self/cgroup 只有一行 "0::/路径"
+    try:
+        with open('/proc/self/cgroup', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('0::'):
+                    return line[3:].strip()
+    except OSError:
+        pass
+    return None
+
+
+def default_cgroup_root():
+    if not os.path.exists(os.path.join(CGROUP_MOUNT, 'cgroup.controllers')):
+        return None
+    path = own_cgroup()
+    if path is None:
+        return None
+    return os.path.dirname(os.path.join(CGROUP_MOUNT, path.lstrip('/')))
+
+
+def cgroup_dir_name(name):
+    return 'faststart-' + (re.sub(r'[^\w.-]', '_', name) or 'program')
+
+
+def write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+class CgroupManager:
+    def __init__(self, root=None):
+        self.root = root or default_cgroup_root()
+        self._enabled = False
+        self._lock = threading.Lock()
+
+    def _enable_controllers(self):
+        # 上级目录需要把 cpu/memory 控制器开放给子目录；已开放或没有权限时忽略，交给后面的写入报错
+        with self._lock:
+            if self._enabled:
+                return
+            self._enabled = True
+        for controller in ('cpu', 'memory'):
+            try:
+                write_text(os.path.join(self.root, 'cgroup.subtree_control'), '+' + controller)
+            except OSError:
+                pass
+
+    def place(self, name, pid, spec):
+        if self.root is None:
+            raise OSError("系统未使用 cgroup v2")
+        self._enable_controllers()
+        directory = os.path.join(self.root, cgroup_dir_name(name))
+        os.makedirs(directory, exist_ok=True)
+        if spec.cpu_max is not None:
+            write_text(os.path.join(directory, 'cpu.max'), f"{int(spec.cpu_max * CPU_PERIOD / 100)} {CPU_PERIOD}")
+        if spec.memory_max_mb is not None:
+            write_text(os.path.join(directory, 'memory.max'), str(spec.memory_max_mb * 1024 * 1024))
+        write_text(os.path.join(directory, 'cgroup.procs'), str(pid))
+        return directory
+
+
+class ResourceController:
+    def __init__(self, cgroup_root=None):
+        self.cgroups = CgroupManager(cgroup_root)
+
+    def apply(self, name, pid, spec):
+        # 返回无法生效的项的说明列表
+        problems = []
+        if spec.cgroup:
+            self._try(problems, "cgroup", self.cgroups.place, name, pid, spec)
+        if spec.affinity is not None:
+            if hasattr(os, 'sched_setaffinity'):
+                self._try(problems, "CPU 亲和性", os.sched_setaffinity, pid, spec.affinity)
+            else:
+                problems.append("CPU 亲和性: 当前系统不支持")
+        if spec.boost:
+            # 加速期间使用 boost 的 nice 和最高的普通磁盘优先级；没有权限提高优先级时保持默认
+            self._try(problems, "启动加速", self._set_nice, [pid], min(spec.boost_nice, spec.nice or 0))
+            self._try(problems, "磁盘优先级", ioprio_set, pid, 'best-effort', 0)
+            self._schedule_relax(name, pid, spec)
+        else:
+            self._apply_priority(problems, [pid], spec)
+        return problems
+
+    def _apply_priority(self, problems, pids, spec):
+        if spec.nice is not None:
+            self._try(problems, "nice", self._set_nice, pids, spec.nice)
+        if spec.ionice is not None:
+            self._try(problems, "磁盘优先级", self._set_ionice, pids, *spec.ionice)
+
+    def _set_nice(self, pids, nice):
+        if not hasattr(os, 'setpriority'):
+            raise OSError("当前系统不支持设置 nice")
+        for pid in pids:
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, nice)
+            except ProcessLookupError:
+                pass  # 线程已经结束
+
+    def _set_ionice(self, pids, io_class, level):
+        for pid in pids:
+            try:
+                ioprio_set(pid, io_class, level)
+            except ProcessLookupError:
+                pass
+
+    def _schedule_relax(self, name, pid, spec):
+        def relax():
+            problems = []
+            threads = process_threads(pid)
+            relaxed = ResourceSpec({'nice': spec.nice if spec.nice is not None else os.getpriority(os.PRIO_PROCESS, 0),
+                                    'ionice': {'class': spec.ionice[0], 'level': spec.ionice[1]}
+                                    if spec.ionice is not None else 'none'})
+            self._apply_priority(problems, threads, relaxed)
+            for problem in problems:
+                print(f"恢复优先级失败: {name} ({problem})")
+
+        def fire():
+            with _pending_lock:
+                if _pending_relaxes.pop(timer, None) is None:
+                    return  # 退出时已经恢复过
+            relax()
+
+        # 守护线程，不拖住 --launch 和界面的退出；退出时由 relax_pending 立即恢复
+        timer = threading.Timer(spec.boost_seconds, fire)
+        timer.daemon = True
+        with _pending_lock:
+            _pending_relaxes[timer] = relax
+        timer.start()
+
+    @staticmethod
+    def _try(problems, label, func, *args):
+        try:
+            func(*args)
+        except ProcessLookupError:
+            pass  # 进程已经退出
+        except OSError as e:
+            problems.append(f"{label}: {e.strerror or e}")
+
+
+_pending_relaxes = {}  # 加速中的程序：定时器 -> 恢复优先级的函数
+_pending_lock = threading.Lock()
+
+
+def relax_pending():
+    # 立即恢复所有仍在加速中的程序的优先级
+    with _pending_lock:
+        pending = list(_pending_relaxes.items())
+        _pending_relaxes.clear()
+    for timer, relax in pending:
+        timer.cancel()
+        relax()
+
+
+atexit.register(relax_pending)
+
+
+def create_resource_controller(config_data, programs):
+    if not any(item_data.get('resources') for item_data in programs):
+        return None
+    return ResourceController(config_data.get('cgroup_root'))
@@ -0,0 +1,112 @@
+import re
+from collections import defaultdict
+
+# 程序列表搜索：按名称、路径、分组 (group) 和标签 (tags) 过滤，输入时逐字更新。
+#
+# "tags": ["办公", "开发"]      # 程序条目的标签，也可以写成 "办公, 开发"
+#
+# 三个字及以上按子串匹配，用三元组 (trigram) 索引找候选再核对；一两个字时匹配词的开头
+# （中文没有空格分词，每个字都算词的开头）。空格分隔的多个词需要同时匹配。
+# 索引在界面显示后于后台线程建立，之后随添加、编辑、删除增量更新，每次搜索只处理候选条目，不扫描整个列表。
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+|[^\x00-\x7f]+')
+
+
+def record_tags(record):
+    tags = record.extra.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+
+def record_fields(record):
+    fields = [record.name, record.path, record.extra.get('group') or ''] + record_tags(record)
+    return tuple(str(field).lower() for field in fields if field)
+
+
+def trigrams(fields):
+    return {field[i:i + 3] for field in fields for i in range(len(field) - 2)}
+
+
+def prefixes(fields):
+    keys = set()
+    for field in fields:
+        for match in WORD_PATTERN.finditer(field):
+            word = match.group()
+            for start in (range(len(word)) if not word.isascii() else (0,)):
+                keys.add(word[start:start + 1])
+                keys.add(word[start:start + 2])
+    return keys
+
+
+class ProgramIndex:
+    def __init__(self, records=()):
+        self.fields = {}
+        self.trigrams = defaultdict(set)
+        self.prefixes = defaultdict(set)
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        fields = record_fields(record)
+        self.fields[record] = fields
+        for key in trigrams(fields):
+            self.trigrams[key].add(record)
+        for key in prefixes(fields):
+            self.prefixes[key].add(record)
+
+    def remove(self, record):
+        fields = self.fields.pop(record, None)
+        if fields is None:
+            return
+        for table, keys in ((self.trigrams, trigrams(fields)), (self.prefixes, prefixes(fields))):
+            for key in keys:
+                postings = table.get(key)
+                if postings is not None:
+                    postings.discard(record)
+                    if not postings:
+                        del table[key]
+
+    def replace(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+    def sync(self, records):
+        # 与当前列表对齐：去掉已不在列表中的条目，补上缺少的（后台建立索引期间列表可能有增删改）
+        current = set(records)
+        for record in [record for record in self.fields if record not in current]:
+            self.remove(record)
+        for record in records:
+            if record not in self.fields:
+                self.add(record)
+
+    def search(self, query):
+        # 返回匹配的条目集合（无序）；查询为空时返回 None，表示不过滤
+        terms = query.lower().split()
+        if not terms:
+            return None
+        matches = None
+        for term in sorted(terms, key=len, reverse=True):  # 长词的候选通常最少，先算
+            matches = self._match(term, matches)
+            if not matches:
+                return set()
+        return matches
+
+    def _match(self, term, within=None):
+        if len(term) >= 3:
+            postings = [self.trigrams.get(key) for key in {term[i:i + 3] for i in range(len(term) - 2)}]
+            if not all(postings):
+                return set()
+            postings.sort(key=len)
+            candidates = within if within is not None and len(within) < len(postings[0]) else postings[0]
+            return {record for record in candidates
+                    if all(record in posting for posting in postings)
+                    and (within is None or record in within)
+                    and any(term in field for field in self.fields[record])}
+
+        if WORD_PATTERN.fullmatch(term):
+            found = self.prefixes.get(term, set())
+            return set(found) if within is None else found & within
+        # 一两个符号（如 "c:"）没有对应的索引，逐条核对
+        candidates = self.fields if within is None else within
+        return {record for record in candidates if any(term in field for field in self.fields[record])}
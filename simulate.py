@@ -0,0 +1,163 @@
+import math
+
+from backends import LaunchHandle, LaunchBackend
+from launcher import LaunchScheduler
+from pathcache import PATH_MISSING, PATH_OK
+from probes import DEFAULT_TIMEOUT
+
+# 模拟启动：在虚拟时钟上运行真正的调度器，不创建任何进程、不等待，几毫秒内给出完整的时间线、
+# 预计总耗时以及循环依赖、依赖不存在、路径不存在等问题。
+#
+# 各程序从启动到就绪的耗时取自启动记录（见 optimizer.py 的模型，同类重负载程序同时运行时互相拖慢），
+# 没有记录的程序按立即就绪计算。配置了 ready 的程序超过其 timeout 仍未就绪时，与真正启动时一样按超时继续。
+# 模拟时不检测系统负载 (admission)、不预读，也不检查程序是否已在运行。
+# 路径只读取路径检查的缓存，不访问文件系统，没有检查过的路径按存在计算。
+# python FastStart.py --simulate [--profile 方案]，界面中为“模拟启动”。
+
+
+class StubBackend(LaunchBackend):
+    # 不创建进程，句柄没有 PID
+    name = 'simulate'
+
+    def spawn(self, path):
+        return LaunchHandle(path, None, 0.0)
+
+
+class CachedPaths:
+    # 代替 PathValidator 交给模拟的调度器：只读缓存，不 stat，没有检查过的路径按存在计算
+    def __init__(self, validator=None):
+        self.validator = validator
+
+    def cached(self, path):
+        status = self.validator.cached(path) if self.validator is not None else None
+        return PATH_OK if status is None else status
+
+    def status(self, path):
+        return self.cached(path)
+
+    def exists(self, path):
+        return bool(path) and self.cached(path) != PATH_MISSING
+
+    def submit(self, paths, callback=None):
+        pass
+
+
+class SimulatedScheduler(LaunchScheduler):
+    def __init__(self, programs, model, **kwargs):
+        self.now = 0.0
+        super().__init__(programs, backend=StubBackend(), clock=self.virtual_clock, **kwargs)
+        self.model = model
+        self.working = {}
+        self.deadlines = {}  # 配置了 ready 的程序就绪检测超时的时刻
+        self.stalled = False
+        for task in self.tasks:
+            if model.work(task) > 0 and not task.ready_spec:
+                task.ready_spec = {'simulated': True}  # 有就绪耗时的程序都经过“等待就绪”阶段
+
+    def virtual_clock(self):
+        return self.now
+
+    def _policy(self, task):
+        return 'start'
+
+    def _start_probe(self, task):
+        work = self.model.work(task)
+        if work <= 0:
+            self._mark_ready(task)
+            return
+        if not task.ready_spec.get('simulated'):
+            # 配置在创建调度器时已检查过，无效的 ready 已被忽略
+            self.deadlines[task] = self.now + float(task.ready_spec.get('timeout', DEFAULT_TIMEOUT))
+        self.working[task] = work
+        self.notify('probing', task, f"等待就绪: {task.name} (预计 {work:.3f} 秒)")
+
+    def _wait(self, timeout):
+        # 不真正等待：把虚拟时钟拨到下一个延迟到期或下一个程序就绪的时刻
+        rates = self.model.rates(self.working)
+        step = math.inf if timeout is None else timeout
+        for task, remaining in self.working.items():
+            step = min(step, remaining / rates[task])
+        for deadline in self.deadlines.values():
+            step = min(step, max(deadline - self.now, 0.0))
+        if step == math.inf:
+            # 没有任何事件会发生，调度器将永远等下去（不应出现）
+            self.stalled = True
+            self.cancel()
+            return
+        self.now += step
+        finished = []
+        for task in list(self.working):
+            self.working[task] -= rates[task] * step
+            if self.working[task] <= 1e-9:
+                del self.working[task]
+                self.deadlines.pop(task, None)
+                finished.append(task)
+        # 同一时刻就绪和超时时按就绪计算
+        timed_out = [task for task, deadline in self.deadlines.items() if deadline <= self.now + 1e-9]
+        for task in timed_out:
+            del self.working[task]
+            del self.deadlines[task]
+        for task in sorted(finished, key=lambda task: task.index):
+            self._handle_probe_result(task, True)
+        for task in sorted(timed_out, key=lambda task: task.index):
+            self._handle_probe_result(task, False)
+
+
+class SimulationResult:
+    __slots__ = ('scheduler', 'events')
+
+    def __init__(self, scheduler, events):
+        self.scheduler = scheduler
+        self.events = events
+
+    @property
+    def makespan(self):
+        return self.scheduler.finished_at or 0.0
+
+    def problems(self):
+        return [message for _, kind, _, message in self.events if kind in ('warning', 'failed')]
+
+    def unknown(self):
+        # 没有启动记录、按立即就绪计算的程序
+        return [task.name for task in self.scheduler.tasks if self.scheduler.model.profile(task) is None]
+
+    def prediction(self):
+        from optimizer import Prediction
+
+        tasks = self.scheduler.tasks
+        return Prediction({task.index: task.started_at for task in tasks if task.started_at is not None},
+                          {task.index: task.ready_at for task in tasks if task.state == 'ready'},
+                          [task.index for task in tasks if task.state == 'failed' and task.started_at is None])
+
+
+def simulate(programs, settings, model, validator=None):
+    # validator 只用于读取已有的检查结果，可以在界面线程中调用
+    events = []
+    scheduler = SimulatedScheduler(
+        programs,
+        model,
+        parallel=settings.get('parallel', False),
+        max_concurrency=settings.get('max_concurrency', 0),
+        groups=settings.get('groups'),
+        notify=lambda kind, task, message: events.append((scheduler.now, kind, task, message)),
+        validator=CachedPaths(validator),
+    )
+    scheduler.run()
+    return SimulationResult(scheduler, events)
+
+
+def format_timeline(result, profile=None):
+    scheduler = result.scheduler
+    lines = [f"模拟启动: {profile or '默认方案'}，共 {len(scheduler.tasks)} 个程序（虚拟时钟，不启动任何程序）", '']
+    for at, _, _, message in result.events:
+        lines.append(f"{at * 1000:>10.0f} 毫秒  {message}")
+    lines += ['', f"预计总耗时: {result.makespan * 1000:.0f} 毫秒"]
+    if scheduler.stalled:
+        lines.append("调度在模拟中卡住，没有全部完成")
+    problems = result.problems()
+    if problems:
+        lines += ['', "问题:"] + [f"  {message}" for message in problems]
+    unknown = result.unknown()
+    if unknown:
+        lines += ['', "没有启动记录、按立即就绪计算: " + ', '.join(unknown)]
+    return '\n'.join(lines)
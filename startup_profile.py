@@ -0,0 +1,39 @@
+import sys
+import time
+
+# 启动耗时统计：带 --profile-startup 运行时，记录导入、窗口构建、首次绘制等各阶段的耗时，
+# 在延迟初始化完成后打印，用来检查启动时间是否超出预算。未开启时 mark 不做任何事。
+
+
+class StartupProfiler:
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.started = clock()
+        self._last = self.started
+        self.phases = []
+
+    def mark(self, name):
+        # 把上一个标记到现在的耗时记为 name 阶段
+        if not self.enabled:
+            return
+        now = self.clock()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self.started
+
+    def format_report(self):
+        lines = ['启动耗时:']
+        for name, elapsed in self.phases:
+            lines.append(f"  {name:<16}{elapsed * 1000:9.1f} ms")
+        lines.append(f"  {'合计':<16}{self.total() * 1000:9.1f} ms")
+        return '\n'.join(lines)
+
+    def report(self):
+        if self.enabled:
+            print(self.format_report(), flush=True)
+
+
+profiler = StartupProfiler('--profile-startup' in sys.argv)
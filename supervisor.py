@@ -0,0 +1,147 @@
+import collections
+import os
+import signal
+import socket
+import time
+
+# 进程守护：程序条目配置了 restart 时，界面在启动后继续关注它，退出后按指数退避重新启动，
+# window 秒内重启超过 max_restarts 次就不再重启。只在界面常驻时生效，--launch 启动后即退出不做守护。
+#
+# "restart": true                                             # 使用下面的默认值
+# "restart": {"mode": "on-failure", "backoff": 1, "max_backoff": 60, "max_restarts": 5, "window": 600}
+#
+# mode 为 on-failure 时只在退出码非 0（或未知）时重启，always 时正常退出也重启。
+# 退出事件由事件循环通知（Linux 为 pidfd，不支持时为 SIGCHLD，Windows 为进程句柄），不需要定时轮询；
+# 这里只负责重启策略，和 Qt 无关。
+
+RESTART_MODES = ('on-failure', 'always')
+
+
+class RestartPolicy:
+    __slots__ = ('mode', 'backoff', 'max_backoff', 'max_restarts', 'window')
+
+    def __init__(self, spec=None):
+        spec = spec if isinstance(spec, dict) else {}
+        self.mode = spec.get('mode', 'on-failure')
+        if self.mode not in RESTART_MODES:
+            raise ValueError(f"未知的重启方式: {self.mode}")
+        self.backoff = float(spec.get('backoff', 1))
+        self.max_backoff = float(spec.get('max_backoff', 60))
+        self.max_restarts = int(spec.get('max_restarts', 5))
+        self.window = float(spec.get('window', 600))
+
+    def should_restart(self, returncode):
+        return self.mode == 'always' or returncode != 0
+
+    def delay(self, attempt):
+        # 第 attempt 次（从 0 开始）连续重启前等待的秒数
+        return min(self.backoff * 2 ** attempt, self.max_backoff)
+
+
+def create_policy(spec):
+    if not spec:
+        return None
+    if isinstance(spec, dict) and not spec.get('enabled', True):
+        return None
+    return RestartPolicy(spec)
+
+
+class SupervisedProgram:
+    # state: running / backoff(等待重启) / stopped(正常退出，不再重启) / gave_up(重启次数过多)
+    __slots__ = ('name', 'path', 'policy', 'handle', 'state', 'restarts', 'restart_times', 'returncode',
+                 'restart_delay')
+
+    def __init__(self, name, path, policy, handle):
+        self.name = name
+        self.path = path
+        self.policy = policy
+        self.handle = handle
+        self.state = 'running'
+        self.restarts = 0
+        self.restart_times = collections.deque()
+        self.returncode = None
+        self.restart_delay = 0
+
+    def describe(self):
+        if self.state == 'running':
+            text = f"运行中 (PID {self.handle.pid})"
+            return text + f"，已重启 {self.restarts} 次" if self.restarts else text
+        if self.state == 'backoff':
+            return f"已退出，{self.restart_delay:g} 秒后重启"
+        if self.state == 'gave_up':
+            return "重启次数过多，已停止"
+        return f"已退出 (退出码 {self.returncode})" if self.returncode is not None else "已退出"
+
+
+def open_pidfd(pid):
+    # Linux 5.3+：进程退出时 pidfd 变为可读；不支持时返回 None
+    if pid is None or not hasattr(os, 'pidfd_open'):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        return None
+
+
+class ChildSignalPipe:
+    # 不支持 pidfd 时的退路：SIGCHLD 到达时由 Python 向 socket 写入一个字节，事件循环监听读端
+    def __init__(self):
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(self._writer.fileno(), warn_on_full_buffer=False)
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def drain(self):
+        try:
+            while self._reader.recv(4096):
+                pass
+        except OSError:
+            pass
+
+
+class Supervisor:
+    def __init__(self, backend, clock=time.monotonic):
+        self.backend = backend
+        self.clock = clock
+        self.programs = {}
+        self.events = []  # (时刻, 名称, 'exit'/'restart', 退出码/PID)，供导出启动时间线
+
+    def watch(self, name, path, handle, policy):
+        program = SupervisedProgram(name, path, policy, handle)
+        self.programs[name] = program
+        return program
+
+    def unwatch(self, name):
+        return self.programs.pop(name, None)
+
+    def on_exit(self, program):
+        # 返回重启前等待的秒数；不再重启时返回 None
+        program.returncode = program.handle.poll()
+        now = self.clock()
+        self.events.append((now, program.name, 'exit', program.returncode))
+        while program.restart_times and now - program.restart_times[0] > program.policy.window:
+            program.restart_times.popleft()
+
+        if not program.policy.should_restart(program.returncode):
+            program.state = 'stopped'
+            return None
+        if len(program.restart_times) >= program.policy.max_restarts:
+            program.state = 'gave_up'
+            return None
+        program.state = 'backoff'
+        program.restart_delay = program.policy.delay(len(program.restart_times))
+        return program.restart_delay
+
+    def restart(self, program):
+        # 失败时抛出 OSError，调用方按再次退出处理（这次尝试同样计入重启次数）
+        program.restart_times.append(self.clock())
+        program.restarts += 1
+        program.handle = self.backend.spawn(program.path)
+        self.events.append((self.clock(), program.name, 'restart', program.handle.pid))
+        program.returncode = None
+        program.state = 'running'
+        return program.handle
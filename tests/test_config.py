@@ -0,0 +1,79 @@
+import json
+import os
+import stat
+
+import pytest
+
+import config
+from config import ConfigWriter, backup_path, load_config, write_config_atomic
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_uses_the_umask(tmp_path):
+    path = tmp_path / 'start.json'
+    old_umask = os.umask(0o027)
+    try:
+        write_config_atomic(str(path), '{}')
+    finally:
+        os.umask(old_umask)
+    assert path.read_text(encoding='utf-8') == '{}'
+    if os.name == 'posix':
+        assert mode(path) == 0o640
+    assert not (tmp_path / 'start.json.bak').exists()
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="只在 POSIX 上检查权限位")
+def test_replacing_keeps_the_mode_and_writes_a_backup(tmp_path):
+    path = tmp_path / 'start.json'
+    path.write_text('{"old": 1}', encoding='utf-8')
+    path.chmod(0o604)
+    write_config_atomic(str(path), '{"new": 2}')
+    assert path.read_text(encoding='utf-8') == '{"new": 2}'
+    assert mode(path) == 0o604
+    assert (tmp_path / 'start.json.bak').read_text(encoding='utf-8') == '{"old": 1}'
+
+
+def test_backup_can_be_disabled(tmp_path):
+    path = tmp_path / 'start.json.plan'
+    path.write_text('old', encoding='utf-8')
+    write_config_atomic(str(path), 'new', backup=False)
+    assert not os.path.exists(backup_path(str(path)))
+
+
+def test_failed_write_leaves_the_original_intact(tmp_path, monkeypatch):
+    path = tmp_path / 'start.json'
+    path.write_text('{"old": 1}', encoding='utf-8')
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(config.os, 'replace', fail)
+    with pytest.raises(OSError):
+        write_config_atomic(str(path), '{"new": 2}')
+    assert path.read_text(encoding='utf-8') == '{"old": 1}'
+    # 临时文件已清理
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ['start.json', 'start.json.bak']
+
+
+def test_corrupt_config_falls_back_to_the_backup(tmp_path):
+    path = tmp_path / 'start.json'
+    path.write_text('{"programs": []}', encoding='utf-8')
+    write_config_atomic(str(path), '{"programs": [{"name": "a"}]}')
+    path.write_text('{"programs": [', encoding='utf-8')  # 写到一半断电
+    assert load_config(str(path)) == {'programs': []}
+
+
+def test_config_writer_writes_in_order_and_skips_unchanged(tmp_path):
+    path = tmp_path / 'start.json'
+    writer = ConfigWriter(str(path))
+    errors = []
+    for value in range(5):
+        writer.submit({'value': value}, errors.append)
+    writer.submit({'value': 4}, errors.append)
+    writer.flush()
+    writer.close()
+    assert json.loads(path.read_text(encoding='utf-8')) == {'value': 4}
+    assert errors == [None] * 6
@@ -0,0 +1,64 @@
+import pytest
+
+from launcher import LaunchScheduler
+from pathcache import PATH_OK, PathValidator
+from probes import FileProbe, create_probe
+from simulate import StubBackend
+
+# 真正的调度器配合不创建进程的后端 (StubBackend)
+
+
+def run(programs, **kwargs):
+    events = []
+    validator = PathValidator()
+    validator.prime({item_data['path']: PATH_OK for item_data in programs})
+    scheduler = LaunchScheduler(programs, backend=StubBackend(), validator=validator, if_running='start',
+                                notify=lambda kind, task, message: events.append((kind, task, message)),
+                                **kwargs)
+    scheduler.run()
+    return scheduler, events
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({'type': 'file'}, "file 就绪检查缺少 path"),
+    ({'type': 'port'}, "port 就绪检查缺少 port"),
+    ({'type': 'nope'}, "未知的就绪检测类型"),
+    ('port', "ready 应为对象"),
+])
+def test_invalid_probe_spec_is_a_value_error(spec, message):
+    with pytest.raises(ValueError, match=message):
+        create_probe(spec, None)
+
+
+def test_file_probe_describes_its_path(tmp_path):
+    probe = create_probe({'type': 'file', 'path': str(tmp_path)}, None)
+    assert isinstance(probe, FileProbe)
+    assert probe.describe() == f"文件 {tmp_path}"
+    assert probe.check(0)
+
+
+def test_file_probe_without_path_does_not_stop_the_launch():
+    programs = [{'name': 'a', 'path': '/opt/a', 'ready': {'type': 'file'}},
+                {'name': 'b', 'path': '/opt/b', 'after': 'a'}]
+    scheduler, events = run(programs, parallel=True)
+    assert [task.state for task in scheduler.tasks] == ['ready', 'ready']
+    assert any(kind == 'warning' and "缺少 path" in message for kind, _, message in events)
+
+
+def test_invalid_specs_are_reported_when_the_scheduler_is_created():
+    programs = [{'name': 'a', 'path': '/opt/a', 'ready': {'type': 'port', 'port': 7890, 'timeout': 'soon'}},
+                {'name': 'b', 'path': '/opt/b', 'resources': {'ionice': 'fast'}}]
+    scheduler = LaunchScheduler(programs, backend=StubBackend())
+    assert [message for _, message in scheduler.problems] == [
+        "就绪检测配置无效，不做检测: a (could not convert string to float: 'soon')",
+        "resources 配置无效: b (未知的磁盘优先级: fast)",
+    ]
+    assert scheduler.tasks[0].ready_spec is None
+    assert scheduler.tasks[1].resources_spec is None
+
+
+def test_invalid_scheduler_settings_raise_when_the_scheduler_is_created():
+    with pytest.raises(ValueError):
+        LaunchScheduler([{'name': 'a', 'path': '/opt/a'}], max_concurrency='two', backend=StubBackend())
+    with pytest.raises(ValueError):
+        LaunchScheduler([{'name': 'a', 'path': '/opt/a', 'max_concurrency': 'x'}], backend=StubBackend())
@@ -0,0 +1,43 @@
+import pytest
+
+import optimizer
+from optimizer import MAX_PRUNE_TRIALS, ProgramProfile, auto_optimize, optimize
+
+
+def profiles_for(programs, duration=1.0):
+    return {item_data['name']: ProgramProfile(item_data['name'], duration, io_read_mb=100 * duration)
+            for item_data in programs}
+
+
+@pytest.fixture
+def predictions(monkeypatch):
+    calls = []
+    predict = optimizer.predict
+
+    def counting_predict(*args, **kwargs):
+        calls.append(args)
+        return predict(*args, **kwargs)
+
+    monkeypatch.setattr(optimizer, 'predict', counting_predict)
+    return calls
+
+
+def test_optimize_shortens_the_launch():
+    # 两个 I/O 密集的程序同时启动会互相拖慢，错开后第一个程序更早就绪
+    programs = [{'name': 'a', 'path': '/opt/a', 'delay': 5}, {'name': 'b', 'path': '/opt/b', 'delay': 0}]
+    result = optimize(programs, {'parallel': True}, profiles_for(programs))
+    assert result.programs is not None
+    assert result.proposed.makespan < result.current.makespan
+
+
+def test_pruning_delays_is_bounded(predictions):
+    programs = [{'name': f'p{i}', 'path': f'/opt/p{i}', 'delay': i % 4} for i in range(200)]
+    optimize(programs, {'parallel': True, 'max_concurrency': 8}, profiles_for(programs), cpu_count=4)
+    assert len(predictions) <= MAX_PRUNE_TRIALS + 3
+
+
+def test_auto_optimize_without_history_does_not_simulate(tmp_path, predictions):
+    programs = [{'name': 'a', 'path': '/opt/a', 'delay': 3}]
+    result = auto_optimize({}, str(tmp_path / 'start.json'), programs, {'parallel': True, 'auto_optimize': True})
+    assert result is programs
+    assert not predictions
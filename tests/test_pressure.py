@@ -0,0 +1,35 @@
+import pytest
+
+from pressure import AdmissionControl, create_admission
+
+
+class FixedMonitor:
+    def __init__(self, **values):
+        self.values = dict({'cpu': None, 'io': None, 'memory': None, 'load': None, 'free_mb': None}, **values)
+
+    def sample(self):
+        return self.values
+
+
+@pytest.mark.parametrize('settings', [None, False, {}, {'enabled': False, 'io': 40}])
+def test_admission_disabled(settings):
+    assert create_admission({'admission': settings}) is None
+
+
+@pytest.mark.parametrize('settings, message', [
+    (True, "admission 应为对象"),
+    ("io", "admission 应为对象"),
+    ({'io': 'high'}, "io 应为数字"),
+    ({'load': [1]}, "load 应为数字"),
+])
+def test_invalid_admission_settings_are_value_errors(settings, message):
+    with pytest.raises(ValueError, match=message):
+        create_admission({'admission': settings})
+
+
+def test_admission_reports_the_first_exceeded_limit():
+    settings = {'io': 40, 'load': 1.5, 'min_free_mb': 512}
+    assert AdmissionControl(settings, FixedMonitor(io=10, load=1.0, free_mb=2048)).check() is None
+    assert AdmissionControl(settings, FixedMonitor(io=55, load=1.0, free_mb=2048)).check().endswith("55%")
+    assert AdmissionControl(settings, FixedMonitor(io=10, load=2.0, free_mb=2048)).check() == "负载 2.00"
+    assert AdmissionControl(settings, FixedMonitor(io=10, load=1.0, free_mb=100)).check() == "可用内存 100MB"
@@ -0,0 +1,69 @@
+import os
+import time
+
+import pytest
+
+import proctable
+from proctable import ProcessTable, script_argument, wait_focus
+
+
+def test_executable_path_is_matched():
+    table = ProcessTable([(100, '/opt/app/app', ['/opt/app/app', '--tray'])])
+    assert table.find('/opt/app/app') == [100]
+    assert table.find('/opt/other') == []
+    assert table.find('') == []
+
+
+def test_files_opened_by_other_programs_are_not_running():
+    table = ProcessTable([(100, '/usr/bin/less', ['less', '/opt/app/app']),
+                          (101, '/usr/bin/gdb', ['gdb', '/usr/bin/ditto']),
+                          (102, '/usr/bin/vim.basic', ['vim', '/path/to/tool.sh'])])
+    assert table.find('/opt/app/app') == []
+    assert table.find('/usr/bin/ditto') == []
+    assert table.find('/path/to/tool.sh') == []
+
+
+@pytest.mark.parametrize('exe, cmdline', [
+    ('/usr/bin/python3.11', ['python3', '/opt/tool.py']),
+    ('/usr/bin/python3', ['python3', '-u', '/opt/tool.py']),
+    ('/bin/bash', ['bash', '/opt/tool.py']),
+    ('/usr/bin/node', ['node', '/opt/tool.py']),
+    ('C:/Windows/System32/wscript.exe', ['wscript', '/opt/tool.py']),
+])
+def test_scripts_run_by_interpreters_are_running(exe, cmdline):
+    assert ProcessTable([(100, exe, cmdline)]).find('/opt/tool.py') == [100]
+
+
+def test_only_the_script_argument_of_an_interpreter_counts():
+    assert script_argument('/usr/bin/python3', ['python3', '/opt/tool.py', '/opt/data.txt']) == '/opt/tool.py'
+    assert script_argument('/usr/bin/python3', ['python3', '-m', 'http.server']) is None
+    assert script_argument('/usr/bin/python3', ['python3', 'relative.py']) is None
+    assert script_argument('/usr/bin/shred', ['shred', '/opt/tool.py']) is None
+
+
+def test_own_process_is_ignored():
+    assert ProcessTable([(os.getpid(), '/opt/app/app', [])]).find('/opt/app/app') == []
+
+
+def test_paths_are_compared_after_resolving_symlinks(tmp_path):
+    target = tmp_path / 'app'
+    target.write_text('')
+    link = tmp_path / 'link'
+    link.symlink_to(target)
+    assert ProcessTable([(100, str(target), [])]).find(str(link)) == [100]
+
+
+def test_wait_focus_waits_for_pending_focus(monkeypatch):
+    focused = []
+
+    def slow_focus(xdotool, pids):
+        time.sleep(0.2)
+        focused.extend(pids)
+
+    monkeypatch.setattr(proctable.os, 'name', 'posix')
+    monkeypatch.setattr(proctable.shutil, 'which', lambda name: '/usr/bin/xdotool')
+    monkeypatch.setattr(proctable, 'focus_xdotool_process', slow_focus)
+    assert proctable.focus_process([100])
+    assert focused == []
+    wait_focus(2)
+    assert focused == [100]
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import resources
+from resources import ResourceController, ResourceSpec, parse_resources, relax_pending
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="资源控制只支持 Linux")
+
+
+@pytest.fixture
+def child():
+    process = subprocess.Popen(['sleep', '30'])
+    yield process
+    process.kill()
+    process.wait()
+
+
+def test_parse_resources():
+    spec = parse_resources({'nice': 30, 'ionice': 'idle', 'affinity': '0-1', 'boost': {'seconds': 5, 'nice': -5}})
+    assert (spec.nice, spec.ionice, spec.affinity) == (19, ('idle', 4), {0, 1})
+    assert (spec.boost_seconds, spec.boost_nice) == (5, -5)
+    assert parse_resources(None) is None
+    with pytest.raises(ValueError):
+        parse_resources({'ionice': 'fast'})
+    with pytest.raises(ValueError):
+        parse_resources('idle')
+
+
+def test_boost_does_not_keep_the_process_alive_and_is_relaxed_on_exit(child):
+    spec = ResourceSpec({'nice': 10, 'boost': 60})
+    ResourceController().apply('sleep', child.pid, spec)
+    timers = list(resources._pending_relaxes)
+    assert timers and all(timer.daemon for timer in timers)
+
+    relax_pending()
+    assert os.getpriority(os.PRIO_PROCESS, child.pid) == 10
+    assert not resources._pending_relaxes
+    for timer in timers:
+        timer.join(1)
+        assert not timer.is_alive()
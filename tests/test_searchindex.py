@@ -0,0 +1,85 @@
+import pytest
+
+from config import ProgramRecord
+from searchindex import ProgramIndex, record_tags
+
+
+def record(name, path='', **extra):
+    return ProgramRecord(name, path or f'/opt/{name.lower()}/{name.lower()}', 0, extra)
+
+
+@pytest.fixture
+def records():
+    return [record('Firefox', group='浏览器', tags=['上网']),
+            record('Clash for Windows', '/opt/clash/cfw', tags='代理, 上网'),
+            record('微信', 'C:/Program Files/Tencent/WeChat/WeChat.exe', group='聊天'),
+            record('Visual Studio Code', '/usr/share/code/code', group='开发', tags=['编辑器']),
+            record('企业微信', '/opt/wxwork/wxwork', group='聊天')]
+
+
+def names(found):
+    return sorted(item.name for item in found)
+
+
+def test_empty_query_does_not_filter(records):
+    assert ProgramIndex(records).search('   ') is None
+
+
+def test_substring_match_with_trigrams(records):
+    index = ProgramIndex(records)
+    assert names(index.search('efo')) == ['Firefox']
+    assert names(index.search('WECHAT')) == ['微信']
+    assert names(index.search('studio')) == ['Visual Studio Code']
+    assert index.search('xyz') == set()
+
+
+def test_short_ascii_terms_match_word_starts(records):
+    index = ProgramIndex(records)
+    assert names(index.search('co')) == ['Visual Studio Code']  # code，不匹配 "for" 中间的 o
+    assert names(index.search('w')) == ['Clash for Windows', '企业微信', '微信']  # windows、wxwork、wechat
+    assert index.search('ef') == set()
+
+
+def test_short_chinese_terms_match_any_character(records):
+    index = ProgramIndex(records)
+    assert names(index.search('微信')) == ['企业微信', '微信']
+    assert names(index.search('信')) == ['企业微信', '微信']
+
+
+def test_groups_and_tags_are_searched(records):
+    index = ProgramIndex(records)
+    assert names(index.search('聊天')) == ['企业微信', '微信']
+    assert names(index.search('上网')) == ['Clash for Windows', 'Firefox']
+    assert names(index.search('代理')) == ['Clash for Windows']
+    assert record_tags(records[1]) == ['代理', '上网']
+
+
+def test_all_terms_must_match(records):
+    index = ProgramIndex(records)
+    assert names(index.search('聊天 企业')) == ['企业微信']
+    assert index.search('聊天 firefox') == set()
+
+
+def test_symbols_without_an_index_are_checked_directly(records):
+    index = ProgramIndex(records)
+    assert names(index.search('c:')) == ['微信']
+
+
+def test_incremental_updates(records):
+    index = ProgramIndex(records)
+    renamed = record('Firefox Nightly', '/opt/nightly/firefox')
+    index.replace(records[0], renamed)
+    assert names(index.search('nightly')) == ['Firefox Nightly']
+    assert names(index.search('浏览器')) == []
+    index.remove(renamed)
+    assert index.search('firefox') == set()
+    # 删除后不留下空的倒排表
+    assert all(index.trigrams.values()) and all(index.prefixes.values())
+
+
+def test_sync_follows_the_current_list(records):
+    index = ProgramIndex(records[:3])
+    index.sync(records[1:])
+    assert names(index.search('firefox')) == []
+    assert names(index.search('code')) == ['Visual Studio Code']
+    assert len(index.fields) == 4
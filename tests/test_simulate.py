@@ -0,0 +1,100 @@
+import pytest
+
+from optimizer import ProgramProfile, WorkloadModel
+from pathcache import PATH_MISSING, PathValidator
+from simulate import simulate
+
+# 在虚拟时钟上运行真正的调度器（见 simulate.py），不启动进程、不等待
+
+
+def run(programs, durations=None, io=(), validator=None, **settings):
+    # durations: 程序名 -> 就绪耗时（秒）；io 中的程序按 I/O 密集计算
+    profiles = {name: ProgramProfile(name, duration, io_read_mb=1000 * duration if name in io else None)
+                for name, duration in (durations or {}).items()}
+    return simulate(programs, settings, WorkloadModel(profiles, cpu_count=4), validator)
+
+
+def task(result, name):
+    return next(task for task in result.scheduler.tasks if task.name == name)
+
+
+def program(name, **item_data):
+    return dict(item_data, name=name, path=f'/opt/{name}')
+
+
+def test_serial_mode_starts_each_program_after_the_previous_is_ready():
+    result = run([program('a'), program('b'), program('c', delay=1)], {'a': 2, 'b': 3})
+    assert task(result, 'b').started_at == pytest.approx(2)
+    assert task(result, 'c').started_at == pytest.approx(6)
+    assert result.makespan == pytest.approx(6)
+    assert not result.problems()
+
+
+def test_after_waits_for_dependency_to_be_ready():
+    result = run([program('db'), program('app', after='db'), program('tool')], {'db': 5, 'app': 1}, parallel=True)
+    assert task(result, 'tool').started_at == pytest.approx(0)
+    assert task(result, 'app').started_at == pytest.approx(5)
+    assert task(result, 'app').ready_at == pytest.approx(6)
+    assert result.makespan == pytest.approx(6)
+
+
+def test_dependency_cycle_and_unknown_dependency_are_reported():
+    result = run([program('a', after='b'), program('b', after='a'), program('c', after='missing')], parallel=True)
+    problems = '\n'.join(result.problems())
+    assert "循环依赖" in problems
+    assert "依赖的程序不存在: missing" in problems
+    assert task(result, 'a').state == 'failed'
+    assert not result.scheduler.stalled
+
+
+def test_max_concurrency_queues_programs():
+    programs = [program(name) for name in ('a', 'b', 'c', 'd')]
+    result = run(programs, dict.fromkeys('abcd', 2), parallel=True, max_concurrency=2)
+    assert [task(result, name).started_at for name in 'abcd'] == pytest.approx([0, 0, 2, 2])
+    assert result.makespan == pytest.approx(4)
+
+
+def test_group_concurrency_limit():
+    programs = [program('a', group='sync'), program('b', group='sync'), program('c')]
+    result = run(programs, dict.fromkeys('abc', 1), parallel=True, groups={'sync': 1})
+    assert task(result, 'b').started_at == pytest.approx(1)
+    assert task(result, 'c').started_at == pytest.approx(0)
+
+
+def test_io_heavy_programs_share_the_disk():
+    result = run([program('a'), program('b')], {'a': 2, 'b': 2}, io=('a', 'b'), parallel=True)
+    assert task(result, 'a').ready_at == pytest.approx(4)
+    assert task(result, 'b').ready_at == pytest.approx(4)
+
+
+def test_probe_timeout_continues_the_launch():
+    programs = [program('slow', ready={'type': 'port', 'port': 7890, 'timeout': 3}), program('next', after='slow')]
+    result = run(programs, {'slow': 10}, parallel=True)
+    timeouts = [(at, task.name) for at, kind, task, _ in result.events if kind == 'timeout']
+    assert timeouts == [(pytest.approx(3), 'slow')]
+    assert task(result, 'next').started_at == pytest.approx(3)
+    assert result.makespan == pytest.approx(3)
+
+
+def test_probe_ready_before_timeout_is_not_a_timeout():
+    programs = [program('fast', ready={'type': 'port', 'port': 7890, 'timeout': 3})]
+    result = run(programs, {'fast': 1})
+    assert task(result, 'fast').ready_at == pytest.approx(1)
+    assert not [kind for _, kind, _, _ in result.events if kind == 'timeout']
+
+
+def test_invalid_probe_timeout_is_a_warning():
+    result = run([program('a', ready={'type': 'port', 'port': 7890, 'timeout': 'soon'})], {'a': 1})
+    assert any("就绪检测配置无效" in message for message in result.problems())
+    assert task(result, 'a').state == 'ready'
+
+
+def test_paths_come_from_the_cache_only(tmp_path):
+    validator = PathValidator()
+    validator.prime({'/opt/gone': PATH_MISSING})
+    programs = [dict(name='gone', path='/opt/gone'), dict(name='unchecked', path=str(tmp_path / 'not-there'))]
+    result = run(programs, parallel=True, validator=validator)
+    assert task(result, 'gone').state == 'failed'
+    # 没有检查过的路径按存在计算，模拟时不 stat
+    assert task(result, 'unchecked').state == 'ready'
+    assert validator.cached(str(tmp_path / 'not-there')) is None
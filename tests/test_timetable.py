@@ -0,0 +1,90 @@
+import datetime
+
+import pytest
+
+from timetable import ScheduleEngine, parse_days
+
+# 2024-01-01 是周一
+MONDAY = datetime.datetime(2024, 1, 1)
+
+
+def at(day, hour, minute=0, second=0):
+    return MONDAY + datetime.timedelta(days=day, hours=hour, minutes=minute, seconds=second)
+
+
+@pytest.mark.parametrize('days, expected', [
+    (None, set(range(1, 8))),
+    ('*', set(range(1, 8))),
+    ('1-5', {1, 2, 3, 4, 5}),
+    ('1,3,5', {1, 3, 5}),
+    ([6, 7], {6, 7}),
+    (3, {3}),
+])
+def test_parse_days(days, expected):
+    assert parse_days(days) == expected
+
+
+@pytest.mark.parametrize('days', ['0', '1-9', 8, 'mon', []])
+def test_parse_days_rejects_invalid_days(days):
+    with pytest.raises(ValueError):
+        parse_days(days)
+
+
+def test_next_fire_uses_the_earliest_rule_on_allowed_days():
+    engine = ScheduleEngine({'rules': [{'time': '08:30', 'days': '1-5'}, {'time': '10:00', 'days': [6, 7]}]})
+    assert engine.next_fire(at(0, 8, 0)) == at(0, 8, 30)
+    assert engine.next_fire(at(0, 8, 30)) == at(1, 8, 30)  # 严格晚于当前时刻
+    assert engine.next_fire(at(4, 9, 0)) == at(5, 10, 0)  # 周五之后是周六的规则
+    assert engine.describe() == "周一、周二、周三、周四、周五 08:30:00; 周六、周日 10:00:00"
+
+
+def test_disabled_rules_are_ignored():
+    engine = ScheduleEngine({'rules': [{'time': '08:00', 'enabled': False}, {'time': '09:00'}]})
+    assert engine.next_fire(at(0, 7)) == at(0, 9)
+
+
+def test_on_time_fire():
+    engine = ScheduleEngine({'time': '09:00:00', 'last_run': at(0, 8).isoformat()})
+    assert engine.evaluate(at(0, 9, 0, 30)) == (True, '')
+    # 同一次触发不会再算一次
+    assert engine.evaluate(at(0, 9, 1)) == (False, '')
+
+
+def test_missed_fire_is_caught_up_once_within_the_window():
+    engine = ScheduleEngine({'time': '09:00:00', 'last_run': at(0, 8).isoformat(), 'catch_up_window': 3600})
+    fire, message = engine.evaluate(at(0, 9, 30))
+    assert fire and "补启动" in message
+    assert engine.evaluate(at(0, 9, 40)) == (False, '')
+
+
+def test_missed_fire_outside_the_window_is_skipped():
+    engine = ScheduleEngine({'time': '09:00:00', 'last_run': at(0, 8).isoformat(), 'catch_up_window': 600})
+    fire, message = engine.evaluate(at(0, 12))
+    assert not fire and "已跳过" in message
+
+
+def test_catch_up_skip():
+    engine = ScheduleEngine({'time': '09:00:00', 'last_run': at(0, 8).isoformat(), 'catch_up': 'skip'})
+    fire, message = engine.evaluate(at(0, 9, 30))
+    assert not fire and "已跳过" in message
+
+
+def test_missed_fires_over_several_days_catch_up_only_the_latest():
+    engine = ScheduleEngine({'time': '09:00:00', 'last_run': at(0, 8).isoformat()})
+    fire, message = engine.evaluate(at(3, 9, 10))
+    assert fire and "01-04 09:00" in message
+
+
+def test_without_last_run_nothing_is_caught_up():
+    engine = ScheduleEngine({'time': '09:00:00'})
+    assert engine.evaluate(at(0, 12)) == (False, '')
+
+
+def test_invalid_rules_are_skipped_and_reported():
+    engine = ScheduleEngine({'rules': [{'time': '25:99'}, {'days': '1-5'}, 'x', {'time': '08:00', 'days': '1-9'},
+                                       {'time': '09:00'}],
+                             'catch_up_window': '1h', 'last_run': 'yesterday'})
+    assert engine.describe() == "每天 09:00:00"
+    assert len(engine.problems) == 6
+    assert engine.catch_up_window == 3600
+    assert engine.last_checked is None
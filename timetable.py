@@ -0,0 +1,149 @@
+import datetime
+
+# 定时启动规则：计算下一次触发时间，以及睡眠/关机期间错过的触发。
+#
+# "schedule": {
+#     "enabled": true,
+#     "time": "09:40:00",                      # 界面中设置的每日时间（没有 rules 时使用）
+#     "rules": [{"time": "08:30", "days": "1-5"}, {"time": "10:00", "days": [6, 7]}],
+#     "catch_up": "once",                      # 错过的触发：once 补启动一次，skip 跳过
+#     "catch_up_window": 3600,                 # 超过这个秒数的错过不再补启动
+#     "last_run": "2024-01-01T09:40:00"        # 上一次触发时间，由程序写入
+# }
+
+WEEKDAY_NAMES = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+
+# 定时器触发时间与计划时间相差在这个秒数内视为准时，超过则按错过处理
+ON_TIME_GRACE = 60
+
+
+def parse_time(text):
+    parts = [int(part) for part in str(text).split(':')]
+    while len(parts) < 3:
+        parts.append(0)
+    return datetime.time(parts[0], parts[1], parts[2])
+
+
+def parse_days(days):
+    # 1=周一 ... 7=周日；支持 "*"、"1-5"、"1,3,5" 或数字列表；无效时抛出 ValueError
+    if days in (None, '*', ''):
+        return frozenset(range(1, 8))
+    if isinstance(days, int):
+        result = {days}
+    elif isinstance(days, str):
+        result = set()
+        for part in days.split(','):
+            if '-' in part:
+                start, end = part.split('-', 1)
+                result.update(range(int(start), int(end) + 1))
+            else:
+                result.add(int(part))
+    else:
+        result = {int(day) for day in days}
+    if not result or not result <= set(range(1, 8)):
+        raise ValueError(f"days 应为 1-7 (1 为周一): {days}")
+    return frozenset(result)
+
+
+class ScheduleRule:
+    __slots__ = ('time', 'days')
+
+    def __init__(self, time, days=None):
+        self.time = parse_time(time)
+        self.days = parse_days(days)
+
+    def next_after(self, moment):
+        # 严格晚于 moment 的下一次触发时间
+        candidate = datetime.datetime.combine(moment.date(), self.time)
+        if candidate <= moment:
+            candidate += datetime.timedelta(days=1)
+        for _ in range(7):
+            if candidate.isoweekday() in self.days:
+                return candidate
+            candidate += datetime.timedelta(days=1)
+        return None
+
+    def describe(self):
+        if len(self.days) == 7:
+            return f"每天 {self.time.strftime('%H:%M:%S')}"
+        names = '、'.join(WEEKDAY_NAMES[day - 1] for day in sorted(self.days))
+        return f"{names} {self.time.strftime('%H:%M:%S')}"
+
+
+def parse_rules(schedule_data):
+    # 返回 (规则列表, 问题列表)；无效的规则跳过并说明原因，其余规则照常生效
+    rules = schedule_data.get('rules')
+    if not rules:
+        rules = [{'time': schedule_data.get('time', '00:00:00')}]
+    parsed = []
+    problems = []
+    for rule in rules:
+        try:
+            if not isinstance(rule, dict):
+                raise ValueError("规则应为对象")
+            if rule.get('enabled', True):
+                parsed.append(ScheduleRule(rule['time'], rule.get('days')))
+        except (ValueError, TypeError, KeyError) as e:
+            problems.append(f"定时规则无效，已跳过: {rule} ({e})")
+    return parsed, problems
+
+
+def next_fire(rules, after):
+    candidates = [fire for fire in (rule.next_after(after) for rule in rules) if fire is not None]
+    return min(candidates) if candidates else None
+
+
+def missed_fires(rules, since, until, limit=100):
+    # (since, until] 之间应当触发的时间
+    fires = []
+    moment = since
+    while len(fires) < limit:
+        fire = next_fire(rules, moment)
+        if fire is None or fire > until:
+            break
+        fires.append(fire)
+        moment = fire
+    return fires
+
+
+class ScheduleEngine:
+    # 不依赖 Qt：界面只负责按 next_fire 设置一个单次定时器，到点后调用 evaluate
+    def __init__(self, schedule_data):
+        # 配置中的问题记录在 problems 中，由界面显示；无效的值按默认处理
+        self.rules, self.problems = parse_rules(schedule_data)
+        self.catch_up = schedule_data.get('catch_up', 'once')
+        try:
+            self.catch_up_window = float(schedule_data.get('catch_up_window', 3600))
+        except (ValueError, TypeError):
+            self.problems.append(f"catch_up_window 无效: {schedule_data.get('catch_up_window')}，按 3600 秒处理")
+            self.catch_up_window = 3600.0
+        last_run = schedule_data.get('last_run')
+        try:
+            self.last_checked = datetime.datetime.fromisoformat(last_run) if last_run else None
+        except (ValueError, TypeError):
+            # 上一次触发时间无法识别时不补启动
+            self.problems.append(f"last_run 无效: {last_run}")
+            self.last_checked = None
+
+    def next_fire(self, now):
+        return next_fire(self.rules, now)
+
+    def evaluate(self, now):
+        # 返回 (是否触发, 说明)；从上次检查到现在之间的触发时间都算作到期
+        since, self.last_checked = self.last_checked, now
+        if since is None or since >= now:
+            return False, ''
+        fires = missed_fires(self.rules, since, now)
+        if not fires:
+            return False, ''
+
+        latest = fires[-1]
+        late = (now - latest).total_seconds()
+        if late <= ON_TIME_GRACE:
+            return True, ''
+        if self.catch_up == 'once' and late <= self.catch_up_window:
+            return True, f"补启动错过的定时 {latest.strftime('%m-%d %H:%M')}"
+        return False, f"已跳过错过的定时 {latest.strftime('%m-%d %H:%M')}"
+
+    def describe(self):
+        return '; '.join(rule.describe() for rule in self.rules)
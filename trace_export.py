@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+
+from config import write_config_atomic
+from pressure import PressureMonitor
+
+# 启动时间线：把一次启动会话导出为 Chrome Trace Event 格式的 JSON，可拖进 https://ui.perfetto.dev 或 chrome://tracing 查看。
+# 每个程序一条轨道：等待依赖、延迟、排队（等并发名额或系统负载）、预读、启动、就绪检测，
+# 以及界面守护的程序之后的运行、退出和重启；另有会话期间采样的系统负载计数器轨道。
+#
+# "trace_dir": "traces"        # 每次启动后自动保存到该目录（相对于配置文件）
+# python FastStart.py --launch --trace session.json
+# 界面中“导出时间线”导出最近一次启动。
+
+TRACE_PID = 1
+SESSION_TID = 0
+SAMPLE_INTERVAL = 0.25
+MIN_QUEUE_SPAN = 0.001  # 排队不到 1 毫秒的不画出来
+
+
+class LoadSampler:
+    # 会话期间在后台线程中定时采样系统负载
+    def __init__(self, interval=SAMPLE_INTERVAL, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.samples = []
+        self._monitor = PressureMonitor(clock)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='load-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self.samples.append((self.clock(), self._monitor.sample()))
+            if self._stop_event.wait(self.interval):
+                break
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def trace_dir(config_data, config_path):
+    # 未配置 trace_dir 时返回 None
+    path = config_data.get('trace_dir')
+    if not path:
+        return None
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(config_path), path)
+
+
+def trace_file_name(scheduler):
+    return time.strftime('faststart-%Y%m%d-%H%M%S.json', time.localtime(scheduler.started_wall))
+
+
+class TraceBuilder:
+    def __init__(self, t0):
+        self.t0 = t0
+        self.events = []
+
+    def ts(self, at):
+        return round((at - self.t0) * 1e6)
+
+    def metadata(self, name, tid, args):
+        self.events.append({'ph': 'M', 'name': name, 'pid': TRACE_PID, 'tid': tid, 'args': args})
+
+    def span(self, name, cat, tid, start, end, args=None, min_duration=0.0):
+        if start is None or end is None or end - start <= min_duration:
+            return
+        event = {'ph': 'X', 'name': name, 'cat': cat, 'pid': TRACE_PID, 'tid': tid,
+                 'ts': self.ts(start), 'dur': max(round((end - start) * 1e6), 1)}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def instant(self, name, cat, tid, at, args=None):
+        event = {'ph': 'i', 's': 't', 'name': name, 'cat': cat, 'pid': TRACE_PID, 'tid': tid, 'ts': self.ts(at)}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def counter(self, name, at, values):
+        values = {key: round(value, 3) for key, value in values.items() if value is not None}
+        if values:
+            self.events.append({'ph': 'C', 'name': name, 'pid': TRACE_PID, 'ts': self.ts(at), 'args': values})
+
+
+def add_task(builder, tid, task, prefetches):
+    t0 = builder.t0
+    if task.due_at is not None:
+        armed = task.due_at - task.delay
+        if task.deps:
+            builder.span("等待依赖", 'wait', tid, t0, armed, {'after': [dep.name for dep in task.deps]})
+        builder.span("延迟", 'wait', tid, armed, task.due_at, {'delay': task.delay})
+        builder.span("排队", 'wait', tid, task.due_at, task.started_at, min_duration=MIN_QUEUE_SPAN)
+    # 同一路径只预读一次，记在第一个使用该路径的程序上
+    for start, end, files in prefetches.pop(task.path, ()):
+        builder.span("预读", 'prefetch', tid, start, end, {'files': files})
+
+    handle = task.handle
+    spawned = None
+    if task.started_at is not None and handle is not None:
+        spawned = task.started_at + handle.spawn_latency
+        builder.span("启动", 'spawn', tid, task.started_at, spawned, {'pid': handle.pid, 'path': task.path})
+    if task.ready_spec and task.ready_at is not None and spawned is not None:
+        builder.span("就绪检测", 'probe', tid, spawned, task.ready_at, {'ready': task.ready_spec})
+
+    if task.state == 'failed':
+        at = task.started_at or task.due_at or t0
+        builder.instant("失败", 'failure', tid, at, {'error': task.error})
+    elif task.state == 'skipped':
+        builder.instant("已在运行", 'skip', tid, task.ready_at or t0)
+
+
+def add_supervision(builder, tid, task, events):
+    # events 为 Supervisor.events 中该程序的记录：(时刻, 'exit'/'restart', 详情)
+    running_since = task.started_at
+    exited_at = None
+    for at, kind, detail in events:
+        if kind == 'exit':
+            builder.span("运行", 'supervise', tid, running_since, at)
+            builder.instant("已退出", 'supervise', tid, at, {'returncode': detail})
+            exited_at = at
+        elif kind == 'restart':
+            builder.span("等待重启", 'supervise', tid, exited_at, at)
+            builder.instant("重启", 'supervise', tid, at, {'pid': detail})
+            running_since = at
+
+
+def build_trace(scheduler, samples=(), supervisor=None, profile=None):
+    builder = TraceBuilder(scheduler.t0)
+    builder.metadata('process_name', SESSION_TID, {'name': f"FastStart {profile or '默认方案'}"})
+    builder.metadata('thread_name', SESSION_TID, {'name': "启动会话"})
+    builder.metadata('thread_sort_index', SESSION_TID, {'sort_index': 0})
+    builder.span("启动会话", 'session', SESSION_TID, scheduler.t0, scheduler.finished_at,
+                 {'programs': len(scheduler.tasks)})
+
+    prefetches = {}
+    if scheduler.prefetcher is not None:
+        for path, start, end, files in scheduler.prefetcher.timings:
+            prefetches.setdefault(path, []).append((start, end, files))
+    supervised = {}
+    if supervisor is not None:
+        for at, name, kind, detail in supervisor.events:
+            if at >= scheduler.t0:
+                supervised.setdefault(name, []).append((at, kind, detail))
+
+    for task in scheduler.tasks:
+        tid = task.index + 1
+        builder.metadata('thread_name', tid, {'name': task.name})
+        builder.metadata('thread_sort_index', tid, {'sort_index': tid})
+        add_task(builder, tid, task, prefetches)
+        if task.name in supervised:
+            add_supervision(builder, tid, task, supervised.pop(task.name))
+
+    for at, values in samples:
+        builder.counter("系统负载 (每 CPU)", at, {'load': values.get('load')})
+        builder.counter("压力 (%)", at, {resource: values.get(resource) for resource in ('cpu', 'io', 'memory')})
+        builder.counter("可用内存 (MB)", at, {'free_mb': values.get('free_mb')})
+
+    return {'traceEvents': builder.events, 'displayTimeUnit': 'ms',
+            'otherData': {'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(scheduler.started_wall)),
+                          'profile': profile or ''}}
+
+
+def save_trace(path, scheduler, samples=(), supervisor=None, profile=None):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    text = json.dumps(build_trace(scheduler, samples, supervisor, profile), ensure_ascii=False)
+    write_config_atomic(path, text, backup=False)
+    return path
+
+
+def save_session_trace(config_data, config_path, scheduler, samples=(), profile=None):
+    # 配置了 trace_dir 时自动保存，返回保存的路径；出错时只提示
+    directory = trace_dir(config_data, config_path)
+    if directory is None:
+        return None
+    try:
+        return save_trace(os.path.join(directory, trace_file_name(scheduler)), scheduler, samples, profile=profile)
+    except OSError as e:
+        print(f"保存启动时间线失败: {e}")
+        return None